@@ -0,0 +1,208 @@
+"""Throughput, latency, SSE token rate and memory per request, per mixin.
+
+Runs every scenario against the stub server (in a child process, so its
+work is not measured) and prints one JSON document:
+
+    python benchmarks/bench_mixins.py --requests 500 --concurrency 8 --out before.json
+    python benchmarks/bench_mixins.py --latency 0.02 --error-rate 0.05 --only chat,chat_stream
+
+For each scenario: ``rps`` over the concurrent phase, ``p50/p90/p99``
+latency, ``tokens_per_s`` for streams, and, from a separate sequential
+phase under tracemalloc, the peak and retained bytes per request.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import emit, environment, latency_summary  # noqa: E402
+from stub_server import StubConfig, StubProcess  # noqa: E402
+
+import requests  # noqa: E402
+
+import polliLib.feeds  # noqa: E402
+from polliLib import PolliClient  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "Say something."}]
+
+# name -> (mixin, fn(client, i) -> tokens received)
+Scenario = Tuple[str, Callable[[PolliClient, int], int]]
+
+
+def _scenarios(audio_path: str) -> Dict[str, Scenario]:
+    def text(c: PolliClient, i: int) -> int:
+        c.generate_text(f"prompt {i}")
+        return 0
+
+    def text_stream(c: PolliClient, i: int) -> int:
+        return sum(1 for _ in c.generate_text_stream(f"prompt {i}"))
+
+    def chat(c: PolliClient, i: int) -> int:
+        c.chat_completion(MESSAGES)
+        return 0
+
+    def chat_stream(c: PolliClient, i: int) -> int:
+        return sum(1 for _ in c.chat_completion_stream(MESSAGES))
+
+    def image(c: PolliClient, i: int) -> int:
+        c.generate_image(f"image {i}")
+        return 0
+
+    def vision(c: PolliClient, i: int) -> int:
+        c.analyze_image_url("https://example.com/cat.png")
+        return 0
+
+    def stt(c: PolliClient, i: int) -> int:
+        c.transcribe_audio(audio_path)
+        return 0
+
+    def feed(c: PolliClient, i: int) -> int:
+        return sum(1 for _ in c.text_feed_stream())
+
+    def models(c: PolliClient, i: int) -> int:
+        c.refresh_cache()
+        c.list_models("text")
+        return 0
+
+    return {
+        "text": ("TextMixin", text),
+        "text_stream": ("TextMixin", text_stream),
+        "chat": ("ChatMixin", chat),
+        "chat_stream": ("ChatMixin", chat_stream),
+        "image": ("ImageMixin", image),
+        "vision": ("VisionMixin", vision),
+        "stt": ("STTMixin", stt),
+        "feed": ("FeedsMixin", feed),
+        "models": ("BaseClient", models),
+    }
+
+
+def make_client(stub: StubProcess, concurrency: int) -> PolliClient:
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max(10, concurrency))
+    session.mount("http://", adapter)
+    return PolliClient(
+        session=session,
+        rate_limits={"text": None, "image": None, "feed": None},
+        retry_initial_delay=0.01,
+        retry_max_delay=0.1,
+        **stub.client_kwargs(),
+    )
+
+
+def run_concurrent(
+    fn: Callable[[PolliClient, int], int], client: PolliClient, requests_n: int, concurrency: int
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    tokens = 0
+    errors = 0
+
+    def one(i: int) -> Tuple[float, int, bool]:
+        t0 = time.perf_counter()
+        try:
+            n = fn(client, i)
+            return time.perf_counter() - t0, n, True
+        except Exception:
+            return time.perf_counter() - t0, 0, False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for seconds, n, ok in pool.map(one, range(requests_n)):
+            latencies.append(seconds)
+            tokens += n
+            errors += 0 if ok else 1
+    wall = time.perf_counter() - started
+    out: Dict[str, Any] = {
+        "requests": requests_n,
+        "errors": errors,
+        "wall_s": wall,
+        "rps": requests_n / wall if wall else 0.0,
+        **latency_summary(latencies),
+    }
+    if tokens:
+        out["tokens"] = tokens
+        out["tokens_per_s"] = tokens / wall if wall else 0.0
+    return out
+
+
+def run_memory(fn: Callable[[PolliClient, int], int], client: PolliClient, samples: int) -> Dict[str, float]:
+    fn(client, -1)  # first call pays for imports and connection setup
+    tracemalloc.start()
+    try:
+        start_current = tracemalloc.get_traced_memory()[0]
+        peaks: List[int] = []
+        for i in range(samples):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            try:
+                fn(client, i)
+            except Exception:
+                pass
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        retained = tracemalloc.get_traced_memory()[0] - start_current
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_kib_per_request": sum(peaks) / len(peaks) / 1024 if peaks else 0.0,
+        "retained_bytes_per_request": retained / samples if samples else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--memory-samples", type=int, default=50)
+    parser.add_argument("--only", help="comma-separated scenario names")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    StubConfig.add_arguments(parser)
+    args = parser.parse_args(argv)
+    config = StubConfig.from_args(args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        audio_path = os.path.join(tmp, "clip.wav")
+        with open(audio_path, "wb") as f:
+            f.write(b"RIFF" + b"\0" * 4092)
+        scenarios = _scenarios(audio_path)
+        names = [n.strip() for n in args.only.split(",")] if args.only else list(scenarios)
+        unknown = [n for n in names if n not in scenarios]
+        if unknown:
+            parser.error(f"unknown scenario(s): {', '.join(unknown)}; choose from {', '.join(scenarios)}")
+
+        results: Dict[str, Any] = {}
+        with StubProcess(config) as stub:
+            # The feed URLs are module constants; point them at the stub.
+            polliLib.feeds.IMAGE_FEED_URL = f"{stub.url}/feed"
+            polliLib.feeds.TEXT_FEED_URL = f"{stub.url}/feed"
+            for name in names:
+                mixin, fn = scenarios[name]
+                client = make_client(stub, args.concurrency)
+                fn(client, -1)  # warm-up
+                results[name] = {
+                    "mixin": mixin,
+                    **run_concurrent(fn, client, max(1, args.requests), max(1, args.concurrency)),
+                    **run_memory(fn, make_client(stub, 1), max(1, args.memory_samples)),
+                }
+
+    result = {
+        "benchmark": "mixins",
+        **environment(),
+        "concurrency": args.concurrency,
+        "stub": config.as_dict(),
+        "results": results,
+    }
+    emit(result, args.out)
+    return result
+
+
+if __name__ == "__main__":
+    main()
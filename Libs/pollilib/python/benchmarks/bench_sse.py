@@ -0,0 +1,117 @@
+"""SSE parsing throughput, in events per second.
+
+    python benchmarks/bench_sse.py --events 200000 --chunk 1024 --out sse.json
+
+Builds a chat-completion stream of ``--events`` delta events in memory, cuts
+it into ``--chunk``-byte pieces (as a socket would deliver them) and times:
+
+- ``parse``: polliLib.sse turning the chunks into events
+- ``parse_decode``: the same plus pulling each delta's text, which is what
+  ``chat_completion_stream`` does per token
+- ``line_loop``: the previous per-line approach (decode, strip, ``json.loads``
+  and ``.get`` chains) on the same stream, as a baseline
+
+No network is involved; this isolates the per-event CPU cost.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import emit, environment  # noqa: E402
+
+from polliLib.chat import ChatMixin  # noqa: E402
+from polliLib.sse import JSON_BACKEND, iter_events  # noqa: E402
+
+
+def make_stream(events: int) -> bytes:
+    parts = [
+        b"data: " + json.dumps({"id": "c1", "choices": [{"index": 0, "delta": {"content": f"tok{i} "}}]}).encode() + b"\n\n"
+        for i in range(events)
+    ]
+    parts.append(b"data: [DONE]\n\n")
+    return b"".join(parts)
+
+
+def chunked(data: bytes, size: int) -> List[bytes]:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def parse(chunks: Iterable[bytes]) -> int:
+    return sum(1 for _ in iter_events(chunks))
+
+
+def parse_decode(chunks: Iterable[bytes]) -> int:
+    n = 0
+    for event in iter_events(chunks):
+        if event.data == "[DONE]":
+            break
+        if ChatMixin._delta_content(event.data):
+            n += 1
+    return n
+
+
+def line_loop(chunks: Iterable[bytes]) -> int:
+    buf = b"".join(chunks)  # requests' iter_lines does the splitting
+    n = 0
+    for raw in buf.splitlines():
+        line = raw.decode("utf-8", errors="ignore").strip()
+        if not line or line.startswith(":") or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            break
+        try:
+            obj = json.loads(data)
+            content = obj.get("choices", [{}])[0].get("delta", {}).get("content")
+        except Exception:
+            content = None
+        if content:
+            n += 1
+    return n
+
+
+def measure(fn: Callable[[List[bytes]], int], chunks: List[bytes], events: int, repeat: int) -> Dict[str, Any]:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(chunks)
+        best = min(best, time.perf_counter() - started)
+    return {"seconds": best, "events_per_s": events / best if best else 0.0}
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--chunk", type=int, default=1024, help="bytes per network chunk")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case; the fastest is reported")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    events = max(1, args.events)
+    chunks = chunked(make_stream(events), max(1, args.chunk))
+    results = {
+        name: measure(fn, chunks, events, max(1, args.repeat))
+        for name, fn in (("parse", parse), ("parse_decode", parse_decode), ("line_loop", line_loop))
+    }
+    result = {
+        "benchmark": "sse",
+        **environment(),
+        "json_backend": JSON_BACKEND,
+        "events": events,
+        "chunk_bytes": args.chunk,
+        "results": results,
+    }
+    emit(result, args.out)
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Cold-start cost of polliLib: import time and time to first request.
+
+Every trial runs in a fresh interpreter so nothing is cached in
+``sys.modules``. Interpreter start-up itself is not counted.
+
+    python benchmarks/bench_startup.py --trials 20 --out startup.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import PYTHON_DIR, emit, environment, percentile  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import polliLib
+t1 = time.perf_counter()
+eager = "requests" in sys.modules
+from polliLib import PolliClient
+t2 = time.perf_counter()
+client = PolliClient(**json.loads(sys.argv[1]))
+client.generate_text("hello")
+t3 = time.perf_counter()
+print(json.dumps({
+    "import_package": t1 - t0,
+    "import_client": t2 - t0,
+    "first_request": t3 - t0,
+    "requests_loaded_by_import": eager,
+}))
+"""
+
+
+def run_trial(client_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    env = dict(os.environ, PYTHONPATH=PYTHON_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, json.dumps(client_kwargs)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    return {
+        "min_ms": min(samples) * 1000,
+        "median_ms": statistics.median(samples) * 1000,
+        "p90_ms": percentile(samples, 90) * 1000,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    with StubServer() as stub:
+        kwargs = stub.client_kwargs()
+        run_trial(kwargs)  # warm the OS page cache
+        trials = [run_trial(kwargs) for _ in range(max(1, args.trials))]
+
+    result: Dict[str, Any] = {
+        "benchmark": "startup",
+        **environment(),
+        "trials": len(trials),
+        "requests_loaded_by_import": any(t["requests_loaded_by_import"] for t in trials),
+    }
+    for key in ("import_package", "import_client", "first_request"):
+        result[key] = summarize([t[key] for t in trials])
+
+    emit(result, args.out)
+    return result
+
+
+if __name__ == "__main__":
+    main()
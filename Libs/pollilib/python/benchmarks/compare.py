@@ -0,0 +1,65 @@
+"""Compare two benchmark result files and flag regressions.
+
+    python benchmarks/compare.py before.json after.json --threshold 10
+
+Prints every numeric metric present in both files with its relative change.
+Exits with status 1 when a metric got worse by more than ``--threshold``
+percent (throughput down, latency or memory up).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import flatten  # noqa: E402
+
+HIGHER_IS_BETTER = ("rps", "tokens_per_s", "events_per_s")
+IGNORED = ("requests", "trials", "wall_s", "tokens", "concurrency", "events", "chunk_bytes")
+
+
+def _load(path: str) -> Dict[str, float]:
+    with open(path, "r", encoding="utf-8") as f:
+        data: Dict[str, Any] = json.load(f)
+    # Only measurements: the stub settings and environment are context.
+    body = {k: v for k, v in data.items() if k not in ("stub", "platform", "python", "polliLib")}
+    return flatten(body)
+
+
+def compare(before: Dict[str, float], after: Dict[str, float], threshold: float) -> List[str]:
+    regressions: List[str] = []
+    for name in sorted(set(before) & set(after)):
+        metric = name.rsplit(".", 1)[-1]
+        if metric in IGNORED:
+            continue
+        old, new = before[name], after[name]
+        change = (new - old) / old * 100.0 if old else 0.0
+        worse = -change if metric in HIGHER_IS_BETTER else change
+        flag = ""
+        if worse > threshold and metric != "errors":
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:55s} {old:12.3f} -> {new:12.3f}  {change:+7.1f}%{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change counted as a regression")
+    args = parser.parse_args(argv)
+    regressions = compare(_load(args.before), _load(args.after), args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:g}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Shared helpers for the benchmark scripts: paths, stats and JSON output."""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, Optional, Sequence
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PYTHON_DIR = os.path.dirname(HERE)
+if PYTHON_DIR not in sys.path:
+    sys.path.insert(0, PYTHON_DIR)
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile, ``q`` in [0, 100]."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def latency_summary(samples: Sequence[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p90_ms": percentile(samples, 90) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": (max(samples) if samples else 0.0) * 1000,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Enough context to tell two result files apart."""
+    import polliLib
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "polliLib": polliLib.__version__,
+        "git_revision": _git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def emit(result: Dict[str, Any], out: Optional[str]) -> None:
+    text = json.dumps(result, indent=2, sort_keys=False)
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def flatten(result: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """``{"a": {"b": 1}}`` -> ``{"a.b": 1.0}``, numbers only."""
+    flat: Dict[str, float] = {}
+    for key, value in result.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
@@ -0,0 +1,313 @@
+"""Local stand-in for the Pollinations endpoints, for benchmarks.
+
+Routes (any host prefix is accepted):
+
+- ``GET /models``            model catalog (JSON)
+- ``GET /feed``              SSE feed of ``feed_events`` image/text events
+- ``GET /prompt/<prompt>``   image bytes (``image_bytes`` long)
+- ``GET /<prompt>``          text body (``text_bytes`` long)
+- ``POST /<model>``          chat completion; SSE when the body has ``"stream": true``
+
+Every response waits ``latency`` seconds first, and a fraction
+``error_rate`` of requests is answered with one of ``error_statuses``
+instead. Streams emit ``tokens`` events at ``token_rate`` per second
+(0 = unpaced).
+
+    with StubServer(StubConfig(latency=0.05)) as stub:
+        client = PolliClient(**stub.client_kwargs())
+
+``StubProcess`` runs the same server in a child interpreter so that its
+CPU and allocations stay out of the measurements.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence
+
+
+MODELS: List[Dict[str, Any]] = [
+    {"name": "openai", "tools": True, "vision": True, "input_modalities": ["text", "image"]},
+    {"name": "openai-audio", "audio": True, "input_modalities": ["text", "audio"]},
+    {"name": "flux", "output_modalities": ["image"]},
+]
+
+
+class StubConfig:
+    """Knobs for the stub's behaviour; see the module docstring."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        text_bytes: int = 256,
+        image_bytes: int = 64 * 1024,
+        tokens: int = 64,
+        token_rate: float = 0.0,
+        feed_events: int = 20,
+        error_rate: float = 0.0,
+        error_statuses: Sequence[int] = (429, 503),
+        retry_after: Optional[float] = None,
+        seed: int = 0,
+    ) -> None:
+        self.latency = max(0.0, float(latency))
+        self.text_bytes = max(0, int(text_bytes))
+        self.image_bytes = max(0, int(image_bytes))
+        self.tokens = max(0, int(tokens))
+        self.token_rate = max(0.0, float(token_rate))
+        self.feed_events = max(0, int(feed_events))
+        self.error_rate = min(1.0, max(0.0, float(error_rate)))
+        self.error_statuses = tuple(int(s) for s in error_statuses)
+        self.retry_after = retry_after
+        self.seed = seed
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+    def as_args(self) -> List[str]:
+        args: List[str] = []
+        for name, value in self.as_dict().items():
+            if value is None:
+                continue
+            if isinstance(value, tuple):
+                value = ",".join(str(v) for v in value)
+            args += [f"--{name.replace('_', '-')}", str(value)]
+        return args
+
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser) -> None:
+        d = cls()
+        parser.add_argument("--latency", type=float, default=d.latency, help="seconds before each response")
+        parser.add_argument("--text-bytes", type=int, default=d.text_bytes)
+        parser.add_argument("--image-bytes", type=int, default=d.image_bytes)
+        parser.add_argument("--tokens", type=int, default=d.tokens, help="SSE events per chat stream")
+        parser.add_argument("--token-rate", type=float, default=d.token_rate, help="SSE events per second (0 = unpaced)")
+        parser.add_argument("--feed-events", type=int, default=d.feed_events)
+        parser.add_argument("--error-rate", type=float, default=d.error_rate, help="fraction answered with an error")
+        parser.add_argument("--error-statuses", default=",".join(map(str, d.error_statuses)))
+        parser.add_argument("--retry-after", type=float, default=None)
+        parser.add_argument("--seed", type=int, default=d.seed)
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "StubConfig":
+        return cls(
+            latency=args.latency,
+            text_bytes=args.text_bytes,
+            image_bytes=args.image_bytes,
+            tokens=args.tokens,
+            token_rate=args.token_rate,
+            feed_events=args.feed_events,
+            error_rate=args.error_rate,
+            error_statuses=[int(s) for s in str(args.error_statuses).split(",") if s],
+            retry_after=args.retry_after,
+            seed=args.seed,
+        )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Small replies would otherwise sit behind the client's delayed ACK
+    # (~40 ms) and the benchmark would time the stub's TCP stall.
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        path = self.path.split("?", 1)[0]
+        if self._delay_or_fail():
+            return
+        cfg = self.server.config
+        if path.endswith("/models"):
+            self._send(200, json.dumps(MODELS).encode("utf-8"), "application/json")
+        elif path.endswith("/feed"):
+            self._sse(self._feed_event(i) for i in range(cfg.feed_events))
+        elif path.startswith("/prompt/"):
+            self._send(200, self.server.image, "image/jpeg")
+        else:
+            self._send(200, self.server.text, "text/plain; charset=utf-8")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if self._delay_or_fail():
+            return
+        try:
+            body = json.loads(raw or b"{}")
+        except ValueError:
+            body = {}
+        if body.get("stream"):
+            self._sse(self._delta(i) for i in range(self.server.config.tokens))
+            return
+        reply = {"choices": [{"message": {"role": "assistant", "content": self.server.text.decode("ascii")}}]}
+        self._send(200, json.dumps(reply).encode("utf-8"), "application/json")
+
+    # ----- helpers -----
+    def _delay_or_fail(self) -> bool:
+        cfg = self.server.config
+        if cfg.latency:
+            time.sleep(cfg.latency)
+        status = self.server.injected_error()
+        if status is None:
+            return False
+        headers = {"Retry-After": str(cfg.retry_after)} if cfg.retry_after is not None else {}
+        self._send(status, b'{"error": "injected"}', "application/json", headers)
+        return True
+
+    def _delta(self, i: int) -> str:
+        return json.dumps({"choices": [{"delta": {"content": f"tok{i} "}}]})
+
+    def _feed_event(self, i: int) -> str:
+        return json.dumps({"prompt": f"event {i}", "model": "flux", "seed": i})
+
+    def _send(self, status: int, body: bytes, ctype: str, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        # Headers and body in one write, so a reply is a single segment.
+        self._headers_buffer.append(b"\r\n" + body)
+        self.flush_headers()
+
+    def _sse(self, events: Any) -> None:
+        rate = self.server.config.token_rate
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for data in events:
+            self._chunk(f"data: {data}\n\n".encode("utf-8"))
+            if rate:
+                time.sleep(1.0 / rate)
+        self._chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: Any, config: StubConfig) -> None:
+        super().__init__(address, _Handler)
+        self.config = config
+        self.text = (b"lorem ipsum " * (config.text_bytes // 12 + 1))[: config.text_bytes]
+        self.image = os.urandom(config.image_bytes)
+        self._rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+
+    def injected_error(self) -> Optional[int]:
+        cfg = self.config
+        if not cfg.error_rate or not cfg.error_statuses:
+            return None
+        with self._rng_lock:
+            if self._rng.random() >= cfg.error_rate:
+                return None
+            return self._rng.choice(cfg.error_statuses)
+
+
+def client_kwargs(url: str) -> Dict[str, Any]:
+    """PolliClient keyword arguments pointing every endpoint at ``url``."""
+    return {
+        "text_url": f"{url}/models",
+        "image_url": f"{url}/models",
+        "text_prompt_base": url,
+        "image_prompt_base": f"{url}/prompt",
+        "min_request_interval": 0,
+    }
+
+
+class StubServer:
+    """Serves the stub on 127.0.0.1 from a background thread."""
+
+    def __init__(self, config: Optional[StubConfig] = None, port: int = 0) -> None:
+        self.config = config or StubConfig()
+        self._server = _Server(("127.0.0.1", port), self.config)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def client_kwargs(self) -> Dict[str, Any]:
+        return client_kwargs(self.url)
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+class StubProcess:
+    """Runs the stub in a child interpreter (``python stub_server.py``)."""
+
+    def __init__(self, config: Optional[StubConfig] = None) -> None:
+        self.config = config or StubConfig()
+        self.url = ""
+        self._proc: Optional[subprocess.Popen] = None
+
+    def client_kwargs(self) -> Dict[str, Any]:
+        return client_kwargs(self.url)
+
+    def start(self) -> "StubProcess":
+        cmd = [sys.executable, os.path.abspath(__file__), "--port", "0", *self.config.as_args()]
+        self._proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+        assert self._proc.stdout is not None
+        line = self._proc.stdout.readline().strip()
+        if not line.startswith("http://"):
+            self.stop()
+            raise RuntimeError(f"stub server failed to start: {line!r}")
+        self.url = line
+        return self
+
+    def stop(self) -> None:
+        if self._proc is not None:
+            self._proc.terminate()
+            self._proc.wait(5)
+            self._proc = None
+
+    def __enter__(self) -> "StubProcess":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in Pollinations server.")
+    parser.add_argument("--port", type=int, default=8765)
+    StubConfig.add_arguments(parser)
+    args = parser.parse_args(argv)
+    server = StubServer(StubConfig.from_args(args), port=args.port).start()
+    print(server.url, flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,14 @@ polliLib: Modular Pollinations client library.
 
 Usage (simple façade):
     from polliLib import (
-        PolliClient,
+        PolliClient, AsyncPolliClient, DeadlineExceeded,
+        BreakerPolicy, CircuitOpenError, MetricsRegistry, MetricsSink,
+        TraceListener, CallTrace, BatchResult, BatchProgress,
         list_models, get_model_by_name, get_field,
-        generate_image, save_image_timestamped, fetch_image,
-        generate_text,
+        generate_image, generate_images_batch, save_image_timestamped, fetch_image,
+        generate_text, generate_text_stream, map_text,
         chat_completion, chat_completion_stream, chat_completion_tools,
+        chat_completion_tools_stream, map_chat,
         transcribe_audio,
         analyze_image_url, analyze_image_file,
         image_feed_stream, text_feed_stream,
@@ -19,22 +22,61 @@ Run examples:
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
-
-from .client import PolliClient
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from .aio import AsyncPolliClient
+    from .base import DeadlineExceeded, Model, ModelType
+    from .batch import BatchProgress, BatchResult, Progress
+    from .breaker import BreakerPolicy, CircuitOpenError
+    from .client import PolliClient
+    from .metrics import MetricsRegistry, MetricsSink
+    from .trace import CallTrace, TraceListener
+
+# Classes are imported on first access (PEP 562) so that ``import polliLib``
+# does not load requests and every mixin up front.
+_LAZY: Dict[str, str] = {
+    "PolliClient": ".client",
+    "AsyncPolliClient": ".aio",
+    "DeadlineExceeded": ".base",
+    "BreakerPolicy": ".breaker",
+    "CircuitOpenError": ".breaker",
+    "MetricsRegistry": ".metrics",
+    "MetricsSink": ".metrics",
+    "TraceListener": ".trace",
+    "CallTrace": ".trace",
+    "BatchResult": ".batch",
+    "BatchProgress": ".batch",
+}
 
 __all__ = [
     "PolliClient",
+    "AsyncPolliClient",
+    "DeadlineExceeded",
+    "BreakerPolicy",
+    "CircuitOpenError",
+    "MetricsRegistry",
+    "MetricsSink",
+    "TraceListener",
+    "CallTrace",
+    "BatchResult",
+    "BatchProgress",
     "list_models",
     "get_model_by_name",
     "get_field",
     "generate_image",
+    "generate_images_batch",
     "save_image_timestamped",
     "fetch_image",
     "generate_text",
+    "generate_text_stream",
+    "map_text",
     "chat_completion",
     "chat_completion_stream",
     "chat_completion_tools",
+    "chat_completion_tools_stream",
+    "map_chat",
     "transcribe_audio",
     "analyze_image_url",
     "analyze_image_file",
@@ -46,12 +88,27 @@ __all__ = [
 __version__ = "1.0.1"
 
 
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
 _default_client: Optional[PolliClient] = None
 
 
 def _client() -> PolliClient:
     global _default_client
     if _default_client is None:
+        from .client import PolliClient
+
         _default_client = PolliClient()
     return _default_client
 
@@ -65,6 +122,8 @@ def get_model_by_name(name: str, kind: Optional["ModelType"] = None) -> Optional
 
 
 def get_field(model: "Model", field: str, default: Any = None) -> Any:
+    from .client import PolliClient
+
     return PolliClient.get(model, field, default)
 
 
@@ -80,6 +139,7 @@ def generate_image(
     referrer: Optional[str] = None,
     token: Optional[str] = None,
     timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
     out_path: Optional[str] = None,
     chunk_size: int = 1024 * 64,
 ) -> bytes | str:
@@ -94,11 +154,47 @@ def generate_image(
         referrer=referrer,
         token=token,
         timeout=timeout,
+        deadline=deadline,
         out_path=out_path,
         chunk_size=chunk_size,
     )
 
 
+def generate_images_batch(
+    specs: "Iterable[Any]",
+    *,
+    out_dir: Optional[str] = None,
+    workers: int = 4,
+    ordered: bool = False,
+    progress: "Progress" = None,
+    width: int = 512,
+    height: int = 512,
+    model: str = "flux",
+    nologo: bool = True,
+    referrer: Optional[str] = None,
+    token: Optional[str] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+    ext: str = "jpeg",
+) -> "Iterator[BatchResult]":
+    return _client().generate_images_batch(
+        specs,
+        out_dir=out_dir,
+        workers=workers,
+        ordered=ordered,
+        progress=progress,
+        width=width,
+        height=height,
+        model=model,
+        nologo=nologo,
+        referrer=referrer,
+        token=token,
+        timeout=timeout,
+        deadline=deadline,
+        ext=ext,
+    )
+
+
 def save_image_timestamped(
     prompt: str,
     *,
@@ -110,6 +206,7 @@ def save_image_timestamped(
     referrer: Optional[str] = None,
     token: Optional[str] = None,
     timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
     images_dir: Optional[str] = None,
     filename_prefix: str = "",
     filename_suffix: str = "",
@@ -125,6 +222,7 @@ def save_image_timestamped(
         referrer=referrer,
         token=token,
         timeout=timeout,
+        deadline=deadline,
         images_dir=images_dir,
         filename_prefix=filename_prefix,
         filename_suffix=filename_suffix,
@@ -138,6 +236,7 @@ def fetch_image(
     referrer: Optional[str] = None,
     token: Optional[str] = None,
     timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
     out_path: Optional[str] = None,
     chunk_size: int = 1024 * 64,
 ) -> bytes | str:
@@ -146,6 +245,7 @@ def fetch_image(
         referrer=referrer,
         token=token,
         timeout=timeout,
+        deadline=deadline,
         out_path=out_path,
         chunk_size=chunk_size,
     )
@@ -161,6 +261,7 @@ def generate_text(
     token: Optional[str] = None,
     as_json: bool = False,
     timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
 ):
     return _client().generate_text(
         prompt,
@@ -171,6 +272,61 @@ def generate_text(
         token=token,
         as_json=as_json,
         timeout=timeout,
+        deadline=deadline,
+    )
+
+
+def generate_text_stream(
+    prompt: str,
+    *,
+    model: str = "openai",
+    seed: Optional[int] = None,
+    system: Optional[str] = None,
+    referrer: Optional[str] = None,
+    token: Optional[str] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+):
+    return _client().generate_text_stream(
+        prompt,
+        model=model,
+        seed=seed,
+        system=system,
+        referrer=referrer,
+        token=token,
+        timeout=timeout,
+        deadline=deadline,
+    )
+
+
+def map_text(
+    prompts: "Iterable[Any]",
+    *,
+    workers: int = 4,
+    ordered: bool = True,
+    progress: "Progress" = None,
+    model: str = "openai",
+    seed: Optional[int] = None,
+    system: Optional[str] = None,
+    referrer: Optional[str] = None,
+    token: Optional[str] = None,
+    as_json: bool = False,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+) -> "Iterator[BatchResult]":
+    return _client().map_text(
+        prompts,
+        workers=workers,
+        ordered=ordered,
+        progress=progress,
+        model=model,
+        seed=seed,
+        system=system,
+        referrer=referrer,
+        token=token,
+        as_json=as_json,
+        timeout=timeout,
+        deadline=deadline,
     )
 
 
@@ -184,6 +340,7 @@ def chat_completion(
     token: Optional[str] = None,
     as_json: bool = False,
     timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
 ):
     return _client().chat_completion(
         messages,
@@ -194,6 +351,7 @@ def chat_completion(
         token=token,
         as_json=as_json,
         timeout=timeout,
+        deadline=deadline,
     )
 
 
@@ -206,6 +364,7 @@ def chat_completion_stream(
     referrer: Optional[str] = None,
     token: Optional[str] = None,
     timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
     yield_raw_events: bool = False,
 ):
     return _client().chat_completion_stream(
@@ -216,6 +375,7 @@ def chat_completion_stream(
         referrer=referrer,
         token=token,
         timeout=timeout,
+        deadline=deadline,
         yield_raw_events=yield_raw_events,
     )
 
@@ -233,7 +393,11 @@ def chat_completion_tools(
     token: Optional[str] = None,
     as_json: bool = False,
     timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
     max_rounds: int = 1,
+    tool_workers: int = 1,
+    tool_timeout: Optional[float] = None,
+    memoize: Any = None,
 ):
     return _client().chat_completion_tools(
         messages,
@@ -247,7 +411,81 @@ def chat_completion_tools(
         token=token,
         as_json=as_json,
         timeout=timeout,
+        deadline=deadline,
+        max_rounds=max_rounds,
+        tool_workers=tool_workers,
+        tool_timeout=tool_timeout,
+        memoize=memoize,
+    )
+
+
+def chat_completion_tools_stream(
+    messages: List[Dict[str, Any]],
+    *,
+    tools: List[Dict[str, Any]],
+    functions: Optional[Dict[str, "Callable[..., Any]"]] = None,
+    tool_choice: Any = "auto",
+    model: str = "openai",
+    seed: Optional[int] = None,
+    private: Optional[bool] = None,
+    referrer: Optional[str] = None,
+    token: Optional[str] = None,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+    max_rounds: int = 1,
+    yield_tool_results: bool = False,
+    tool_workers: int = 1,
+    tool_timeout: Optional[float] = None,
+    memoize: Any = None,
+):
+    return _client().chat_completion_tools_stream(
+        messages,
+        tools=tools,
+        functions=functions,
+        tool_choice=tool_choice,
+        model=model,
+        seed=seed,
+        private=private,
+        referrer=referrer,
+        token=token,
+        timeout=timeout,
+        deadline=deadline,
         max_rounds=max_rounds,
+        yield_tool_results=yield_tool_results,
+        tool_workers=tool_workers,
+        tool_timeout=tool_timeout,
+        memoize=memoize,
+    )
+
+
+def map_chat(
+    conversations: "Iterable[Any]",
+    *,
+    workers: int = 4,
+    ordered: bool = True,
+    progress: "Progress" = None,
+    model: str = "openai",
+    seed: Optional[int] = None,
+    private: Optional[bool] = None,
+    referrer: Optional[str] = None,
+    token: Optional[str] = None,
+    as_json: bool = False,
+    timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
+) -> "Iterator[BatchResult]":
+    return _client().map_chat(
+        conversations,
+        workers=workers,
+        ordered=ordered,
+        progress=progress,
+        model=model,
+        seed=seed,
+        private=private,
+        referrer=referrer,
+        token=token,
+        as_json=as_json,
+        timeout=timeout,
+        deadline=deadline,
     )
 
 
@@ -260,6 +498,7 @@ def transcribe_audio(
     referrer: Optional[str] = None,
     token: Optional[str] = None,
     timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
 ):
     return _client().transcribe_audio(
         audio_path,
@@ -269,6 +508,7 @@ def transcribe_audio(
         referrer=referrer,
         token=token,
         timeout=timeout,
+        deadline=deadline,
     )
 
 
@@ -281,6 +521,7 @@ def analyze_image_url(
     referrer: Optional[str] = None,
     token: Optional[str] = None,
     timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
     as_json: bool = False,
 ):
     return _client().analyze_image_url(
@@ -291,6 +532,7 @@ def analyze_image_url(
         referrer=referrer,
         token=token,
         timeout=timeout,
+        deadline=deadline,
         as_json=as_json,
     )
 
@@ -304,6 +546,7 @@ def analyze_image_file(
     referrer: Optional[str] = None,
     token: Optional[str] = None,
     timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
     as_json: bool = False,
 ):
     return _client().analyze_image_file(
@@ -314,6 +557,7 @@ def analyze_image_file(
         referrer=referrer,
         token=token,
         timeout=timeout,
+        deadline=deadline,
         as_json=as_json,
     )
 
@@ -323,6 +567,7 @@ def image_feed_stream(
     referrer: Optional[str] = None,
     token: Optional[str] = None,
     timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
     reconnect: bool = False,
     retry_delay: float = 10.0,
     yield_raw_events: bool = False,
@@ -333,6 +578,7 @@ def image_feed_stream(
         referrer=referrer,
         token=token,
         timeout=timeout,
+        deadline=deadline,
         reconnect=reconnect,
         retry_delay=retry_delay,
         yield_raw_events=yield_raw_events,
@@ -346,6 +592,7 @@ def text_feed_stream(
     referrer: Optional[str] = None,
     token: Optional[str] = None,
     timeout: Optional[float] = None,
+    deadline: Optional[float] = None,
     reconnect: bool = False,
     retry_delay: float = 10.0,
     yield_raw_events: bool = False,
@@ -354,6 +601,7 @@ def text_feed_stream(
         referrer=referrer,
         token=token,
         timeout=timeout,
+        deadline=deadline,
         reconnect=reconnect,
         retry_delay=retry_delay,
         yield_raw_events=yield_raw_events,
@@ -0,0 +1,1255 @@
+from __future__ import annotations
+
+import asyncio
+import codecs
+import contextlib
+import copy
+import functools
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .base import BaseClient, Call, DeadlineExceeded, Model, ModelType
+from .batch import BatchResult, Progress, arun_batch, remaining, spec_kwargs
+from .cache import copy_file, replacing
+from .catalog import ModelIndex
+from .flight import AsyncSingleFlight, FlightTimeout
+from .sse import aiter_events, loads as _loads
+from .images import ImageMixin, ImageSpec
+from .text import TextMixin
+from .chat import ChatMixin, ToolCallAssembler, ToolMemo
+from .stt import STTMixin
+from .vision import VisionMixin
+from .feeds import FeedsMixin, IMAGE_FEED_URL, TEXT_FEED_URL
+
+
+class AsyncBaseClient(BaseClient):
+    """BaseClient counterpart for asyncio.
+
+    ``session`` is an ``httpx.AsyncClient`` (or anything with the same
+    ``request``/``build_request``/``send`` surface). When omitted one is
+    created on demand, which requires the optional ``httpx`` dependency.
+    Timeout and retry settings are the same keyword arguments BaseClient takes.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        session: Any = None,
+        sleep: Optional[Callable[[float], Awaitable[None]]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._owns_session = session is None
+        if session is None:
+            session = self._default_session()
+        super().__init__(*args, session=session, **kwargs)
+        self._sleep = sleep or asyncio.sleep  # type: ignore[assignment]
+        self._refresh_tasks: Set["asyncio.Task[None]"] = set()
+
+    @staticmethod
+    def _default_session() -> Any:
+        try:
+            import httpx
+        except ImportError as exc:  # pragma: no cover - depends on environment
+            raise ImportError(
+                "AsyncPolliClient needs the optional 'httpx' package (pip install httpx) "
+                "or an explicit session="
+            ) from exc
+        return httpx.AsyncClient(follow_redirects=True)
+
+    async def aclose(self) -> None:
+        if self._owns_session:
+            await self.session.aclose()
+
+    async def __aenter__(self) -> "AsyncBaseClient":
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        await self.aclose()
+
+    async def list_models(  # type: ignore[override]
+        self, kind: ModelType, deadline: Optional[float] = None
+    ) -> List[Model]:
+        return await self._alist_models(kind, self._expires_at(deadline))
+
+    async def _alist_models(self, kind: ModelType, expires: Optional[float]) -> List[Model]:
+        hit = self._catalog.lookup(kind)
+        if hit is None:
+            return await self._aload_models(kind, expires)
+        models, fresh = hit
+        if not fresh and self._catalog.begin_refresh(kind):
+            task = asyncio.ensure_future(self._arefresh_models(kind))
+            self._refresh_tasks.add(task)
+            task.add_done_callback(self._refresh_tasks.discard)
+        return models  # type: ignore[return-value]
+
+    async def _aload_models(self, kind: ModelType, expires: Optional[float] = None) -> List[Model]:
+        call = Call("GET", self._url(kind), endpoint="models", timeout=self.timeout, expires=expires)
+        models = self._normalize_models(await self._request_json(call))
+        self._catalog.store(kind, models)  # type: ignore[arg-type]
+        return models
+
+    async def _arefresh_models(self, kind: ModelType) -> None:
+        try:
+            await self._aload_models(kind)
+        except Exception:
+            pass
+        finally:
+            self._catalog.end_refresh(kind)
+
+    async def get_model_by_name(  # type: ignore[override]
+        self,
+        name: str,
+        kind: Optional[ModelType] = None,
+        include_aliases: bool = True,
+        case_insensitive: bool = True,
+        deadline: Optional[float] = None,
+    ) -> Optional[Model]:
+        expires = self._expires_at(deadline)
+        for k in (kind,) if kind else ("text", "image"):
+            hit = (await self._amodel_index(k, expires)).find(name, include_aliases, case_insensitive)
+            if hit is not None:
+                return hit  # type: ignore[return-value]
+        return None
+
+    async def models_with(  # type: ignore[override]
+        self, field: str, value: Any = True, kind: Optional[ModelType] = None, deadline: Optional[float] = None
+    ) -> List[Model]:
+        expires = self._expires_at(deadline)
+        out: List[Model] = []
+        for k in (kind,) if kind else ("text", "image"):
+            out.extend((await self._amodel_index(k, expires)).with_feature(field, value))  # type: ignore[arg-type]
+        return out
+
+    async def model_supports(  # type: ignore[override]
+        self,
+        name: str,
+        field: str,
+        value: Any = True,
+        kind: Optional[ModelType] = None,
+        deadline: Optional[float] = None,
+    ) -> bool:
+        m = await self.get_model_by_name(name, kind=kind, deadline=deadline)
+        return m is not None and self._has_feature(m, field, value)
+
+    async def _amodel_index(self, kind: ModelType, expires: Optional[float] = None) -> ModelIndex:
+        models = await self._alist_models(kind, expires)
+        return self._catalog.index(kind) or ModelIndex(models)  # type: ignore[arg-type]
+
+    # ----- request pipeline (async mirror of BaseClient._request) -----
+    async def _request(self, call: Call) -> Any:  # type: ignore[override]
+        if call.hedge and self._hedger is not None:
+            return await self._hedged_request(call)
+        while True:
+            await self._admit(call)
+            async with self._in_flight(call):
+                # Admitted only now, right before sending, so that nothing can
+                # end the attempt between taking a half-open probe and returning it.
+                self._breaker_acquire(call)
+                sent = time.monotonic()
+                clamped = call.clamped()
+                try:
+                    resp = await self._transmit(call)
+                except BaseException as exc:
+                    self._attempt_failed(call, exc, clamped)
+                    if self._retry_error(call, exc):
+                        self._retried(call, type(exc).__name__)
+                        continue
+                    raise
+            self._breaker_record(call, resp.status_code not in self._breaker_statuses)
+            if self._instr is not None:
+                self._instr.response(call, resp.status_code, time.monotonic() - sent, self._sent_size(resp))
+            if self._retry_response(call, resp):
+                await resp.aclose()
+                self._retried(call, str(resp.status_code))
+                continue
+            try:
+                resp.raise_for_status()
+            except Exception:
+                await resp.aclose()
+                raise
+            self._mark_success(call)
+            if self._instr is not None and not call.stream:
+                self._instr.first_byte(call, time.monotonic() - call.started)
+            return resp
+
+    async def _admit(self, call: Call) -> None:  # type: ignore[override]
+        wait_for = self._attempt_delay(call)
+        try:
+            self._check_deadline(call, wait_for)
+            if wait_for <= 0:
+                return
+            await self._sleep(wait_for)
+            extra = self._slot_wait(call)
+            while extra > 0:
+                self._check_deadline(call, extra)
+                await self._sleep(extra)
+                wait_for += extra
+                extra = self._slot_wait(call)
+            if self._instr is not None:
+                self._instr.wait(call, wait_for, "backoff" if call.attempt else "rate_limit")
+            self._check_deadline(call)
+        except DeadlineExceeded:
+            self._unreserve(call)
+            raise
+
+    @contextlib.asynccontextmanager
+    async def _in_flight(self, call: Call) -> AsyncIterator[None]:  # type: ignore[override]
+        gate = self._tenant_gate(call)
+        if gate is None:
+            yield
+            return
+        try:
+            await asyncio.wait_for(gate.acquire(), call.remaining())
+        except asyncio.TimeoutError as exc:
+            raise DeadlineExceeded(f"{call.method} {call.url}: deadline exceeded waiting for a tenant slot") from exc
+        try:
+            yield
+        finally:
+            gate.release()
+
+    @staticmethod
+    def _new_gate(limit: int) -> Any:
+        return asyncio.Semaphore(limit)
+
+    @staticmethod
+    def _new_flights() -> Any:
+        return AsyncSingleFlight()
+
+    async def _coalesced(self, call: Call, fn: Callable[[], Awaitable[Any]], *variant: Any) -> Any:  # type: ignore[override]
+        if self._flights is None or not call.coalesce:
+            return await fn()
+        try:
+            result, shared = await self._flights.do(
+                call.key() + variant, fn, timeout=call.remaining(), rerun=(DeadlineExceeded,)
+            )
+        except FlightTimeout as exc:
+            raise DeadlineExceeded(f"{call.method} {call.url}: deadline exceeded waiting for a shared request") from exc
+        return copy.deepcopy(result) if shared and isinstance(result, (dict, list)) else result
+
+    async def _cached(self, call: Call, fetch: Callable[[], Awaitable[bytes]]) -> bytes:  # type: ignore[override]
+        key = self._cache_key(call)
+        if key is None:
+            return await fetch()
+        assert self._cache is not None
+        hit = await asyncio.to_thread(self._cache.get, key)
+        if hit is not None:
+            return hit
+        data = await fetch()
+        await asyncio.to_thread(self._cache.put, key, data)
+        return data
+
+    async def _cached_json(self, call: Call) -> Any:  # type: ignore[override]
+        if self._cache_key(call) is None:
+            return await self._request_json(call)
+
+        async def upstream() -> bytes:
+            return json.dumps(await self._request_json(call)).encode("utf-8")
+
+        return json.loads(await self._cached(call, upstream))
+
+    async def _cached_file(  # type: ignore[override]
+        self, call: Call, out_path: str, fetch: Callable[[], Awaitable[str]]
+    ) -> str:
+        key = self._cache_key(call)
+        if key is None:
+            return await fetch()
+        assert self._cache is not None
+        if await asyncio.to_thread(self._cache.get_file, key, out_path):
+            return out_path
+        path = await fetch()
+        await asyncio.to_thread(self._cache.put_file, key, path)
+        return path
+
+    async def _hedged_request(self, call: Call) -> Any:  # type: ignore[override]
+        hedger = self._hedger
+        assert hedger is not None
+        await self._admit(call)
+        delay = hedger.delay(call.endpoint)
+        if delay is None:
+            return await self._timed_leg(call.copy(hedge=False, throttle=False))
+        primary = asyncio.ensure_future(self._timed_leg(call.copy(hedge=False, throttle=False)))
+        legs = {primary}
+        try:
+            done, pending = await asyncio.wait(legs, timeout=delay)
+            if not done and self._hedge_token(call):
+                legs.add(asyncio.ensure_future(self._timed_leg(call.copy(hedge=False, throttle=False))))
+                pending = set(legs)
+            errors = []
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            hedger.hedge_won(call.endpoint)
+                        legs.discard(task)
+                        return task.result()
+                    errors.append(task.exception())
+                if not pending:
+                    raise errors[0]
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in legs:
+                if not task.done():
+                    task.cancel()
+                task.add_done_callback(self._close_leg)
+
+    async def _timed_leg(self, call: Call) -> Any:  # type: ignore[override]
+        started = time.monotonic()
+        resp = await self._request(call)
+        if self._hedger is not None:
+            self._hedger.observe(call.endpoint, time.monotonic() - started)
+        return resp
+
+    @staticmethod
+    def _close_leg(task: Any) -> None:  # type: ignore[override]
+        if not task.cancelled() and task.exception() is None:
+            asyncio.ensure_future(task.result().aclose())
+
+    async def _transmit(self, call: Call) -> Any:  # type: ignore[override]
+        kw = call.kwargs()
+        if call.trace is not None:
+            kw["extensions"] = {"trace": self._connect_probe(call)}
+        if call.stream:
+            request = self.session.build_request(call.method, call.url, **kw)
+            return await self.session.send(request, stream=True)
+        return await self.session.request(call.method, call.url, **kw)
+
+    def _connect_probe(self, call: Call) -> Callable[[str, Any], Awaitable[None]]:
+        # httpx "trace" extension: reports connection setup as the time from
+        # the TCP connect starting until the request headers go out.
+        began: List[float] = []
+
+        async def probe(event: str, info: Any) -> None:
+            if event == "connection.connect_tcp.started":
+                began.append(time.monotonic())
+            elif began and event.endswith("send_request_headers.started"):
+                assert self._instr is not None
+                self._instr.connect(call, time.monotonic() - began.pop())
+
+        return probe
+
+    async def _stream(  # type: ignore[override]
+        self, call: Call, read: Callable[[Any], AsyncIterator[Any]]
+    ) -> AsyncIterator[Any]:
+        call.stream = True
+        instr = self._instr
+        nbytes = 0
+        error: Optional[BaseException] = None
+        if instr is not None:
+            instr.start(call)
+        try:
+            while True:
+                resp = await self._request(call)
+                started = False
+                try:
+                    async for item in read(resp):
+                        self._check_deadline(call)
+                        if instr is not None:
+                            if not started:
+                                instr.first_byte(call, time.monotonic() - call.started)
+                            nbytes += len(item) if item else 0
+                        started = True
+                        yield item
+                    return
+                except DeadlineExceeded:
+                    raise
+                except Exception as exc:
+                    if isinstance(exc, self._transient_errors()):
+                        self._check_deadline(call, cause=exc)
+                    if started or not self._retry_error(call, exc):
+                        raise
+                    self._retried(call, type(exc).__name__)
+                finally:
+                    await resp.aclose()
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            if instr is not None:
+                instr.finish(call, time.monotonic() - call.started, error, nbytes)
+
+    async def _sse_stream(self, call: Call) -> AsyncIterator[str]:  # type: ignore[override]
+        first = self._instr is not None
+        async for data in self._stream(call, lambda r: self._asse_events(r.aiter_bytes())):
+            if first:
+                first = False
+                self._instr.first_token(call, time.monotonic() - call.started)
+            yield data
+
+    @staticmethod
+    async def _asse_events(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+        async for event in aiter_events(chunks):
+            if event.data == "[DONE]":
+                return
+            yield event.data
+
+    async def _fetch(self, call: Call, read: Callable[[Any], Any]) -> Any:  # type: ignore[override]
+        if self._instr is None:
+            resp = await self._request(call)
+            try:
+                return read(resp)
+            finally:
+                await resp.aclose()
+        nbytes = 0
+        self._instr.start(call)
+        try:
+            resp = await self._request(call)
+            try:
+                value = read(resp)
+                nbytes = self._body_size(resp)
+            finally:
+                await resp.aclose()
+        except BaseException as exc:
+            self._instr.finish(call, time.monotonic() - call.started, exc, nbytes)
+            raise
+        self._instr.finish(call, time.monotonic() - call.started, None, nbytes)
+        return value
+
+    async def _request_json(self, call: Call) -> Any:  # type: ignore[override]
+        return await self._fetch(call, lambda r: r.json())
+
+    async def _request_text(self, call: Call) -> str:  # type: ignore[override]
+        return await self._fetch(call, lambda r: r.text)
+
+    async def _request_content(self, call: Call) -> bytes:  # type: ignore[override]
+        return await self._fetch(call, lambda r: r.content)
+
+    def _transient_errors(self) -> Tuple[type, ...]:
+        errors = super()._transient_errors()
+        try:
+            import httpx
+        except ImportError:
+            return errors
+        return errors + (httpx.TransportError,)
+
+    def _timeout_errors(self) -> Tuple[type, ...]:
+        errors = super()._timeout_errors()
+        try:
+            import httpx
+        except ImportError:
+            return errors
+        return errors + (httpx.TimeoutException,)
+
+
+class AsyncTextMixin(TextMixin):
+    async def generate_text(  # type: ignore[override]
+        self,
+        prompt: str,
+        *,
+        model: str = "openai",
+        seed: Optional[int] = None,
+        system: Optional[str] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        as_json: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        call = self._text_call(prompt, model, seed, system, referrer, token, as_json, timeout, deadline)
+
+        async def fetch() -> Any:
+            async def upstream() -> bytes:
+                if call.method == "GET":
+                    return (await self._request_text(call)).encode("utf-8")
+                return (self._chat_result(await self._request_json(call)) or "").encode("utf-8")
+
+            raw = await self._cached(call, upstream)
+            return self._decode_text(raw.decode("utf-8"), as_json)
+
+        return await self._coalesced(call, fetch)
+
+    async def generate_text_stream(  # type: ignore[override]
+        self,
+        prompt: str,
+        *,
+        model: str = "openai",
+        seed: Optional[int] = None,
+        system: Optional[str] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        call = self._text_call(prompt, model, seed, system, referrer, token, False, timeout, deadline, stream=True)
+        if call.json is not None:
+            async for data in self._sse_stream(call):
+                content = self._delta_content(data)
+                if content:
+                    yield content
+            return
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        async for chunk in self._stream(call, lambda r: r.aiter_bytes()):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    async def map_text(  # type: ignore[override]
+        self,
+        prompts: Iterable[Any],
+        *,
+        workers: int = 4,
+        ordered: bool = True,
+        progress: Progress = None,
+        model: str = "openai",
+        seed: Optional[int] = None,
+        system: Optional[str] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        as_json: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[BatchResult]:
+        shared = {
+            "model": model,
+            "seed": seed,
+            "system": system,
+            "referrer": referrer,
+            "token": token,
+            "as_json": as_json,
+            "timeout": timeout,
+        }
+        expires = self._expires_at(deadline)
+
+        async def one(index: int, spec: Any) -> Any:
+            return await self.generate_text(deadline=remaining(expires), **spec_kwargs(spec, "prompt", shared))
+
+        async for result in arun_batch(prompts, one, workers=workers, ordered=ordered, progress=progress):
+            yield result
+
+
+class AsyncImageMixin(ImageMixin):
+    async def generate_image(  # type: ignore[override]
+        self,
+        prompt: str,
+        *,
+        width: int = 512,
+        height: int = 512,
+        model: str = "flux",
+        seed: Optional[int] = None,
+        nologo: bool = True,
+        image: Optional[str] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        out_path: Optional[str] = None,
+        chunk_size: int = 1024 * 64,
+    ) -> bytes | str:
+        url, params = self._image_request(
+            prompt,
+            width=width,
+            height=height,
+            model=model,
+            seed=seed,
+            nologo=nologo,
+            image=image,
+            referrer=referrer,
+            token=token,
+        )
+        call = Call(
+            "GET",
+            url,
+            endpoint="image",
+            op="generate_image",
+            model=model,
+            params=params,
+            timeout=self._resolve_timeout(timeout, 300.0),
+            expires=self._expires_at(deadline),
+            hedge=seed is not None,
+            coalesce=seed is not None,
+            cache=seed is not None,
+        )
+        return await self._download(call, out_path, chunk_size)
+
+    async def save_image_timestamped(  # type: ignore[override]
+        self,
+        prompt: str,
+        *,
+        width: int = 512,
+        height: int = 512,
+        model: str = "flux",
+        nologo: bool = True,
+        image: Optional[str] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        images_dir: Optional[str] = None,
+        filename_prefix: str = "",
+        filename_suffix: str = "",
+        ext: str = "jpeg",
+    ) -> str:
+        out_path = self._timestamped_path(images_dir, filename_prefix, filename_suffix, ext)
+        return await self.generate_image(
+            prompt,
+            width=width,
+            height=height,
+            model=model,
+            seed=None,
+            nologo=nologo,
+            image=image,
+            referrer=referrer,
+            token=token,
+            timeout=timeout,
+            deadline=deadline,
+            out_path=out_path,
+        )
+
+    async def fetch_image(  # type: ignore[override]
+        self,
+        image_url: str,
+        *,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        out_path: Optional[str] = None,
+        chunk_size: int = 1024 * 64,
+    ) -> bytes | str:
+        call = Call(
+            "GET",
+            image_url,
+            endpoint="image",
+            op="fetch_image",
+            params=self._fetch_params(referrer, token),
+            timeout=self._resolve_timeout(timeout, 120.0),
+            expires=self._expires_at(deadline),
+            coalesce=True,
+        )
+        return await self._download(call, out_path, chunk_size)
+
+    async def generate_images_batch(  # type: ignore[override]
+        self,
+        specs: Iterable[ImageSpec],
+        *,
+        out_dir: Optional[str] = None,
+        workers: int = 4,
+        ordered: bool = False,
+        progress: Progress = None,
+        width: int = 512,
+        height: int = 512,
+        model: str = "flux",
+        nologo: bool = True,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        ext: str = "jpeg",
+    ) -> AsyncIterator[BatchResult]:
+        shared = {
+            "width": width,
+            "height": height,
+            "model": model,
+            "nologo": nologo,
+            "referrer": referrer,
+            "token": token,
+            "timeout": timeout,
+        }
+        expires = self._expires_at(deadline)
+        if out_dir:
+            await asyncio.to_thread(os.makedirs, out_dir, exist_ok=True)
+
+        async def one(index: int, spec: ImageSpec) -> bytes | str:
+            kwargs = self._batch_image_kwargs(index, spec, shared, out_dir, ext)
+            return await self.generate_image(deadline=remaining(expires), **kwargs)
+
+        async for result in arun_batch(specs, one, workers=workers, ordered=ordered, progress=progress):
+            yield result
+
+    async def _download(  # type: ignore[override]
+        self, call: Call, out_path: Optional[str], chunk_size: int
+    ) -> bytes | str:
+        if out_path:
+            path = await self._coalesced(
+                call,
+                lambda: self._cached_file(call, out_path, lambda: self._stream_to_file(call, out_path, chunk_size)),
+                "file",
+            )
+            if path != out_path:
+                await asyncio.to_thread(copy_file, path, out_path)
+            return out_path
+        return await self._coalesced(call, lambda: self._cached(call, lambda: self._request_content(call)))
+
+    async def _stream_to_file(self, call: Call, out_path: str, chunk_size: int) -> str:  # type: ignore[override]
+        with replacing(out_path) as tmp:
+            f = await asyncio.to_thread(open, tmp, "wb")
+            try:
+                async for chunk in self._stream(call, lambda r: r.aiter_bytes(chunk_size)):
+                    if chunk:
+                        await asyncio.to_thread(f.write, chunk)
+            finally:
+                await asyncio.to_thread(f.close)
+        return out_path
+
+
+class AsyncChatMixin(ChatMixin):
+    async def chat_completion(  # type: ignore[override]
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: str = "openai",
+        seed: Optional[int] = None,
+        private: Optional[bool] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        as_json: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> Any:
+        payload = self._chat_payload(
+            messages,
+            model=model,
+            seed=seed,
+            private=private,
+            referrer=referrer,
+            token=token,
+        )
+        call = Call(
+            "POST",
+            f"{self.text_prompt_base}/{model}",
+            endpoint="chat",
+            op="chat_completion",
+            model=model,
+            headers={"Content-Type": "application/json"},
+            json=payload,
+            timeout=self._resolve_timeout(timeout, 60.0),
+            expires=self._expires_at(deadline),
+            coalesce=seed is not None,
+            cache=seed is not None,
+        )
+
+        async def fetch() -> Any:
+            data = await self._cached_json(call)
+            if as_json:
+                return data
+            return self._chat_result(data)
+
+        return await self._coalesced(call, fetch, as_json)
+
+    async def chat_completion_stream(  # type: ignore[override]
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: str = "openai",
+        seed: Optional[int] = None,
+        private: Optional[bool] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        yield_raw_events: bool = False,
+    ) -> AsyncIterator[str]:
+        payload = self._chat_payload(
+            messages,
+            model=model,
+            seed=seed,
+            private=private,
+            referrer=referrer,
+            token=token,
+            stream=True,
+        )
+        call = Call(
+            "POST",
+            f"{self.text_prompt_base}/{model}",
+            endpoint="chat",
+            op="chat_completion_stream",
+            model=model,
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "text/event-stream",
+            },
+            json=payload,
+            timeout=self._resolve_timeout(timeout, 300.0),
+            expires=self._expires_at(deadline),
+            stream=True,
+        )
+        async for data in self._sse_stream(call):
+            if yield_raw_events:
+                yield data
+                continue
+            content = self._delta_content(data)
+            if content:
+                yield content
+
+    async def chat_completion_tools(  # type: ignore[override]
+        self,
+        messages: List[Dict[str, Any]],
+        *,
+        tools: List[Dict[str, Any]],
+        functions: Optional[Dict[str, Callable[..., Any]]] = None,
+        tool_choice: Any = "auto",
+        model: str = "openai",
+        seed: Optional[int] = None,
+        private: Optional[bool] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        as_json: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        max_rounds: int = 1,
+        tool_workers: int = 1,
+        tool_timeout: Optional[float] = None,
+        memoize: Any = None,
+    ) -> Any:
+        if not isinstance(messages, list) or not messages:
+            raise ValueError("messages must be a non-empty list of messages")
+        if not isinstance(tools, list) or not tools:
+            raise ValueError("tools must be a non-empty list of tool specs")
+        if seed is None:
+            seed = self._random_seed()
+        url = f"{self.text_prompt_base}/{model}"
+        headers = {"Content-Type": "application/json"}
+        eff_timeout = self._resolve_timeout(timeout, 60.0)
+        expires = self._expires_at(deadline)
+        memo = self._tool_memo(memoize, functions, token, referrer)
+        history: List[Dict[str, Any]] = list(messages)
+        rounds = 0
+        while True:
+            payload = self._chat_payload(
+                history,
+                model=model,
+                seed=seed,
+                private=private,
+                referrer=referrer,
+                token=token,
+                tools=tools,
+                tool_choice=tool_choice,
+            )
+            call = Call(
+                "POST",
+                url,
+                endpoint="chat",
+                op="chat_completion_tools",
+                model=model,
+                headers=headers,
+                json=payload,
+                timeout=eff_timeout,
+                expires=expires,
+            )
+            data = await self._request_json(call)
+            msg = (data.get("choices", [{}])[0]).get("message", {})
+            tool_calls = msg.get("tool_calls", []) or []
+            if not tool_calls or rounds >= max_rounds:
+                if as_json:
+                    return data
+                return msg.get("content")
+            history.append(msg)
+            pooled = tool_workers > 1 or tool_timeout is not None
+            if not pooled:
+                for tc in tool_calls:
+                    history.append(await self._arun_tool(tc, functions, memo=memo, call=call))
+            else:
+                gate = asyncio.Semaphore(max(1, tool_workers))
+                runs = (self._arun_tool(tc, functions, tool_timeout, gate, memo, call) for tc in tool_calls)
+                history.extend(await asyncio.gather(*runs))
+            rounds += 1
+
+    async def chat_completion_tools_stream(  # type: ignore[override]
+        self,
+        messages: List[Dict[str, Any]],
+        *,
+        tools: List[Dict[str, Any]],
+        functions: Optional[Dict[str, Callable[..., Any]]] = None,
+        tool_choice: Any = "auto",
+        model: str = "openai",
+        seed: Optional[int] = None,
+        private: Optional[bool] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        max_rounds: int = 1,
+        yield_tool_results: bool = False,
+        tool_workers: int = 1,
+        tool_timeout: Optional[float] = None,
+        memoize: Any = None,
+    ) -> AsyncIterator[Any]:
+        if not isinstance(messages, list) or not messages:
+            raise ValueError("messages must be a non-empty list of messages")
+        if not isinstance(tools, list) or not tools:
+            raise ValueError("tools must be a non-empty list of tool specs")
+        if seed is None:
+            seed = self._random_seed()
+        expires = self._expires_at(deadline)
+        memo = self._tool_memo(memoize, functions, token, referrer)
+        history: List[Dict[str, Any]] = list(messages)
+        rounds = 0
+        while True:
+            payload = self._chat_payload(
+                history,
+                model=model,
+                seed=seed,
+                private=private,
+                referrer=referrer,
+                token=token,
+                tools=tools,
+                tool_choice=tool_choice,
+                stream=True,
+            )
+            call = self._tool_stream_call(model, payload, timeout, expires)
+            run_tools = rounds < max_rounds
+            assembler = ToolCallAssembler()
+            pooled = tool_workers > 1 or tool_timeout is not None
+            gate = asyncio.Semaphore(max(1, tool_workers))
+            text: List[str] = []
+            results: List[Dict[str, Any]] = []
+            pending: List["asyncio.Future[Dict[str, Any]]"] = []
+            try:
+                async for item in self._atool_stream_items(self._sse_stream(call), assembler):
+                    if isinstance(item, str):
+                        text.append(item)
+                        yield item
+                    elif run_tools and pooled:
+                        run = self._arun_tool(item, functions, tool_timeout, gate, memo, call)
+                        pending.append(asyncio.ensure_future(run))
+                    elif run_tools:
+                        result = await self._arun_tool(item, functions, memo=memo, call=call)
+                        results.append(result)
+                        if yield_tool_results:
+                            yield result
+                if pending:
+                    results = list(await asyncio.gather(*pending))
+            finally:
+                for task in pending:
+                    task.cancel()
+            if not assembler.calls or not run_tools:
+                return
+            if yield_tool_results and pooled:
+                for result in results:
+                    yield result
+            history.append(self._tool_stream_message(text, assembler))
+            history.extend(results)
+            rounds += 1
+
+    @classmethod
+    async def _atool_stream_items(cls, events: AsyncIterator[str], assembler: ToolCallAssembler) -> AsyncIterator[Any]:
+        async for data in events:
+            delta = cls._stream_delta(data)
+            if delta is None:
+                continue
+            content = delta.get("content")
+            if content:
+                yield content
+            fragments = delta.get("tool_calls")
+            if fragments:
+                for tc in assembler.feed(fragments):
+                    yield tc
+        for tc in assembler.finish():
+            yield tc
+
+    async def _arun_tool(
+        self,
+        tc: Dict[str, Any],
+        functions: Optional[Dict[str, Callable[..., Any]]],
+        timeout: Optional[float] = None,
+        gate: Optional[asyncio.Semaphore] = None,
+        memo: ToolMemo = None,
+        call: Optional[Call] = None,
+    ) -> Dict[str, Any]:
+        # Plain functions run in a worker thread so they never block the
+        # event loop. On a timeout (parallel tools only) an async handler is
+        # cancelled; a plain function cannot be and keeps its thread until
+        # it returns.
+        fn_name, args = self._tool_call_args(tc)
+        if not (functions and fn_name in functions):
+            result: Any = {"error": f"no handler for function '{fn_name}'"}
+            return self._tool_result_message(tc, fn_name, result)
+        hit, cached = self._memo_get(memo, fn_name, args, call)
+        if hit:
+            return self._tool_result_message(tc, fn_name, cached)
+        fn = functions[fn_name]
+        bound = functools.partial(fn, **args) if isinstance(args, dict) else fn
+        if gate is None:
+            try:
+                result = bound() if asyncio.iscoroutinefunction(fn) else await asyncio.to_thread(bound)
+                if asyncio.iscoroutine(result):
+                    result = await result
+            except Exception as e:
+                result = {"error": f"function '{fn_name}' raised: {e}"}
+            else:
+                result = self._memo_put(memo, fn_name, args, result)
+            return self._tool_result_message(tc, fn_name, result)
+        async with gate:
+            try:
+                if asyncio.iscoroutinefunction(fn):
+                    work: Any = bound()
+                else:
+                    work = asyncio.to_thread(bound)
+                result = await asyncio.wait_for(work, timeout)
+                if asyncio.iscoroutine(result):
+                    result = await asyncio.wait_for(result, timeout)
+            except asyncio.TimeoutError:
+                result = {"error": f"function '{fn_name}' timed out after {timeout:g}s"}
+            except Exception as e:
+                result = {"error": f"function '{fn_name}' raised: {e}"}
+            else:
+                result = self._memo_put(memo, fn_name, args, result)
+        return self._tool_result_message(tc, fn_name, result)
+
+    async def map_chat(  # type: ignore[override]
+        self,
+        conversations: Iterable[Any],
+        *,
+        workers: int = 4,
+        ordered: bool = True,
+        progress: Progress = None,
+        model: str = "openai",
+        seed: Optional[int] = None,
+        private: Optional[bool] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        as_json: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> AsyncIterator[BatchResult]:
+        shared = {
+            "model": model,
+            "seed": seed,
+            "private": private,
+            "referrer": referrer,
+            "token": token,
+            "as_json": as_json,
+            "timeout": timeout,
+        }
+        expires = self._expires_at(deadline)
+
+        async def one(index: int, spec: Any) -> Any:
+            return await self.chat_completion(deadline=remaining(expires), **spec_kwargs(spec, "messages", shared))
+
+        async for result in arun_batch(conversations, one, workers=workers, ordered=ordered, progress=progress):
+            yield result
+
+
+class AsyncSTTMixin(STTMixin):
+    async def transcribe_audio(  # type: ignore[override]
+        self,
+        audio_path: str,
+        *,
+        question: str = "Transcribe this audio",
+        model: str = "openai-audio",
+        provider: str = "openai",
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> Optional[str]:
+        payload = await asyncio.to_thread(
+            self._audio_payload,
+            audio_path,
+            question=question,
+            model=model,
+            referrer=referrer,
+            token=token,
+        )
+        if payload is None:
+            return None
+        call = Call(
+            "POST",
+            f"{self.text_prompt_base}/{provider}",
+            endpoint="text",
+            op="transcribe_audio",
+            model=model,
+            headers={"Content-Type": "application/json"},
+            json=payload,
+            timeout=self._resolve_timeout(timeout, 120.0),
+            expires=self._expires_at(deadline),
+        )
+        data = await self._request_json(call)
+        return data.get("choices", [{}])[0].get("message", {}).get("content")
+
+
+class AsyncVisionMixin(VisionMixin):
+    async def analyze_image_url(  # type: ignore[override]
+        self,
+        image_url: str,
+        *,
+        question: str = "What's in this image?",
+        model: str = "openai",
+        max_tokens: Optional[int] = 500,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        as_json: bool = False,
+    ) -> Any:
+        payload = self._vision_payload(
+            image_url,
+            question=question,
+            model=model,
+            max_tokens=max_tokens,
+            referrer=referrer,
+            token=token,
+        )
+        call = Call(
+            "POST",
+            f"{self.text_prompt_base}/{model}",
+            endpoint="chat",
+            op="analyze_image_url",
+            model=model,
+            headers={"Content-Type": "application/json"},
+            json=payload,
+            timeout=self._resolve_timeout(timeout, 60.0),
+            expires=self._expires_at(deadline),
+        )
+        data = await self._request_json(call)
+        if as_json:
+            return data
+        return data.get("choices", [{}])[0].get("message", {}).get("content")
+
+    async def analyze_image_file(  # type: ignore[override]
+        self,
+        image_path: str,
+        *,
+        question: str = "What's in this image?",
+        model: str = "openai",
+        max_tokens: Optional[int] = 500,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        as_json: bool = False,
+    ) -> Any:
+        return await self.analyze_image_url(
+            await asyncio.to_thread(self._image_data_url, image_path),
+            question=question,
+            model=model,
+            max_tokens=max_tokens,
+            referrer=referrer,
+            token=token,
+            timeout=timeout,
+            deadline=deadline,
+            as_json=as_json,
+        )
+
+
+class AsyncFeedsMixin(FeedsMixin):
+    async def image_feed_stream(  # type: ignore[override]
+        self,
+        *,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        reconnect: bool = False,
+        retry_delay: float = 10.0,
+        yield_raw_events: bool = False,
+        include_bytes: bool = False,
+        include_data_url: bool = False,
+    ) -> AsyncIterator[Any]:
+        eff_timeout = self._resolve_timeout(timeout, 300.0)
+        expires = self._expires_at(deadline)
+
+        async def _attach(ev: Dict[str, Any]) -> Dict[str, Any]:
+            if include_data_url or include_bytes:
+                img_url = ev.get("imageURL") or ev.get("image_url")
+                if img_url:
+                    call = Call(
+                        "GET",
+                        img_url,
+                        endpoint="image",
+                        op="feed_image",
+                        timeout=eff_timeout,
+                        throttle=False,
+                        expires=expires,
+                    )
+                    content, headers = await self._fetch(call, lambda r: (r.content, r.headers))
+                    self._attach_image(ev, content, headers, include_data_url, include_bytes)
+            return ev
+
+        async def _connect() -> AsyncIterator[Any]:
+            async for data in self._afeed_events(IMAGE_FEED_URL, referrer, token, eff_timeout, expires):
+                if yield_raw_events:
+                    yield data
+                    continue
+                try:
+                    ev = await _attach(_loads(data))
+                except Exception:
+                    continue
+                yield ev
+
+        async for item in self._afeed_loop(_connect, reconnect, retry_delay, expires):
+            yield item
+
+    async def text_feed_stream(  # type: ignore[override]
+        self,
+        *,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        reconnect: bool = False,
+        retry_delay: float = 10.0,
+        yield_raw_events: bool = False,
+    ) -> AsyncIterator[Any]:
+        eff_timeout = self._resolve_timeout(timeout, 300.0)
+        expires = self._expires_at(deadline)
+
+        async def _connect() -> AsyncIterator[Any]:
+            async for data in self._afeed_events(TEXT_FEED_URL, referrer, token, eff_timeout, expires):
+                if yield_raw_events:
+                    yield data
+                    continue
+                try:
+                    ev = _loads(data)
+                except Exception:
+                    continue
+                yield ev
+
+        async for item in self._afeed_loop(_connect, reconnect, retry_delay, expires):
+            yield item
+
+    async def _afeed_events(
+        self,
+        feed_url: str,
+        referrer: Optional[str],
+        token: Optional[str],
+        eff_timeout: float,
+        expires: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        call = Call(
+            "GET",
+            feed_url,
+            endpoint="feed",
+            params=self._feed_params(referrer, token),
+            headers={"Accept": "text/event-stream"},
+            timeout=eff_timeout,
+            expires=expires,
+            stream=True,
+        )
+        async for data in self._sse_stream(call):
+            yield data
+
+    async def _afeed_loop(
+        self, connect: Any, reconnect: bool, retry_delay: float, expires: Optional[float] = None
+    ) -> AsyncIterator[Any]:
+        if not reconnect:
+            async for item in connect():
+                yield item
+            return
+
+        while True:
+            try:
+                async for item in connect():
+                    yield item
+            except DeadlineExceeded:
+                raise
+            except Exception:
+                pass
+            self._reconnect_budget(expires, retry_delay)
+            await self._sleep(retry_delay)
+
+
+class AsyncPolliClient(
+    AsyncBaseClient,
+    AsyncImageMixin,
+    AsyncTextMixin,
+    AsyncChatMixin,
+    AsyncSTTMixin,
+    AsyncVisionMixin,
+    AsyncFeedsMixin,
+):
+    pass
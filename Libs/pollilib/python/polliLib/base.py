@@ -1,13 +1,53 @@
 from __future__ import annotations
 
-from functools import lru_cache
+import contextlib
+import contextvars
+import copy
+import datetime as dt
+import functools
+import json as _json
+import math
+import random
 import threading
 import time
-from typing import Any, Callable, Dict, Iterable, List, Literal, Optional, TypedDict
+import warnings
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Literal, Optional, Tuple, TypedDict
+from urllib.parse import quote
+
 import requests
 
+from .breaker import BreakerPolicy, CircuitBreakers
+from .cache import ResponseCache, ToolCache, cache_key
+from .catalog import ModelCatalog, ModelIndex
+from .flight import FlightTimeout, SingleFlight
+from .hedge import HedgePolicy, Hedger
+from .metrics import Instruments, MetricsRegistry, MetricsSink, RequestMetrics
+from .ratelimit import (
+    _LANE,
+    AdaptiveRate,
+    PartitionPolicy,
+    Partitions,
+    RateLimiter,
+    current_lane,
+    lane_of,
+    partition_key,
+)
+from .sse import iter_events
+from .trace import TraceListener, Tracer
+
 ModelType = Literal["text", "image"]
 
+# Retries, polling and repeated batch items reuse the encoded path. Only prompts
+# up to this many UTF-8 bytes (or max_get_prompt_bytes, when set) are cached.
+_QUOTE_CACHE_BYTES = 4096
+_quote_prompt = functools.lru_cache(maxsize=256)(quote)
+
+# Call.slot of a call waiting on its tenant's limiter: the endpoint-wide
+# slot is only reserved once that wait is over.
+_AFTER_TENANT = object()
+
 
 class Model(TypedDict, total=False):
     name: str
@@ -26,6 +66,128 @@ class Model(TypedDict, total=False):
     supportsSystemMessages: bool
 
 
+class DeadlineExceeded(TimeoutError):
+    """A call's ``deadline=`` budget ran out before it could complete."""
+
+
+class Call:
+    """One logical request as it moves through BaseClient._request.
+
+    ``endpoint`` selects the rate-limit bucket ("text", "chat", "image",
+    "feed", "models"); ``throttle=False`` skips the start limiter (retries
+    are still spaced). ``attempt`` counts retries already spent.
+    ``expires`` is an absolute ``time.monotonic()`` instant; every attempt's
+    timeout and every wait is clamped to what is left of it. ``hedge`` marks
+    an idempotent request that may be duplicated when hedging is enabled;
+    ``coalesce`` lets identical concurrent calls share one upstream request
+    and ``cache`` lets a seeded (deterministic) response be served from the
+    response cache. ``op`` and ``model`` label metrics; ``started`` is the
+    monotonic time the call was created and ``trace`` its CallTrace when
+    tracing is on. ``priority`` is the rate-limit lane current when the call
+    was made (see BaseClient.priority) and ``slot`` the start it was given.
+    """
+
+    __slots__ = (
+        "method",
+        "url",
+        "endpoint",
+        "params",
+        "json",
+        "headers",
+        "timeout",
+        "stream",
+        "retry",
+        "throttle",
+        "expires",
+        "hedge",
+        "coalesce",
+        "cache",
+        "op",
+        "model",
+        "started",
+        "attempt",
+        "trace",
+        "priority",
+        "slot",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        url: str,
+        *,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 60.0,
+        stream: bool = False,
+        retry: bool = True,
+        throttle: bool = True,
+        expires: Optional[float] = None,
+        hedge: bool = False,
+        coalesce: bool = False,
+        cache: bool = False,
+        op: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> None:
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint
+        self.params = params
+        self.json = json
+        self.headers = headers
+        self.timeout = timeout
+        self.stream = stream
+        self.retry = retry
+        self.throttle = throttle
+        self.expires = expires
+        self.hedge = hedge
+        self.coalesce = coalesce
+        self.cache = cache
+        self.op = op
+        self.model = model
+        self.started = time.monotonic()
+        self.attempt = 0
+        self.trace: Any = None
+        self.priority = current_lane()
+        self.slot: Any = None
+
+    def copy(self, **changes: Any) -> "Call":
+        clone = Call.__new__(Call)
+        for name in Call.__slots__:
+            setattr(clone, name, changes.get(name, getattr(self, name)))
+        return clone
+
+    def remaining(self) -> Optional[float]:
+        if self.expires is None:
+            return None
+        return self.expires - time.monotonic()
+
+    def clamped(self) -> bool:
+        """Whether the deadline, not ``timeout``, bounds the next attempt."""
+        remaining = self.remaining()
+        return remaining is not None and remaining < self.timeout
+
+    def key(self) -> Tuple[Any, ...]:
+        """Identity of the upstream request: method, URL, params and body."""
+        params = tuple(sorted((k, str(v)) for k, v in (self.params or {}).items()))
+        body = _json.dumps(self.json, sort_keys=True, default=str) if self.json is not None else None
+        return (self.method, self.url, params, body)
+
+    def kwargs(self) -> Dict[str, Any]:
+        kw: Dict[str, Any] = {}
+        if self.params is not None:
+            kw["params"] = self.params
+        if self.headers is not None:
+            kw["headers"] = self.headers
+        if self.json is not None:
+            kw["json"] = self.json
+        remaining = self.remaining()
+        kw["timeout"] = self.timeout if remaining is None else max(0.001, min(self.timeout, remaining))
+        return kw
+
+
 class BaseClient:
     def __init__(
         self,
@@ -37,9 +199,26 @@ class BaseClient:
         session: Optional[requests.Session] = None,
         min_request_interval: float = 3.0,
         retry_initial_delay: float = 0.5,
-        retry_delay_step: float = 0.1,
+        retry_delay_step: Optional[float] = None,
         retry_max_delay: float = 4.0,
+        retry_backoff: float = 2.0,
+        retry_jitter: float = 0.5,
+        max_retries: Optional[int] = None,
         sleep: Optional[Callable[[float], None]] = None,
+        rate_limits: Optional[Dict[str, Any]] = None,
+        adaptive_rate: Any = False,
+        models_ttl: Optional[float] = 3600.0,
+        models_cache_path: Optional[str] = None,
+        circuit_breaker: Any = False,
+        hedging: Any = False,
+        coalesce: bool = True,
+        cache: Any = None,
+        metrics: Any = None,
+        tracer: Any = None,
+        starvation_limit: float = 5.0,
+        partitions: Any = False,
+        max_get_prompt_bytes: Optional[int] = 4096,
+        tool_cache: Any = None,
     ) -> None:
         self.text_url = text_url
         self.image_url = image_url
@@ -48,27 +227,119 @@ class BaseClient:
         self.timeout = timeout
         self.session = session or requests.Session()
         self.min_request_interval = max(0.0, float(min_request_interval))
+        self.max_get_prompt_bytes = max_get_prompt_bytes
         self.retry_initial_delay = max(0.0, float(retry_initial_delay))
-        self.retry_delay_step = max(0.0, float(retry_delay_step))
+        if retry_delay_step is not None:
+            warnings.warn(
+                "retry_delay_step is deprecated and ignored: retries back off exponentially; "
+                "tune retry_initial_delay, retry_backoff and retry_max_delay instead",
+                DeprecationWarning,
+                stacklevel=2,
+            )
+        self.retry_delay_step = max(0.0, float(0.1 if retry_delay_step is None else retry_delay_step))
         self.retry_max_delay = max(self.retry_initial_delay, float(retry_max_delay))
-        if self.retry_delay_step > 0 and self.retry_max_delay > 0 and self.retry_initial_delay > 0:
-            steps = int(max(0.0, (self.retry_max_delay - self.retry_initial_delay)) / self.retry_delay_step)
-            self._max_retry_attempts = steps + 1
+        self.retry_backoff = max(1.0, float(retry_backoff))
+        self.retry_jitter = min(1.0, max(0.0, float(retry_jitter)))
+        if max_retries is not None:
+            self._max_retry_attempts = max(0, int(max_retries))
         elif self.retry_initial_delay > 0 and self.retry_max_delay > 0:
-            self._max_retry_attempts = 1
+            # As many retries as the backoff takes to reach its cap, plus one
+            # at the cap: 0.5, 1, 2, 4 (7.5s of waiting) with the defaults.
+            ratio = self.retry_max_delay / self.retry_initial_delay
+            climb = math.ceil(math.log(ratio, self.retry_backoff) - 1e-9) if self.retry_backoff > 1 else 0
+            self._max_retry_attempts = climb + 1
         else:
             self._max_retry_attempts = 0
         self._sleep = sleep or time.sleep
         self._last_success_ts = 0.0
-        self._request_lock = threading.Lock()
+        default_rate = 1.0 / self.min_request_interval if self.min_request_interval > 0 else None
+        adaptive: Optional[AdaptiveRate] = None
+        if isinstance(adaptive_rate, AdaptiveRate):
+            adaptive = adaptive_rate
+        elif isinstance(adaptive_rate, dict):
+            adaptive = AdaptiveRate(**adaptive_rate)
+        elif adaptive_rate:
+            adaptive = AdaptiveRate()
+        # Chat/vision POSTs and model listings were never paced; keep them
+        # unlimited unless the caller configures them.
+        limits: Dict[str, Any] = {"chat": None, "models": None}
+        limits.update(rate_limits or {})
+        self._rate_limiter = RateLimiter(
+            default=(default_rate, 1), limits=limits, adaptive=adaptive, max_delay=starvation_limit
+        )
+        partition_policy: Optional[PartitionPolicy] = None
+        if isinstance(partitions, PartitionPolicy):
+            partition_policy = partitions
+        elif isinstance(partitions, dict):
+            partition_policy = PartitionPolicy(**partitions)
+        elif partitions:
+            partition_policy = PartitionPolicy()
+        self._partitions = (
+            Partitions(partition_policy, adaptive=adaptive, max_delay=starvation_limit, new_gate=self._new_gate)
+            if partition_policy
+            else None
+        )
         self._retryable_statuses = {429, 502, 503, 504}
+        self._throttle_statuses = {429, 503}
+        self._catalog = ModelCatalog(ttl=models_ttl, path=models_cache_path)
+        policy: Optional[BreakerPolicy] = None
+        if isinstance(circuit_breaker, BreakerPolicy):
+            policy = circuit_breaker
+        elif isinstance(circuit_breaker, dict):
+            policy = BreakerPolicy(**circuit_breaker)
+        elif circuit_breaker:
+            policy = BreakerPolicy()
+        self._breakers = CircuitBreakers(policy) if policy else None
+        self._breaker_statuses = {500, 502, 503, 504}
+        hedge_policy: Optional[HedgePolicy] = None
+        if isinstance(hedging, HedgePolicy):
+            hedge_policy = hedging
+        elif isinstance(hedging, dict):
+            hedge_policy = HedgePolicy(**hedging)
+        elif hedging:
+            hedge_policy = HedgePolicy()
+        self._hedger = Hedger(hedge_policy) if hedge_policy else None
+        self._hedge_pools: Dict[str, ThreadPoolExecutor] = {}
+        self._hedge_pool_lock = threading.Lock()
+        self._hedge_primaries = threading.BoundedSemaphore(hedge_policy.max_concurrent) if hedge_policy else None
+        self._flights = self._new_flights() if coalesce else None
+        self._cache: Optional[ResponseCache] = None
+        if isinstance(cache, ResponseCache):
+            self._cache = cache
+        elif isinstance(cache, str):
+            self._cache = ResponseCache(directory=cache)
+        elif isinstance(cache, dict):
+            self._cache = ResponseCache(**cache)
+        elif cache:
+            self._cache = ResponseCache()
+        self._tool_cache: Optional[ToolCache] = None
+        if isinstance(tool_cache, ToolCache):
+            self._tool_cache = tool_cache
+        elif isinstance(tool_cache, dict):
+            self._tool_cache = ToolCache(**tool_cache)
+        elif tool_cache:
+            self._tool_cache = ToolCache()
+        if metrics is True:
+            metrics = MetricsRegistry()
+        self.metrics: Optional[MetricsSink] = metrics or None
+        hooks: List[Any] = []
+        if metrics:
+            hooks.append(RequestMetrics(metrics))
+        if tracer:
+            hooks.append(Tracer(tracer if isinstance(tracer, TraceListener) else None))
+        self._instr = hooks[0] if len(hooks) == 1 else Instruments(*hooks) if hooks else None
+
+    def list_models(self, kind: ModelType, deadline: Optional[float] = None) -> List[Model]:
+        return self._list_models(kind, self._expires_at(deadline))
 
-    @lru_cache(maxsize=4)
-    def list_models(self, kind: ModelType) -> List[Model]:
-        url = self._url(kind)
-        resp = self.session.get(url, timeout=self.timeout)
-        resp.raise_for_status()
-        return self._normalize_models(resp.json())
+    def _list_models(self, kind: ModelType, expires: Optional[float]) -> List[Model]:
+        hit = self._catalog.lookup(kind)
+        if hit is None:
+            return self._load_models(kind, expires)
+        models, fresh = hit
+        if not fresh and self._catalog.begin_refresh(kind):
+            threading.Thread(target=self._refresh_models, args=(kind,), daemon=True).start()
+        return models  # type: ignore[return-value]
 
     def get_model_by_name(
         self,
@@ -76,34 +347,142 @@ class BaseClient:
         kind: Optional[ModelType] = None,
         include_aliases: bool = True,
         case_insensitive: bool = True,
+        deadline: Optional[float] = None,
     ) -> Optional[Model]:
-        needle = name.casefold() if case_insensitive else name
+        expires = self._expires_at(deadline)
         kinds: Iterable[ModelType] = (kind,) if kind else ("text", "image")
-        for m in self._iter_models(*kinds):
-            names = [m.get("name", "")]
-            if include_aliases:
-                names.extend(m.get("aliases", []) or [])
-            if case_insensitive:
-                names = [n.casefold() for n in names]
-            if needle in names:
-                return m
+        for k in kinds:
+            hit = self._model_index(k, expires).find(name, include_aliases, case_insensitive)
+            if hit is not None:
+                return hit  # type: ignore[return-value]
         return None
 
+    def models_with(
+        self, field: str, value: Any = True, kind: Optional[ModelType] = None, deadline: Optional[float] = None
+    ) -> List[Model]:
+        expires = self._expires_at(deadline)
+        kinds: Iterable[ModelType] = (kind,) if kind else ("text", "image")
+        out: List[Model] = []
+        for k in kinds:
+            out.extend(self._model_index(k, expires).with_feature(field, value))  # type: ignore[arg-type]
+        return out
+
+    def model_supports(
+        self,
+        name: str,
+        field: str,
+        value: Any = True,
+        kind: Optional[ModelType] = None,
+        deadline: Optional[float] = None,
+    ) -> bool:
+        m = self.get_model_by_name(name, kind=kind, deadline=deadline)
+        return m is not None and self._has_feature(m, field, value)
+
     @staticmethod
     def get(model: Model, field: str, default: Any = None) -> Any:
         return model.get(field, default)
 
     def refresh_cache(self) -> None:
-        self.list_models.cache_clear()  # type: ignore[attr-defined]
+        self._catalog.invalidate()
+
+    def set_rate_limit(self, endpoint: str, rate: Optional[float], burst: int = 1) -> None:
+        self._rate_limiter.configure(endpoint, rate, burst)
+
+    def current_rate(self, endpoint: str) -> Optional[float]:
+        return self._rate_limiter.bucket(endpoint).rate
+
+    def rate_limit_state(self) -> Dict[str, Dict[str, Any]]:
+        return self._rate_limiter.snapshot()
+
+    def partition_state(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Per-tenant bucket state, keyed by partition_key(); empty unless partitioned."""
+        return self._partitions.snapshot() if self._partitions else {}
+
+    @contextlib.contextmanager
+    def priority(self, lane: Optional[str]) -> Iterator[None]:
+        """Run the enclosed calls in rate-limit lane ``"interactive"``,
+        ``"normal"`` or ``"background"``; ``None`` leaves the lane as is.
+
+        Interactive calls take the next free slot ahead of queued background
+        work, which is pushed back by at most ``starvation_limit`` seconds.
+        The lane is a context variable, so it follows asyncio tasks and the
+        batch APIs' worker threads.
+        """
+        if lane is None:
+            yield
+            return
+        token = _LANE.set(lane_of(lane))
+        try:
+            yield
+        finally:
+            _LANE.reset(token)
+
+    def breaker_states(self) -> Dict[str, Dict[str, Any]]:
+        return self._breakers.snapshot() if self._breakers else {}
+
+    def reset_breakers(self, endpoint: Optional[str] = None) -> None:
+        if self._breakers:
+            self._breakers.reset(endpoint)
+
+    def hedge_stats(self) -> Dict[str, Dict[str, Any]]:
+        return self._hedger.snapshot() if self._hedger else {}
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._cache.stats() if self._cache else {}
+
+    def clear_response_cache(self) -> None:
+        if self._cache:
+            self._cache.clear()
+
+    def tool_cache_stats(self) -> Dict[str, Any]:
+        return self._tool_cache.stats() if self._tool_cache else {}
+
+    def clear_tool_cache(self) -> None:
+        if self._tool_cache:
+            self._tool_cache.clear()
 
     # ----- helpers -----
+    @staticmethod
+    def _expires_at(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        return time.monotonic() + float(deadline)
+
     def _url(self, kind: ModelType) -> str:
         return self.text_url if kind == "text" else self.image_url
 
+    def _fetch_models(self, kind: ModelType, expires: Optional[float] = None) -> List[Model]:
+        call = Call("GET", self._url(kind), endpoint="models", timeout=self.timeout, expires=expires)
+        return self._normalize_models(self._request_json(call))
+
+    def _load_models(self, kind: ModelType, expires: Optional[float] = None) -> List[Model]:
+        models = self._fetch_models(kind, expires)
+        self._catalog.store(kind, models)  # type: ignore[arg-type]
+        return models
+
+    def _refresh_models(self, kind: ModelType) -> None:
+        try:
+            self._load_models(kind)
+        except Exception:
+            pass  # keep serving the stale list; the next lookup retries
+        finally:
+            self._catalog.end_refresh(kind)
+
     def _iter_models(self, *kinds: ModelType) -> Iterable[Model]:
         for k in kinds or ("text", "image"):
             yield from self.list_models(k)
 
+    @staticmethod
+    def _has_feature(m: Model, field: str, value: Any) -> bool:
+        current = m.get(field)
+        if isinstance(current, list):
+            return value in current
+        return current == value
+
+    def _model_index(self, kind: ModelType, expires: Optional[float] = None) -> ModelIndex:
+        models = self._list_models(kind, expires)
+        return self._catalog.index(kind) or ModelIndex(models)  # type: ignore[arg-type]
+
     @staticmethod
     def _normalize_models(raw: Any) -> List[Model]:
         if isinstance(raw, dict) and "models" in raw and isinstance(raw["models"], list):
@@ -142,46 +521,526 @@ class BaseClient:
         return out
 
     def _random_seed(self) -> int:
-        import random
         n_digits = random.randint(5, 8)
         low = 10 ** (n_digits - 1)
         high = (10 ** n_digits) - 1
         return random.randint(low, high)
 
+    def _quote(self, prompt: str) -> str:
+        limit = self.max_get_prompt_bytes
+        if limit is None:
+            limit = _QUOTE_CACHE_BYTES
+        if len(prompt) > limit or len(prompt.encode("utf-8")) > limit:
+            return quote(prompt)
+        return _quote_prompt(prompt)
+
     def _image_prompt_url(self, prompt: str) -> str:
-        from urllib.parse import quote
-        return f"{self.image_prompt_base}/{quote(prompt)}"
+        return f"{self.image_prompt_base}/{self._quote(prompt)}"
 
     def _text_prompt_url(self, prompt: str) -> str:
-        from urllib.parse import quote
-        return f"{self.text_prompt_base}/{quote(prompt)}"
+        return f"{self.text_prompt_base}/{self._quote(prompt)}"
+
+    # ----- request pipeline -----
+    def _request(self, call: Call) -> Any:
+        if call.hedge and self._hedger is not None:
+            return self._hedged_request(call)
+        while True:
+            self._admit(call)
+            with self._in_flight(call):
+                # Admitted only now, right before sending, so that nothing can
+                # end the attempt between taking a half-open probe and returning it.
+                self._breaker_acquire(call)
+                sent = time.monotonic()
+                clamped = call.clamped()
+                try:
+                    resp = self._transmit(call)
+                except BaseException as exc:
+                    self._attempt_failed(call, exc, clamped)
+                    if self._retry_error(call, exc):
+                        self._retried(call, type(exc).__name__)
+                        continue
+                    raise
+            self._breaker_record(call, resp.status_code not in self._breaker_statuses)
+            if self._instr is not None:
+                self._instr.response(call, resp.status_code, time.monotonic() - sent, self._sent_size(resp))
+            if self._retry_response(call, resp):
+                resp.close()
+                self._retried(call, str(resp.status_code))
+                continue
+            try:
+                resp.raise_for_status()
+            except Exception:
+                resp.close()
+                raise
+            self._mark_success(call)
+            if self._instr is not None and not call.stream:
+                self._instr.first_byte(call, time.monotonic() - call.started)
+            return resp
+
+    def _admit(self, call: Call) -> None:
+        """Wait out the limiter (or the retry backoff) for the next attempt."""
+        wait_for = self._attempt_delay(call)
+        try:
+            self._check_deadline(call, wait_for)
+            if wait_for <= 0:
+                return
+            self._sleep(wait_for)
+            extra = self._slot_wait(call)
+            while extra > 0:
+                self._check_deadline(call, extra)
+                self._sleep(extra)
+                wait_for += extra
+                extra = self._slot_wait(call)
+            if self._instr is not None:
+                self._instr.wait(call, wait_for, "backoff" if call.attempt else "rate_limit")
+            # A hedge leg abandoned while it slept has had its budget zeroed.
+            self._check_deadline(call)
+        except DeadlineExceeded:
+            self._unreserve(call)
+            raise
+
+    def _unreserve(self, call: Call) -> None:
+        # Give back the start _attempt_delay reserved for a call that will
+        # not be sent, so the deadline doesn't cost later calls a slot.
+        if call.attempt or not call.throttle:
+            return
+        tenant = self._tenant(call)
+        if tenant is not None:
+            tenant.refund(call.endpoint)
+        if call.slot is not _AFTER_TENANT:
+            self._rate_limiter.refund(call.endpoint, call.slot)
+        call.slot = None
+
+    def _attempt_failed(self, call: Call, exc: BaseException, clamped: bool) -> None:
+        # A timeout we imposed by cutting the attempt to the call's remaining
+        # budget says nothing about upstream health: like a cancellation or
+        # a local error, it gives the breaker no verdict.
+        transient = isinstance(exc, self._transient_errors())
+        if transient and not (clamped and isinstance(exc, self._timeout_errors())):
+            self._breaker_record(call, False)
+        else:
+            self._breaker_release(call)
+        if transient:
+            self._check_deadline(call, cause=exc)
+
+    def _retried(self, call: Call, reason: str) -> None:
+        call.attempt += 1
+        if self._instr is not None:
+            self._instr.retry(call, reason)
+
+    @staticmethod
+    def _new_flights() -> Any:
+        return SingleFlight()
+
+    def _coalesced(self, call: Call, fn: Callable[[], Any], *variant: Any) -> Any:
+        # Followers get a private copy of mutable results (as_json dicts).
+        if self._flights is None or not call.coalesce:
+            return fn()
+        try:
+            result, shared = self._flights.do(
+                call.key() + variant, fn, timeout=call.remaining(), rerun=(DeadlineExceeded,)
+            )
+        except FlightTimeout as exc:
+            raise DeadlineExceeded(f"{call.method} {call.url}: deadline exceeded waiting for a shared request") from exc
+        return copy.deepcopy(result) if shared and isinstance(result, (dict, list)) else result
+
+    def _cache_key(self, call: Call) -> Optional[str]:
+        if self._cache is None or not call.cache:
+            return None
+        scope = None if self._cache.shared else self._partition_key(call)
+        return cache_key(call.method, call.url, call.params, call.json, scope)
+
+    def _cached(self, call: Call, fetch: Callable[[], bytes]) -> bytes:
+        key = self._cache_key(call)
+        if key is None:
+            return fetch()
+        assert self._cache is not None
+        hit = self._cache.get(key)
+        if hit is not None:
+            return hit
+        data = fetch()
+        self._cache.put(key, data)
+        return data
+
+    def _cached_json(self, call: Call) -> Any:
+        if self._cache_key(call) is None:
+            return self._request_json(call)
+        raw = self._cached(call, lambda: _json.dumps(self._request_json(call)).encode("utf-8"))
+        return _json.loads(raw)
+
+    def _cached_file(self, call: Call, out_path: str, fetch: Callable[[], str]) -> str:
+        key = self._cache_key(call)
+        if key is None:
+            return fetch()
+        assert self._cache is not None
+        if self._cache.get_file(key, out_path):
+            return out_path
+        path = fetch()
+        self._cache.put_file(key, path)
+        return path
+
+    def _hedged_request(self, call: Call) -> Any:
+        hedger = self._hedger
+        assert hedger is not None
+        # Pass the start limiter here first, so that neither the hedge clock
+        # nor the latency samples count time spent queued for a slot.
+        self._admit(call)
+        primary = call.copy(hedge=False, throttle=False)
+        delay = hedger.delay(call.endpoint)
+        if delay is None:
+            return self._timed_leg(primary)
+        started = self._start_primary(primary)
+        if started is None:
+            return self._timed_leg(primary)
+        legs: Dict[Future, Call] = {started: primary}
+        done, pending = wait(legs, timeout=delay)
+        if not done and self._hedge_token(call):
+            backup = call.copy(hedge=False, throttle=False)
+            ctx = contextvars.copy_context()
+            legs[self._hedge_executor("backup").submit(ctx.run, self._timed_leg, backup)] = backup
+            pending = set(legs)
+        errors = []
+        while pending or done:
+            for fut in done:
+                if fut.exception() is None:
+                    if legs[fut] is not primary:
+                        hedger.hedge_won(call.endpoint)
+                    self._abandon_legs(legs, fut)
+                    return fut.result()
+                errors.append(fut.exception())
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        raise errors[0]
+
+    def _hedge_token(self, call: Call) -> bool:
+        # A duplicate needs hedge budget and a limiter token free right now:
+        # waiting for one would defeat the point of hedging.
+        assert self._hedger is not None
+        if not self._hedger.acquire(call.endpoint):
+            return False
+        if self._rate_limiter.try_reserve(call.endpoint):
+            return True
+        self._hedger.refund(call.endpoint)
+        return False
+
+    def _start_primary(self, call: Call) -> "Optional[Future[Any]]":
+        # Primaries run in a pool of their own, apart from the backups, and
+        # only when a worker is free: queued there, their waiting would look
+        # like a slow response. None means every worker is busy. (The
+        # caller's thread has to stay free to return as soon as either leg
+        # answers.)
+        assert self._hedge_primaries is not None
+        if not self._hedge_primaries.acquire(blocking=False):
+            return None
+        ctx = contextvars.copy_context()
+        fut = self._hedge_executor("primary").submit(ctx.run, self._timed_leg, call)
+        fut.add_done_callback(lambda _: self._hedge_primaries.release())  # type: ignore[union-attr]
+        return fut
+
+    def _timed_leg(self, call: Call) -> Any:
+        started = time.monotonic()
+        resp = self._request(call)
+        if self._hedger is not None:
+            self._hedger.observe(call.endpoint, time.monotonic() - started)
+        return resp
+
+    @staticmethod
+    def _abandon_legs(legs: Dict[Future, Call], winner: Future) -> None:
+        # Losers cannot be interrupted mid-request; expiring their Call stops
+        # further retries and their response is closed as soon as it lands.
+        for fut, leg in legs.items():
+            if fut is winner:
+                continue
+            leg.expires = time.monotonic()
+            fut.add_done_callback(BaseClient._close_leg)
+
+    @staticmethod
+    def _close_leg(fut: Future) -> None:
+        if not fut.cancelled() and fut.exception() is None:
+            fut.result().close()
+
+    def _hedge_executor(self, kind: str) -> ThreadPoolExecutor:
+        pool = self._hedge_pools.get(kind)
+        if pool is None:
+            with self._hedge_pool_lock:
+                pool = self._hedge_pools.get(kind)
+                if pool is None:
+                    assert self._hedger is not None
+                    workers = self._hedger.policy.max_concurrent if kind == "primary" else 16
+                    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"polliLib-hedge-{kind}")
+                    self._hedge_pools[kind] = pool
+        return pool
+
+    @staticmethod
+    def _sent_size(resp: Any) -> int:
+        # Size of the body the HTTP library already encoded for this attempt:
+        # requests' PreparedRequest.body or httpx's Request.content.
+        try:
+            request = resp.request
+            body = getattr(request, "body", None)
+            if body is None:
+                body = getattr(request, "content", None)
+        except Exception:
+            return 0
+        return len(body) if isinstance(body, (bytes, bytearray, str)) else 0
+
+    def _transmit(self, call: Call) -> Any:
+        send = getattr(self.session, call.method.lower())
+        if call.stream:
+            return send(call.url, stream=True, **call.kwargs())
+        return send(call.url, **call.kwargs())
+
+    def _stream(self, call: Call, read: Callable[[Any], Iterable[Any]]) -> Iterator[Any]:
+        # A stream may be retried only until its first chunk has been handed
+        # to the caller; after that a failure propagates.
+        call.stream = True
+        instr = self._instr
+        nbytes = 0
+        error: Optional[BaseException] = None
+        if instr is not None:
+            instr.start(call)
+        try:
+            while True:
+                resp = self._request(call)
+                started = False
+                try:
+                    with resp:
+                        for item in read(resp):
+                            self._check_deadline(call)
+                            if instr is not None:
+                                if not started:
+                                    instr.first_byte(call, time.monotonic() - call.started)
+                                nbytes += len(item) if item else 0
+                            started = True
+                            yield item
+                    return
+                except DeadlineExceeded:
+                    raise
+                except Exception as exc:
+                    if isinstance(exc, self._transient_errors()):
+                        self._check_deadline(call, cause=exc)
+                    if started or not self._retry_error(call, exc):
+                        raise
+                    self._retried(call, type(exc).__name__)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            if instr is not None:
+                instr.finish(call, time.monotonic() - call.started, error, nbytes)
+
+    def _sse_stream(self, call: Call) -> Iterator[str]:
+        first = self._instr is not None
+        for data in self._stream(call, lambda r: self._sse_events(r.iter_content(chunk_size=None))):
+            if first:
+                first = False
+                self._instr.first_token(call, time.monotonic() - call.started)
+            yield data
+
+    @staticmethod
+    def _sse_events(chunks: Iterable[bytes]) -> Iterator[str]:
+        # Ends at "[DONE]" so the stream below finishes rather than being closed.
+        for event in iter_events(chunks):
+            if event.data == "[DONE]":
+                return
+            yield event.data
+
+    def _fetch(self, call: Call, read: Callable[[Any], Any]) -> Any:
+        """Run ``call``, read the body with ``read`` and close the response."""
+        if self._instr is None:
+            resp = self._request(call)
+            try:
+                return read(resp)
+            finally:
+                resp.close()
+        nbytes = 0
+        self._instr.start(call)
+        try:
+            resp = self._request(call)
+            try:
+                value = read(resp)
+                nbytes = self._body_size(resp)
+            finally:
+                resp.close()
+        except BaseException as exc:
+            self._instr.finish(call, time.monotonic() - call.started, exc, nbytes)
+            raise
+        self._instr.finish(call, time.monotonic() - call.started, None, nbytes)
+        return value
+
+    def _request_json(self, call: Call) -> Any:
+        return self._fetch(call, lambda r: r.json())
+
+    def _request_text(self, call: Call) -> str:
+        return self._fetch(call, lambda r: r.text)
+
+    def _request_content(self, call: Call) -> bytes:
+        return self._fetch(call, lambda r: r.content)
+
+    @staticmethod
+    def _body_size(resp: Any) -> int:
+        content = getattr(resp, "content", None)
+        return len(content) if isinstance(content, (bytes, bytearray)) else 0
 
     def _retry_delay(self, attempt: int) -> float:
         if attempt <= 0 or self.retry_initial_delay <= 0:
             return 0.0
-        if attempt == 1 or self.retry_delay_step <= 0:
-            return min(self.retry_initial_delay, self.retry_max_delay)
-        delay = self.retry_initial_delay + (attempt - 1) * self.retry_delay_step
-        return min(delay, self.retry_max_delay)
+        delay = min(self.retry_initial_delay * self.retry_backoff ** (attempt - 1), self.retry_max_delay)
+        if self.retry_jitter > 0:
+            delay *= 1.0 - self.retry_jitter * random.random()
+        return delay
 
     def _can_retry(self, attempt: int) -> bool:
         return attempt <= self._max_retry_attempts
 
-    def _wait_before_attempt(self, attempt: int) -> None:
-        now = time.monotonic()
-        if attempt == 0:
-            wait_for = (self._last_success_ts + self.min_request_interval) - now
+    def _attempt_delay(self, call: Call) -> float:
+        if call.attempt == 0:
+            if not call.throttle:
+                return 0.0
+            # Tenant first: a busy tenant's queued calls must not also hold
+            # endpoint-wide slots that quieter tenants could use meanwhile.
+            tenant = self._tenant(call)
+            if tenant is not None:
+                wait_for = tenant.reserve(call.endpoint)
+                if wait_for > 0:
+                    call.slot = _AFTER_TENANT
+                    return wait_for
+            wait_for, call.slot = self._rate_limiter.schedule(call.endpoint, call.priority)
+            return wait_for
+        delay = max(self._retry_delay(call.attempt), self._rate_limiter.paused_for(call.endpoint))
+        tenant = self._tenant(call)
+        return delay if tenant is None else max(delay, tenant.paused_for(call.endpoint))
+
+    def _tenant(self, call: Call) -> Optional[RateLimiter]:
+        # Endpoints the client leaves unlimited (chat, models) only get a
+        # tenant bucket when the partition policy names them.
+        if self._partitions is None:
+            return None
+        if self._rate_limiter.bucket(call.endpoint).unlimited and call.endpoint not in self._partitions.policy.limits:
+            return None
+        key = self._partition_key(call)
+        return self._partitions.limiter(key) if key else None
+
+    @contextlib.contextmanager
+    def _in_flight(self, call: Call) -> Iterator[None]:
+        # Holds one of the tenant's max_in_flight places while the attempt
+        # is sent and its response (headers, for streams) received.
+        gate = self._tenant_gate(call)
+        if gate is None:
+            yield
+            return
+        remaining = call.remaining()
+        if not gate.acquire(timeout=None if remaining is None else max(0.0, remaining)):
+            raise DeadlineExceeded(f"{call.method} {call.url}: deadline exceeded waiting for a tenant slot")
+        try:
+            yield
+        finally:
+            gate.release()
+
+    def _tenant_gate(self, call: Call) -> Any:
+        if self._partitions is None:
+            return None
+        key = self._partition_key(call)
+        return self._partitions.gate(key) if key else None
+
+    @staticmethod
+    def _new_gate(limit: int) -> Any:
+        return threading.BoundedSemaphore(limit)
+
+    @staticmethod
+    def _partition_key(call: Call) -> Optional[str]:
+        # The token/referrer travel as query params (GET) or in the JSON body (POST).
+        fields = call.params or (call.json if isinstance(call.json, dict) else None) or {}
+        return partition_key(fields.get("token"), fields.get("referrer"))
+
+    def _slot_wait(self, call: Call) -> float:
+        # Reserve the endpoint slot once the tenant's wait is over; after
+        # that, a higher-priority call may have taken it while we slept.
+        if call.slot is None:
+            return 0.0
+        if call.slot is _AFTER_TENANT:
+            extra, call.slot = self._rate_limiter.schedule(call.endpoint, call.priority)
         else:
-            wait_for = self._retry_delay(attempt)
-        if wait_for > 0:
-            self._sleep(wait_for)
+            extra = self._rate_limiter.recheck(call.endpoint, call.slot)
+        if extra <= 0:
+            call.slot = None
+        return extra
 
-    def _mark_success(self) -> None:
+    @staticmethod
+    def _check_deadline(call: Call, wait_for: float = 0.0, cause: Optional[BaseException] = None) -> None:
+        # Fail fast: if the next wait would use up the budget there is no
+        # point sleeping only to time out afterwards.
+        remaining = call.remaining()
+        if remaining is None or remaining > wait_for:
+            return
+        err = DeadlineExceeded(f"{call.method} {call.url}: deadline exceeded after {call.attempt + 1} attempt(s)")
+        if cause is not None:
+            raise err from cause
+        raise err
+
+    def _breaker_acquire(self, call: Call) -> None:
+        if self._breakers is not None:
+            self._breakers.breaker(call.endpoint).acquire()
+
+    def _breaker_record(self, call: Call, ok: bool) -> None:
+        if self._breakers is not None:
+            self._breakers.breaker(call.endpoint).record(ok)
+
+    def _breaker_release(self, call: Call) -> None:
+        if self._breakers is not None:
+            self._breakers.breaker(call.endpoint).release()
+
+    def _retry_response(self, call: Call, resp: Any) -> bool:
+        if not self._should_retry_status(resp.status_code):
+            return False
+        self._note_retry_status(call, resp)
+        return call.retry and self._can_retry(call.attempt + 1)
+
+    def _retry_error(self, call: Call, exc: BaseException) -> bool:
+        return call.retry and isinstance(exc, self._transient_errors()) and self._can_retry(call.attempt + 1)
+
+    def _transient_errors(self) -> Tuple[type, ...]:
+        return (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError)
+
+    def _timeout_errors(self) -> Tuple[type, ...]:
+        return (requests.Timeout, TimeoutError)
+
+    def _mark_success(self, call: Call) -> None:
         self._last_success_ts = time.monotonic()
+        self._rate_limiter.on_success(call.endpoint)
+        tenant = self._tenant(call)
+        if tenant is not None:
+            tenant.on_success(call.endpoint)
 
     def _should_retry_status(self, status: int) -> bool:
         return status in self._retryable_statuses
 
+    def _note_retry_status(self, call: Call, resp: Any) -> None:
+        retry_after = self._retry_after(resp)
+        if resp.status_code in self._throttle_statuses or retry_after:
+            # A tenant's 429 slows that tenant down, not everyone else.
+            limiter = self._tenant(call) or self._rate_limiter
+            limiter.on_throttle(call.endpoint, retry_after)
+
+    @staticmethod
+    def _retry_after(resp: Any) -> Optional[float]:
+        headers = getattr(resp, "headers", None) or {}
+        value = headers.get("Retry-After") or headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            pass
+        try:
+            when = parsedate_to_datetime(str(value))
+            if when.tzinfo is None:
+                when = when.replace(tzinfo=dt.timezone.utc)
+            return max(0.0, (when - dt.datetime.now(dt.timezone.utc)).total_seconds())
+        except Exception:
+            return None
+
     def _resolve_timeout(self, timeout: Optional[float], fallback: Optional[float]) -> float:
         if timeout is not None:
             try:
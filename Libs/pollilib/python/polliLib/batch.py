@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, Optional, Set
+
+
+class BatchResult:
+    """Outcome of one item of a batch call.
+
+    ``index`` is the item's position in the input and ``spec`` the item
+    itself. Exactly one of ``value`` and ``error`` is meaningful: a failed
+    item carries its exception instead of aborting the batch.
+    """
+
+    __slots__ = ("index", "spec", "value", "error", "elapsed")
+
+    def __init__(
+        self, index: int, spec: Any, value: Any = None, error: Optional[BaseException] = None, elapsed: float = 0.0
+    ) -> None:
+        self.index = index
+        self.spec = spec
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        outcome = f"error={self.error!r}" if self.error is not None else f"value={self.value!r:.60}"
+        return f"BatchResult(index={self.index}, {outcome})"
+
+
+class BatchProgress:
+    """Running totals handed to a batch's ``progress`` callback."""
+
+    __slots__ = ("started", "submitted", "completed", "failed")
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rate(self) -> float:
+        """Completed items per second so far."""
+        elapsed = self.elapsed
+        return self.completed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return self.submitted - self.completed
+
+    def _record(self, result: BatchResult, progress: Progress) -> None:
+        self.completed += 1
+        if result.error is not None:
+            self.failed += 1
+        if progress is not None:
+            progress(self)
+
+    def __repr__(self) -> str:
+        return (
+            f"BatchProgress(completed={self.completed}, failed={self.failed}, "
+            f"in_flight={self.in_flight}, rate={self.rate:.2f}/s)"
+        )
+
+
+Progress = Optional[Callable[[BatchProgress], None]]
+
+
+def remaining(expires: Optional[float]) -> Optional[float]:
+    """Seconds left before a shared batch ``expires`` instant, as a per-item ``deadline=``."""
+    return None if expires is None else max(0.0, expires - time.monotonic())
+
+
+def spec_kwargs(spec: Any, key: str, shared: Dict[str, Any]) -> Dict[str, Any]:
+    """Keyword arguments for one batch item: a dict overrides ``shared``,
+    anything else is passed as the ``key`` argument."""
+    if isinstance(spec, dict):
+        if key not in spec:
+            raise TypeError(f"batch items given as dicts need a {key!r} key")
+        kwargs = {**shared, **spec}
+    else:
+        kwargs = {**shared, key: spec}
+    kwargs.pop("deadline", None)  # the batch deadline applies
+    return kwargs
+
+
+def _run(fn: Callable[[int, Any], Any], index: int, spec: Any) -> BatchResult:
+    started = time.monotonic()
+    try:
+        return BatchResult(index, spec, fn(index, spec), elapsed=time.monotonic() - started)
+    except Exception as exc:
+        return BatchResult(index, spec, error=exc, elapsed=time.monotonic() - started)
+
+
+def run_batch(
+    items: Iterable[Any],
+    fn: Callable[[int, Any], Any],
+    workers: int = 4,
+    ordered: bool = False,
+    progress: Progress = None,
+) -> Iterator[BatchResult]:
+    """Run ``fn(index, item)`` on a pool of ``workers`` threads.
+
+    Items are pulled from ``items`` lazily and at most ``2 * workers`` are
+    in flight or buffered at once, so a large or endless iterable is fine.
+    Results are yielded as they complete, or in input order with
+    ``ordered=True``. ``progress`` is called with a BatchProgress after
+    every completed item. Closing the iterator cancels items not yet started.
+    """
+    workers = max(1, int(workers))
+    window = 2 * workers
+    source = enumerate(items)
+    exhausted = False
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="polli-batch")
+    pending: Set["Future[BatchResult]"] = set()
+    ready: Dict[int, BatchResult] = {}
+    next_index = 0
+    stats = BatchProgress()
+    try:
+        while True:
+            while not exhausted and len(pending) + len(ready) < window:
+                try:
+                    index, spec = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                # Carry the caller's context (e.g. its priority lane) into the worker.
+                pending.add(pool.submit(contextvars.copy_context().run, _run, fn, index, spec))
+                stats.submitted += 1
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: f.result().index):
+                result = future.result()
+                stats._record(result, progress)
+                if not ordered:
+                    yield result
+                else:
+                    ready[result.index] = result
+            while next_index in ready:
+                yield ready.pop(next_index)
+                next_index += 1
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+
+async def _arun(fn: Callable[[int, Any], Awaitable[Any]], index: int, spec: Any) -> BatchResult:
+    started = time.monotonic()
+    try:
+        return BatchResult(index, spec, await fn(index, spec), elapsed=time.monotonic() - started)
+    except Exception as exc:
+        return BatchResult(index, spec, error=exc, elapsed=time.monotonic() - started)
+
+
+async def arun_batch(
+    items: Iterable[Any],
+    fn: Callable[[int, Any], Awaitable[Any]],
+    workers: int = 4,
+    ordered: bool = False,
+    progress: Progress = None,
+) -> AsyncIterator[BatchResult]:
+    """asyncio counterpart of run_batch: at most ``workers`` tasks at a time."""
+    workers = max(1, int(workers))
+    window = 2 * workers
+    source = enumerate(items)
+    exhausted = False
+    pending: Set["asyncio.Task[BatchResult]"] = set()
+    ready: Dict[int, BatchResult] = {}
+    next_index = 0
+    stats = BatchProgress()
+    try:
+        while True:
+            while not exhausted and len(pending) < workers and len(pending) + len(ready) < window:
+                try:
+                    index, spec = next(source)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(_arun(fn, index, spec)))
+                stats.submitted += 1
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=lambda t: t.result().index):
+                result = task.result()
+                stats._record(result, progress)
+                if not ordered:
+                    yield result
+                else:
+                    ready[result.index] = result
+            while next_index in ready:
+                yield ready.pop(next_index)
+                next_index += 1
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without touching the network while an endpoint's circuit is open."""
+
+    def __init__(self, endpoint: str, retry_in: float) -> None:
+        super().__init__(f"circuit for '{endpoint}' is open; retry in {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class BreakerPolicy:
+    """When to trip and how to recover.
+
+    The circuit opens once at least ``min_calls`` of the last ``window``
+    attempts were recorded and ``failure_rate`` of them failed. It stays open
+    for ``open_for`` seconds, then lets ``probes`` concurrent requests through;
+    that many successes close it again, a single failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        open_for: float = 30.0,
+        probes: int = 2,
+    ) -> None:
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+        self.failure_rate = float(failure_rate)
+        self.window = max(1, int(window))
+        self.min_calls = max(1, min(int(min_calls), self.window))
+        self.open_for = max(0.0, float(open_for))
+        self.probes = max(1, int(probes))
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        endpoint: str,
+        policy: BreakerPolicy,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.endpoint = endpoint
+        self.policy = policy
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=policy.window)
+        self._opened_at = 0.0
+        self._probes_out = 0
+        self._probes_ok = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current(self._clock())
+
+    def acquire(self) -> None:
+        """Admit one attempt or raise CircuitOpenError."""
+        with self._lock:
+            now = self._clock()
+            state = self._current(now)
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and self._probes_out < self.policy.probes:
+                self._probes_out += 1
+                return
+            retry_in = max(0.0, self._opened_at + self.policy.open_for - now)
+        raise CircuitOpenError(self.endpoint, retry_in)
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            now = self._clock()
+            state = self._current(now)
+            if state == self.HALF_OPEN:
+                self._probes_out = max(0, self._probes_out - 1)
+                if not ok:
+                    self._trip(now)
+                    return
+                self._probes_ok += 1
+                if self._probes_ok >= self.policy.probes:
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                return
+            if state == self.OPEN:
+                return  # a straggler admitted before the trip
+            self._outcomes.append(ok)
+            calls = len(self._outcomes)
+            if calls >= self.policy.min_calls:
+                failures = calls - sum(self._outcomes)
+                if failures / calls >= self.policy.failure_rate:
+                    self._trip(now)
+
+    def release(self) -> None:
+        """End an admitted attempt without an outcome (e.g. it was cancelled).
+
+        Frees its half-open probe slot; in the other states it is a no-op.
+        """
+        with self._lock:
+            if self._current(self._clock()) == self.HALF_OPEN:
+                self._probes_out = max(0, self._probes_out - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self._clock()
+            state = self._current(now)
+            calls = len(self._outcomes)
+            failures = calls - sum(self._outcomes)
+            return {
+                "state": state,
+                "calls": calls,
+                "failure_rate": failures / calls if calls else 0.0,
+                "retry_in": max(0.0, self._opened_at + self.policy.open_for - now) if state == self.OPEN else 0.0,
+            }
+
+    def _current(self, now: float) -> str:
+        if self._state == self.OPEN and now - self._opened_at >= self.policy.open_for:
+            self._state = self.HALF_OPEN
+            self._probes_out = 0
+            self._probes_ok = 0
+        return self._state
+
+    def _trip(self, now: float) -> None:
+        self._state = self.OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+
+
+class CircuitBreakers:
+    """One CircuitBreaker per endpoint, created on first use."""
+
+    def __init__(self, policy: BreakerPolicy, clock: Callable[[], float] = time.monotonic) -> None:
+        self.policy = policy
+        self._clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        b = self._breakers.get(endpoint)
+        if b is None:
+            with self._lock:
+                b = self._breakers.get(endpoint)
+                if b is None:
+                    b = CircuitBreaker(endpoint, self.policy, clock=self._clock)
+                    self._breakers[endpoint] = b
+        return b
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {k: b.snapshot() for k, b in breakers.items()}
+
+    def reset(self, endpoint: Optional[str] = None) -> None:
+        with self._lock:
+            if endpoint is None:
+                self._breakers.clear()
+            else:
+                self._breakers.pop(endpoint, None)
@@ -0,0 +1,369 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# Credentials and attribution only enter the key as the tenant ``scope``.
+_UNKEYED = frozenset({"token", "referrer"})
+
+
+def cache_key(
+    method: str, url: str, params: Optional[Dict[str, Any]], body: Any, scope: Optional[str] = None
+) -> str:
+    """sha256 over the request identity: URL (model/prompt), params, JSON body
+    and the tenant ``scope`` (see ratelimit.partition_key) it belongs to."""
+    params = {k: str(v) for k, v in (params or {}).items() if k not in _UNKEYED}
+    if isinstance(body, dict):
+        body = {k: v for k, v in body.items() if k not in _UNKEYED}
+    raw = json.dumps([method, url, params, body, scope], sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-level LRU for deterministic (seeded) responses.
+
+    Entries live in memory (bounded by ``memory_items``/``memory_bytes``) and,
+    when ``directory`` is set, as one file per key on disk bounded by
+    ``max_bytes``. Disk recency is the file mtime, so the LRU order survives
+    restarts. Image downloads are stored as files and copied to ``out_path``
+    without reading them into memory; the caller never gets a link to an
+    entry, so rewriting its file can't change what the cache serves.
+
+    Entries are kept per tenant (token, else referrer). ``shared=True``
+    serves one tenant's seeded responses to every caller instead.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: int = 512 * 1024 * 1024,
+        memory_items: int = 256,
+        memory_bytes: int = 32 * 1024 * 1024,
+        shared: bool = False,
+    ) -> None:
+        self.directory = os.path.expanduser(directory) if directory else None
+        self.shared = shared
+        self.max_bytes = max(0, int(max_bytes))
+        self.memory_items = max(0, int(memory_items))
+        self.memory_bytes = max(0, int(memory_bytes))
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._scan()
+
+    # ----- bytes -----
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+            on_disk = key in self._disk
+        if on_disk:
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+            except OSError:
+                data = None
+            if data is not None:
+                self._touch(key)
+                with self._lock:
+                    self.hits += 1
+                    self._remember(key, data)
+                return data
+            self._forget_disk(key)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._remember(key, data)
+        if self.directory:
+            self._write_disk(key, lambda tmp: _write_bytes(tmp, data), len(data))
+
+    # ----- files -----
+    def get_file(self, key: str, out_path: str) -> bool:
+        """Materialise a cached entry at ``out_path``; False on a miss."""
+        if self.directory:
+            with self._lock:
+                on_disk = key in self._disk
+            if on_disk and self._place(self._path(key), out_path):
+                self._touch(key)
+                with self._lock:
+                    self.hits += 1
+                return True
+            if on_disk:
+                self._forget_disk(key)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+        if data is not None:
+            with replacing(out_path) as tmp:
+                _write_bytes(tmp, data)
+            with self._lock:
+                self.hits += 1
+            return True
+        with self._lock:
+            self.misses += 1
+        return False
+
+    def put_file(self, key: str, path: str) -> None:
+        size = os.path.getsize(path)
+        if self.directory:
+            self._write_disk(key, lambda tmp: shutil.copyfile(path, tmp), size)
+        elif size <= self.memory_bytes:
+            with open(path, "rb") as f:
+                data = f.read()
+            with self._lock:
+                self._remember(key, data)
+
+    # ----- admin -----
+    def clear(self) -> None:
+        with self._lock:
+            keys = list(self._disk)
+            self._memory.clear()
+            self._memory_size = 0
+            self._disk.clear()
+            self._disk_size = 0
+        for key in keys:
+            _remove(self._path(key))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_items": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_items": len(self._disk),
+                "disk_bytes": self._disk_size,
+            }
+
+    # ----- internals -----
+    def _path(self, key: str) -> str:
+        assert self.directory is not None
+        return os.path.join(self.directory, key[:2], key)
+
+    def _scan(self) -> None:
+        found = []
+        assert self.directory is not None
+        for sub in os.listdir(self.directory):
+            subdir = os.path.join(self.directory, sub)
+            if len(sub) != 2 or not os.path.isdir(subdir):
+                continue
+            for name in os.listdir(subdir):
+                if name.endswith(".tmp"):
+                    _remove(os.path.join(subdir, name))
+                    continue
+                try:
+                    st = os.stat(os.path.join(subdir, name))
+                except OSError:
+                    continue
+                found.append((st.st_mtime, name, st.st_size))
+        for _, name, size in sorted(found):
+            self._disk[name] = size
+            self._disk_size += size
+        for victim in self._evict_disk():
+            _remove(self._path(victim))
+
+    def _remember(self, key: str, data: bytes) -> None:
+        # Caller holds the lock.
+        if len(data) > self.memory_bytes or self.memory_items == 0:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_size -= len(old)
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while len(self._memory) > self.memory_items or self._memory_size > self.memory_bytes:
+            _, dropped = self._memory.popitem(last=False)
+            self._memory_size -= len(dropped)
+            if not self.directory:
+                self.evictions += 1  # with a directory the entry is still on disk
+
+    def _write_disk(self, key: str, write: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp = _temp_path(path)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write(tmp)
+            os.replace(tmp, path)
+        except OSError:
+            _remove(tmp)
+            return
+        with self._lock:
+            self._disk_size -= self._disk.pop(key, 0)
+            self._disk[key] = size
+            self._disk_size += size
+            victims = self._evict_disk()
+        for victim in victims:
+            _remove(self._path(victim))
+
+    def _evict_disk(self) -> List[str]:
+        # Caller holds the lock; the returned keys are unlinked outside it.
+        victims: List[str] = []
+        while self._disk and self._disk_size > self.max_bytes:
+            key, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            self.evictions += 1
+            victims.append(key)
+        return victims
+
+    def _touch(self, key: str) -> None:
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+
+    def _forget_disk(self, key: str) -> None:
+        with self._lock:
+            self._disk_size -= self._disk.pop(key, 0)
+
+    @staticmethod
+    def _place(src: str, out_path: str) -> bool:
+        try:
+            copy_file(src, out_path)
+            return True
+        except OSError:
+            return False
+
+
+class ToolCache:
+    """LRU of tool handler results, keyed on function name, scope and parsed arguments.
+
+    Entries expire ``ttl`` seconds after they were stored (``None``: never),
+    or after the per-function ttl given to ``put``; at most ``max_items``
+    are kept. ``stats()`` reports hits, misses and hit rate per function.
+    ``scope`` is any hashable that must also match for a hit; the clients
+    pass the handler and the caller's tenant, so a shared cache never
+    answers one handler or tenant with another's result.
+    """
+
+    def __init__(
+        self, ttl: Optional[float] = 300.0, max_items: int = 1024, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.ttl = ttl
+        self.max_items = max(1, int(max_items))
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires at or None, value)
+        self._entries: "OrderedDict[Tuple[str, Any, str], Tuple[Optional[float], Any]]" = OrderedDict()
+        self._counts: Dict[str, List[int]] = {}  # function -> [hits, misses]
+        self.evictions = 0
+
+    @staticmethod
+    def key(name: str, args: Dict[str, Any], scope: Any = None) -> Tuple[str, Any, str]:
+        return name, scope, json.dumps(args, sort_keys=True, default=str, separators=(",", ":"))
+
+    def get(self, name: str, args: Dict[str, Any], scope: Any = None) -> Tuple[bool, Any]:
+        key = self.key(name, args, scope)
+        with self._lock:
+            counts = self._counts.setdefault(name, [0, 0])
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > self._clock()):
+                self._entries.move_to_end(key)
+                counts[0] += 1
+                return True, entry[1]
+            if entry is not None:
+                del self._entries[key]
+            counts[1] += 1
+            return False, None
+
+    def put(
+        self, name: str, args: Dict[str, Any], value: Any, ttl: Optional[float] = None, scope: Any = None
+    ) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires = None if ttl is None else self._clock() + ttl
+        key = self.key(name, args, scope)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counts.clear()
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            functions = {name: _rates(hits, misses) for name, (hits, misses) in self._counts.items()}
+            hits = sum(f["hits"] for f in functions.values())
+            misses = sum(f["misses"] for f in functions.values())
+            return {
+                **_rates(hits, misses),
+                "items": len(self._entries),
+                "evictions": self.evictions,
+                "functions": functions,
+            }
+
+
+def _rates(hits: int, misses: int) -> Dict[str, Any]:
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": hits / total if total else 0.0}
+
+
+@contextlib.contextmanager
+def replacing(path: str) -> Iterator[str]:
+    """Yield a temp path next to ``path`` and rename it over ``path`` when the
+    block succeeds (it is removed if the block raises).
+
+    The old file at ``path`` is replaced, never truncated, so any other name
+    for it (a hardlink, an open reader) keeps its contents.
+    """
+    tmp = _temp_path(path)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    except BaseException:
+        _remove(tmp)
+        raise
+
+
+def copy_file(src: str, dst: str) -> None:
+    with replacing(dst) as tmp:
+        shutil.copyfile(src, tmp)
+
+
+def _temp_path(path: str) -> str:
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
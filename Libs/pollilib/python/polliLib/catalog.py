@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+class ModelIndex:
+    """Lookup tables built once per catalog load.
+
+    Name tables keep the first model in catalog order for each key, matching
+    a linear scan. ``features`` maps ``(field, value)`` to the models carrying
+    it, e.g. ``("vision", True)`` or ``("input_modalities", "audio")``.
+    """
+
+    __slots__ = ("names", "names_folded", "all_names", "all_names_folded", "features")
+
+    _UNINDEXED = frozenset({"description"})
+
+    def __init__(self, models: List[Dict[str, Any]]) -> None:
+        self.names: Dict[str, Dict[str, Any]] = {}
+        self.names_folded: Dict[str, Dict[str, Any]] = {}
+        self.all_names: Dict[str, Dict[str, Any]] = {}
+        self.all_names_folded: Dict[str, Dict[str, Any]] = {}
+        features: Dict[Tuple[str, Any], List[Dict[str, Any]]] = {}
+        for m in models:
+            name = m.get("name", "")
+            self.names.setdefault(name, m)
+            self.names_folded.setdefault(name.casefold(), m)
+            self.all_names.setdefault(name, m)
+            self.all_names_folded.setdefault(name.casefold(), m)
+            for alias in m.get("aliases", []) or []:
+                if isinstance(alias, str):
+                    self.all_names.setdefault(alias, m)
+                    self.all_names_folded.setdefault(alias.casefold(), m)
+            for field, value in m.items():
+                if field in self._UNINDEXED:
+                    continue
+                values = value if isinstance(value, list) else (value,)
+                for v in values:
+                    if isinstance(v, (str, bool, int, float)):
+                        features.setdefault((field, v), []).append(m)
+        self.features: Dict[Tuple[str, Any], Tuple[Dict[str, Any], ...]] = {
+            k: tuple(v) for k, v in features.items()
+        }
+
+    def find(self, name: str, include_aliases: bool = True, case_insensitive: bool = True) -> Optional[Dict[str, Any]]:
+        if case_insensitive:
+            table = self.all_names_folded if include_aliases else self.names_folded
+            return table.get(name.casefold())
+        table = self.all_names if include_aliases else self.names
+        return table.get(name)
+
+    def with_feature(self, field: str, value: Any = True) -> Tuple[Dict[str, Any], ...]:
+        return self.features.get((field, value), ())
+
+
+class ModelCatalog:
+    """Model lists per kind with a TTL and optional JSON persistence.
+
+    Entries past their TTL are still served (stale-while-revalidate); callers
+    use ``begin_refresh``/``end_refresh`` so only one refresh runs per kind.
+    Timestamps are wall-clock so a persisted catalog ages across processes.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 3600.0,
+        path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.ttl = float(ttl) if ttl is not None else None
+        self.path = os.path.expanduser(path) if path else None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[List[Dict[str, Any]], float]] = {}
+        self._indexes: Dict[str, ModelIndex] = {}
+        self._refreshing: Set[str] = set()
+        if path:
+            self._load()
+
+    def lookup(self, kind: str) -> Optional[Tuple[List[Dict[str, Any]], bool]]:
+        with self._lock:
+            entry = self._entries.get(kind)
+        if entry is None:
+            return None
+        models, fetched_at = entry
+        fresh = self.ttl is None or (self._clock() - fetched_at) < self.ttl
+        return models, fresh
+
+    def index(self, kind: str) -> Optional[ModelIndex]:
+        with self._lock:
+            return self._indexes.get(kind)
+
+    def store(self, kind: str, models: List[Dict[str, Any]]) -> None:
+        index = ModelIndex(models)
+        with self._lock:
+            self._entries[kind] = (models, self._clock())
+            self._indexes[kind] = index
+            snapshot = dict(self._entries)
+        if self.path:
+            self._save(snapshot)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._indexes.clear()
+
+    def begin_refresh(self, kind: str) -> bool:
+        with self._lock:
+            if kind in self._refreshing:
+                return False
+            self._refreshing.add(kind)
+            return True
+
+    def end_refresh(self, kind: str) -> None:
+        with self._lock:
+            self._refreshing.discard(kind)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:  # type: ignore[arg-type]
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(raw, dict):
+            return
+        for kind, entry in raw.items():
+            try:
+                models = entry["models"]
+                fetched_at = float(entry["fetched_at"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if isinstance(models, list):
+                self._entries[kind] = (models, fetched_at)
+                self._indexes[kind] = ModelIndex(models)
+
+    def _save(self, entries: Dict[str, Tuple[List[Dict[str, Any]], float]]) -> None:
+        path = self.path
+        assert path is not None
+        data = {k: {"fetched_at": ts, "models": models} for k, (models, ts) in entries.items()}
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
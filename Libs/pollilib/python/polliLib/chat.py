@@ -1,6 +1,20 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterator, List, Optional, Callable
+import contextvars
+import json as _json
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Callable, Tuple
+
+from .base import Call
+from .batch import BatchResult, Progress, remaining, run_batch, spec_kwargs
+from .cache import ToolCache
+from .ratelimit import partition_key
+from .sse import loads as _loads
+
+
+# (cache, function name -> (ttl or None for the cache's default, scope))
+ToolMemo = Optional[Tuple[ToolCache, Dict[str, Tuple[Optional[float], Any]]]]
 
 
 class ChatMixin:
@@ -15,39 +29,37 @@ class ChatMixin:
         token: Optional[str] = None,
         as_json: bool = False,
         timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
     ) -> Any:
-        if not isinstance(messages, list) or not messages:
-            raise ValueError("messages must be a non-empty list of {role, content} dicts")
-        if seed is None:
-            seed = self._random_seed()
-        payload: Dict[str, Any] = {
-            "model": model,
-            "messages": messages,
-            "seed": seed,
-        }
-        if private is not None:
-            payload["private"] = bool(private)
-        if referrer:
-            payload["referrer"] = referrer
-        if token:
-            payload["token"] = token
-        payload["safe"] = False
-        url = f"{self.text_prompt_base}/{model}"
-        eff_timeout = self._resolve_timeout(timeout, 60.0)
-        headers = {"Content-Type": "application/json"}
-        resp = self.session.post(url, headers=headers, json=payload, timeout=eff_timeout)
-        resp.raise_for_status()
-        data = resp.json()
-        if as_json:
-            return data
-        try:
-            return (
-                data.get("choices", [{}])[0]
-                .get("message", {})
-                .get("content")
-            )
-        except Exception:
-            return resp.text
+        payload = self._chat_payload(
+            messages,
+            model=model,
+            seed=seed,
+            private=private,
+            referrer=referrer,
+            token=token,
+        )
+        call = Call(
+            "POST",
+            f"{self.text_prompt_base}/{model}",
+            endpoint="chat",
+            op="chat_completion",
+            model=model,
+            headers={"Content-Type": "application/json"},
+            json=payload,
+            timeout=self._resolve_timeout(timeout, 60.0),
+            expires=self._expires_at(deadline),
+            coalesce=seed is not None,
+            cache=seed is not None,
+        )
+
+        def fetch() -> Any:
+            data = self._cached_json(call)
+            if as_json:
+                return data
+            return self._chat_result(data)
+
+        return self._coalesced(call, fetch, as_json)
 
     def chat_completion_stream(
         self,
@@ -59,64 +71,40 @@ class ChatMixin:
         referrer: Optional[str] = None,
         token: Optional[str] = None,
         timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
         yield_raw_events: bool = False,
     ) -> Iterator[str]:
-        if not isinstance(messages, list) or not messages:
-            raise ValueError("messages must be a non-empty list of {role, content} dicts")
-        if seed is None:
-            seed = self._random_seed()
-        payload: Dict[str, Any] = {
-            "model": model,
-            "messages": messages,
-            "seed": seed,
-            "stream": True,
-        }
-        if private is not None:
-            payload["private"] = bool(private)
-        if referrer:
-            payload["referrer"] = referrer
-        if token:
-            payload["token"] = token
-        payload["safe"] = False
-        url = f"{self.text_prompt_base}/{model}"
-        eff_timeout = self._resolve_timeout(timeout, 300.0)
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "text/event-stream",
-        }
-        with self.session.post(url, headers=headers, json=payload, timeout=eff_timeout, stream=True) as resp:
-            resp.raise_for_status()
-            for raw in resp.iter_lines(decode_unicode=True):
-                if not raw:
-                    continue
-                if isinstance(raw, bytes):
-                    try:
-                        raw = raw.decode("utf-8", errors="ignore")
-                    except Exception:
-                        continue
-                line = raw.strip()
-                if not line or line.startswith(":"):
-                    continue
-                if not line.startswith("data:"):
-                    continue
-                data = line[len("data:"):].strip()
-                if data == "[DONE]":
-                    break
-                if yield_raw_events:
-                    yield data
-                    continue
-                try:
-                    import json as _json
-                    obj = _json.loads(data)
-                    content = (
-                        obj.get("choices", [{}])[0]
-                        .get("delta", {})
-                        .get("content")
-                    )
-                    if content:
-                        yield content
-                except Exception:
-                    continue
+        payload = self._chat_payload(
+            messages,
+            model=model,
+            seed=seed,
+            private=private,
+            referrer=referrer,
+            token=token,
+            stream=True,
+        )
+        call = Call(
+            "POST",
+            f"{self.text_prompt_base}/{model}",
+            endpoint="chat",
+            op="chat_completion_stream",
+            model=model,
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "text/event-stream",
+            },
+            json=payload,
+            timeout=self._resolve_timeout(timeout, 300.0),
+            expires=self._expires_at(deadline),
+            stream=True,
+        )
+        for data in self._sse_stream(call):
+            if yield_raw_events:
+                yield data
+                continue
+            content = self._delta_content(data)
+            if content:
+                yield content
 
     def chat_completion_tools(
         self,
@@ -132,7 +120,11 @@ class ChatMixin:
         token: Optional[str] = None,
         as_json: bool = False,
         timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
         max_rounds: int = 1,
+        tool_workers: int = 1,
+        tool_timeout: Optional[float] = None,
+        memoize: Any = None,
     ) -> Any:
         if not isinstance(messages, list) or not messages:
             raise ValueError("messages must be a non-empty list of messages")
@@ -143,26 +135,33 @@ class ChatMixin:
         url = f"{self.text_prompt_base}/{model}"
         headers = {"Content-Type": "application/json"}
         eff_timeout = self._resolve_timeout(timeout, 60.0)
+        expires = self._expires_at(deadline)
+        memo = self._tool_memo(memoize, functions, token, referrer)
         history: List[Dict[str, Any]] = list(messages)
         rounds = 0
         while True:
-            payload: Dict[str, Any] = {
-                "model": model,
-                "messages": history,
-                "seed": seed,
-                "tools": tools,
-                "tool_choice": tool_choice,
-            }
-            if private is not None:
-                payload["private"] = bool(private)
-            if referrer:
-                payload["referrer"] = referrer
-            if token:
-                payload["token"] = token
-            payload["safe"] = False
-            resp = self.session.post(url, headers=headers, json=payload, timeout=eff_timeout)
-            resp.raise_for_status()
-            data = resp.json()
+            payload = self._chat_payload(
+                history,
+                model=model,
+                seed=seed,
+                private=private,
+                referrer=referrer,
+                token=token,
+                tools=tools,
+                tool_choice=tool_choice,
+            )
+            call = Call(
+                "POST",
+                url,
+                endpoint="chat",
+                op="chat_completion_tools",
+                model=model,
+                headers=headers,
+                json=payload,
+                timeout=eff_timeout,
+                expires=expires,
+            )
+            data = self._request_json(call)
             msg = (data.get("choices", [{}])[0]).get("message", {})
             tool_calls = msg.get("tool_calls", []) or []
             if not tool_calls or rounds >= max_rounds:
@@ -170,33 +169,446 @@ class ChatMixin:
                     return data
                 return msg.get("content")
             history.append(msg)
+            workers = min(tool_workers, len(tool_calls))
+            batch = ToolRound(lambda tc: self._run_tool(tc, functions, memo, call), workers, tool_timeout)
             for tc in tool_calls:
-                fn_name = tc.get("function", {}).get("name")
-                args_text = tc.get("function", {}).get("arguments", "{}")
+                batch.submit(tc)
+            history.extend(batch.results())
+            rounds += 1
+
+    def chat_completion_tools_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        *,
+        tools: List[Dict[str, Any]],
+        functions: Optional[Dict[str, Callable[..., Any]]] = None,
+        tool_choice: Any = "auto",
+        model: str = "openai",
+        seed: Optional[int] = None,
+        private: Optional[bool] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        max_rounds: int = 1,
+        yield_tool_results: bool = False,
+        tool_workers: int = 1,
+        tool_timeout: Optional[float] = None,
+        memoize: Any = None,
+    ) -> Iterator[Any]:
+        """Streaming ``chat_completion_tools``: yields text tokens as they arrive.
+
+        Tool calls are rebuilt from their ``delta.tool_calls`` fragments and
+        each one runs as soon as its arguments are complete, while the rest
+        of the response is still streaming. Their results go back to the
+        model in the next round, for up to ``max_rounds`` rounds. With
+        ``yield_tool_results=True`` each tool message (a dict) is yielded too.
+        ``memoize`` (function names, or a dict of name -> ttl) reuses those
+        handlers' results for identical arguments: within this call, or across
+        calls when the client has a ``tool_cache``.
+        """
+        if not isinstance(messages, list) or not messages:
+            raise ValueError("messages must be a non-empty list of messages")
+        if not isinstance(tools, list) or not tools:
+            raise ValueError("tools must be a non-empty list of tool specs")
+        if seed is None:
+            seed = self._random_seed()
+        expires = self._expires_at(deadline)
+        memo = self._tool_memo(memoize, functions, token, referrer)
+        history: List[Dict[str, Any]] = list(messages)
+        rounds = 0
+        while True:
+            payload = self._chat_payload(
+                history,
+                model=model,
+                seed=seed,
+                private=private,
+                referrer=referrer,
+                token=token,
+                tools=tools,
+                tool_choice=tool_choice,
+                stream=True,
+            )
+            call = self._tool_stream_call(model, payload, timeout, expires)
+            run_tools = rounds < max_rounds
+            assembler = ToolCallAssembler()
+            batch = ToolRound(lambda tc: self._run_tool(tc, functions, memo, call), tool_workers, tool_timeout)
+            text: List[str] = []
+            try:
+                for item in self._tool_stream_items(self._sse_stream(call), assembler):
+                    if isinstance(item, str):
+                        text.append(item)
+                        yield item
+                    elif run_tools:
+                        result = batch.submit(item)
+                        if result is not None and yield_tool_results:
+                            yield result
+                results = batch.results()
+            finally:
+                batch.close()
+            if not assembler.calls or not run_tools:
+                return
+            if yield_tool_results and batch.pooled:
+                yield from results
+            history.append(self._tool_stream_message(text, assembler))
+            history.extend(results)
+            rounds += 1
+
+    def map_chat(
+        self,
+        conversations: Iterable[Any],
+        *,
+        workers: int = 4,
+        ordered: bool = True,
+        progress: Progress = None,
+        model: str = "openai",
+        seed: Optional[int] = None,
+        private: Optional[bool] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        as_json: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> Iterator[BatchResult]:
+        """``chat_completion`` over an iterable on ``workers`` threads.
+
+        Items are message lists or dicts of ``chat_completion`` arguments
+        with a ``messages`` key. Otherwise behaves like ``map_text``.
+        """
+        shared = {
+            "model": model,
+            "seed": seed,
+            "private": private,
+            "referrer": referrer,
+            "token": token,
+            "as_json": as_json,
+            "timeout": timeout,
+        }
+        expires = self._expires_at(deadline)
+
+        def one(index: int, spec: Any) -> Any:
+            return self.chat_completion(deadline=remaining(expires), **spec_kwargs(spec, "messages", shared))
+
+        return run_batch(conversations, one, workers=workers, ordered=ordered, progress=progress)
+
+    # ----- helpers -----
+    def _chat_payload(
+        self,
+        messages: List[Dict[str, Any]],
+        *,
+        model: str,
+        seed: Optional[int],
+        private: Optional[bool],
+        referrer: Optional[str],
+        token: Optional[str],
+        **extra: Any,
+    ) -> Dict[str, Any]:
+        if not isinstance(messages, list) or not messages:
+            raise ValueError("messages must be a non-empty list of {role, content} dicts")
+        if seed is None:
+            seed = self._random_seed()
+        payload: Dict[str, Any] = {
+            "model": model,
+            "messages": messages,
+            "seed": seed,
+        }
+        payload.update(extra)
+        if private is not None:
+            payload["private"] = bool(private)
+        if referrer:
+            payload["referrer"] = referrer
+        if token:
+            payload["token"] = token
+        payload["safe"] = False
+        return payload
+
+    @classmethod
+    def _chat_result(cls, data: Any) -> Any:
+        try:
+            return cls._message_content(data)
+        except Exception:
+            return _json.dumps(data)
+
+    @staticmethod
+    def _message_content(data: Dict[str, Any]) -> Any:
+        return (
+            data.get("choices", [{}])[0]
+            .get("message", {})
+            .get("content")
+        )
+
+    @staticmethod
+    def _delta_content(data: str) -> Optional[str]:
+        # Runs once per streamed token: index directly and let a malformed
+        # event fall through to None.
+        try:
+            return _loads(data)["choices"][0]["delta"].get("content")
+        except Exception:
+            return None
+
+    def _tool_stream_call(
+        self, model: str, payload: Dict[str, Any], timeout: Optional[float], expires: Optional[float]
+    ) -> Call:
+        return Call(
+            "POST",
+            f"{self.text_prompt_base}/{model}",
+            endpoint="chat",
+            op="chat_completion_tools_stream",
+            model=model,
+            headers={
+                "Content-Type": "application/json",
+                "Accept": "text/event-stream",
+            },
+            json=payload,
+            timeout=self._resolve_timeout(timeout, 300.0),
+            expires=expires,
+            stream=True,
+        )
+
+    @classmethod
+    def _tool_stream_items(cls, events: Iterable[str], assembler: "ToolCallAssembler") -> Iterator[Any]:
+        # Text tokens as str, completed tool calls as dicts.
+        for data in events:
+            delta = cls._stream_delta(data)
+            if delta is None:
+                continue
+            content = delta.get("content")
+            if content:
+                yield content
+            fragments = delta.get("tool_calls")
+            if fragments:
+                yield from assembler.feed(fragments)
+        yield from assembler.finish()
+
+    @staticmethod
+    def _tool_stream_message(text: List[str], assembler: "ToolCallAssembler") -> Dict[str, Any]:
+        return {"role": "assistant", "content": "".join(text) or None, "tool_calls": assembler.calls}
+
+    @staticmethod
+    def _stream_delta(data: str) -> Optional[Dict[str, Any]]:
+        try:
+            delta = _loads(data)["choices"][0]["delta"]
+        except Exception:
+            return None
+        return delta if isinstance(delta, dict) else None
+
+    def _tool_memo(
+        self,
+        memoize: Any,
+        functions: Optional[Dict[str, Callable[..., Any]]],
+        token: Optional[str],
+        referrer: Optional[str],
+    ) -> ToolMemo:
+        """The cache and per-function ``(ttl, scope)`` for a tools call's
+        ``memoize=``. The cache is the client's ``tool_cache`` when it has
+        one, else one for this call only; the scope (handler and tenant)
+        keeps other handlers and tenants sharing that cache apart."""
+        if not memoize:
+            return None
+        ttls = dict(memoize) if isinstance(memoize, dict) else dict.fromkeys(memoize)
+        tenant = partition_key(token, referrer)
+        plans = {name: (ttl, ((functions or {}).get(name), tenant)) for name, ttl in ttls.items()}
+        return (self._tool_cache or ToolCache()), plans
+
+    def _memo_get(
+        self, memo: ToolMemo, fn_name: Optional[str], args: Any, call: Optional[Call] = None
+    ) -> Tuple[bool, Any]:
+        if memo is None or fn_name not in memo[1] or not isinstance(args, dict):
+            return False, None
+        hit, content = memo[0].get(fn_name, args, memo[1][fn_name][1])
+        if self._instr is not None and call is not None:
+            self._instr.tool_lookup(call, fn_name, hit)
+        return hit, content
+
+    @staticmethod
+    def _memo_put(memo: ToolMemo, fn_name: Optional[str], args: Any, result: Any) -> Any:
+        # Stored as the message content, so a hit skips serialising it again.
+        if memo is None or fn_name not in memo[1] or not isinstance(args, dict):
+            return result
+        content = result if isinstance(result, str) else _json.dumps(result)
+        ttl, scope = memo[1][fn_name]
+        memo[0].put(fn_name, args, content, ttl, scope)
+        return content
+
+    def _run_tool(
+        self,
+        tc: Dict[str, Any],
+        functions: Optional[Dict[str, Callable[..., Any]]],
+        memo: ToolMemo = None,
+        call: Optional[Call] = None,
+    ) -> Dict[str, Any]:
+        fn_name, args = self._tool_call_args(tc)
+        if functions and fn_name in functions:
+            hit, result = self._memo_get(memo, fn_name, args, call)
+            if not hit:
                 try:
-                    import json as _json
-                    args = _json.loads(args_text) if isinstance(args_text, str) else (args_text or {})
-                except Exception:
-                    args = {}
-                if functions and fn_name in functions:
-                    try:
-                        result = functions[fn_name](**args) if isinstance(args, dict) else functions[fn_name]()
-                    except Exception as e:
-                        result = {"error": f"function '{fn_name}' raised: {e}"}
-                else:
-                    result = {"error": f"no handler for function '{fn_name}'"}
-                if not isinstance(result, str):
-                    import json as _json
-                    content_str = _json.dumps(result)
+                    result = functions[fn_name](**args) if isinstance(args, dict) else functions[fn_name]()
+                except Exception as e:
+                    result = {"error": f"function '{fn_name}' raised: {e}"}
                 else:
-                    content_str = result
-                history.append(
-                    {
-                        "tool_call_id": tc.get("id"),
-                        "role": "tool",
-                        "name": fn_name,
-                        "content": content_str,
-                    }
-                )
-            rounds += 1
+                    result = self._memo_put(memo, fn_name, args, result)
+        else:
+            result = {"error": f"no handler for function '{fn_name}'"}
+        return self._tool_result_message(tc, fn_name, result)
+
+    @staticmethod
+    def _tool_call_args(tc: Dict[str, Any]) -> Tuple[Optional[str], Any]:
+        fn_name = tc.get("function", {}).get("name")
+        args_text = tc.get("function", {}).get("arguments", "{}")
+        try:
+            args = _json.loads(args_text) if isinstance(args_text, str) else (args_text or {})
+        except Exception:
+            args = {}
+        return fn_name, args
+
+    @staticmethod
+    def _tool_result_message(tc: Dict[str, Any], fn_name: Optional[str], result: Any) -> Dict[str, Any]:
+        if not isinstance(result, str):
+            content_str = _json.dumps(result)
+        else:
+            content_str = result
+        return {
+            "tool_call_id": tc.get("id"),
+            "role": "tool",
+            "name": fn_name,
+            "content": content_str,
+        }
+
+
+class ToolRound:
+    """Runs the tool handlers of one round; results come back in call order.
+
+    With ``workers`` of 1 and no ``timeout`` each handler runs inline when
+    submitted. Otherwise handlers run on up to ``workers`` threads, and one
+    still running ``timeout`` seconds after it started is answered with an
+    error result.
+
+    A timeout does not stop the handler: Python threads cannot be
+    interrupted, so it keeps running (and keeps its thread) until it
+    returns, and its result is discarded. The round does not wait for it,
+    but interpreter exit does. Handlers that can hang should bound their own
+    work, e.g. with a timeout on their network calls.
+    """
+
+    __slots__ = ("_run", "_workers", "_timeout", "_pool", "_jobs", "_started")
+
+    def __init__(
+        self, run: Callable[[Dict[str, Any]], Dict[str, Any]], workers: int = 1, timeout: Optional[float] = None
+    ) -> None:
+        self._run = run
+        self._workers = max(1, int(workers))
+        self._timeout = timeout
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._jobs: List[Tuple[Dict[str, Any], Any]] = []
+        self._started: Dict[int, float] = {}
+
+    @property
+    def pooled(self) -> bool:
+        return self._workers > 1 or self._timeout is not None
+
+    def submit(self, tc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Start ``tc``; returns its result message when it ran inline."""
+        if not self.pooled:
+            result = self._run(tc)
+            self._jobs.append((tc, result))
+            return result
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="polli-tool")
+        index = len(self._jobs)
+        future = self._pool.submit(contextvars.copy_context().run, self._timed, index, tc)
+        self._jobs.append((tc, future))
+        return None
+
+    def results(self) -> List[Dict[str, Any]]:
+        try:
+            return [self._result(i, tc, job) for i, (tc, job) in enumerate(self._jobs)]
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def _timed(self, index: int, tc: Dict[str, Any]) -> Dict[str, Any]:
+        self._started[index] = time.monotonic()
+        return self._run(tc)
+
+    def _result(self, index: int, tc: Dict[str, Any], job: Any) -> Dict[str, Any]:
+        if not isinstance(job, Future):
+            return job
+        timeout = self._timeout
+        while True:
+            started = self._started.get(index)
+            left = None if timeout is None else timeout if started is None else started + timeout - time.monotonic()
+            try:
+                return job.result(timeout=None if left is None else max(0.0, left))
+            except FutureTimeout:
+                if index in self._started and self._started[index] + timeout <= time.monotonic():
+                    break
+        job.cancel()
+        fn_name = (tc.get("function") or {}).get("name")
+        error = {"error": f"function '{fn_name}' timed out after {timeout:g}s"}
+        return ChatMixin._tool_result_message(tc, fn_name, error)
+
+
+class ToolCallAssembler:
+    """Rebuilds whole tool calls from streamed ``delta.tool_calls`` fragments.
+
+    Fragments carry an ``index``; the first one of a call has its ``id`` and
+    function name, the rest carry pieces of the ``arguments`` string.
+    ``feed()`` returns the calls a delta completed: a call is complete as
+    soon as its arguments parse as a JSON object, or once a later call
+    starts. ``finish()`` closes whatever is left at the end of the stream.
+    """
+
+    __slots__ = ("_open", "_parts", "_done")
+
+    def __init__(self) -> None:
+        self._open: Dict[int, Dict[str, Any]] = {}
+        self._parts: Dict[int, List[str]] = {}
+        self._done: Dict[int, Dict[str, Any]] = {}
+
+    @property
+    def calls(self) -> List[Dict[str, Any]]:
+        """Completed calls in index order, shaped like a non-streamed message's ``tool_calls``."""
+        return [self._done[i] for i in sorted(self._done)]
+
+    def feed(self, fragments: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        completed: List[Dict[str, Any]] = []
+        for frag in fragments:
+            index = frag.get("index", 0)
+            if index in self._done:
+                continue
+            call = self._open.get(index)
+            if call is None:
+                completed.extend(self._close(i) for i in sorted(self._open) if i < index)
+                call = self._open[index] = {"id": None, "type": "function", "function": {"name": None, "arguments": ""}}
+                self._parts[index] = []
+            if frag.get("id"):
+                call["id"] = frag["id"]
+            fn = frag.get("function") or {}
+            if fn.get("name") and not call["function"]["name"]:
+                call["function"]["name"] = fn["name"]
+            piece = fn.get("arguments")
+            if piece:
+                self._parts[index].append(piece)
+                if piece.rstrip().endswith("}") and self._parses(index):
+                    completed.append(self._close(index))
+        return completed
+
+    def finish(self) -> List[Dict[str, Any]]:
+        return [self._close(i) for i in sorted(self._open)]
+
+    def _parses(self, index: int) -> bool:
+        try:
+            return isinstance(_loads("".join(self._parts[index])), dict)
+        except Exception:
+            return False
+
+    def _close(self, index: int) -> Dict[str, Any]:
+        call = self._open.pop(index)
+        call["function"]["arguments"] = "".join(self._parts.pop(index)) or "{}"
+        self._done[index] = call
+        return call
 
@@ -1,7 +1,16 @@
 from __future__ import annotations
 
+import base64
+import time
 from typing import Any, Dict, Iterator, Optional
 
+from .base import Call, DeadlineExceeded
+from .sse import loads as _loads
+
+
+IMAGE_FEED_URL = "https://image.pollinations.ai/feed"
+TEXT_FEED_URL = "https://text.pollinations.ai/feed"
+
 
 class FeedsMixin:
     def image_feed_stream(
@@ -10,6 +19,7 @@ class FeedsMixin:
         referrer: Optional[str] = None,
         token: Optional[str] = None,
         timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
         reconnect: bool = False,
         retry_delay: float = 10.0,
         yield_raw_events: bool = False,
@@ -22,69 +32,37 @@ class FeedsMixin:
         - include_bytes -> add 'image_bytes' to each dict
         - include_data_url -> add 'image_data_url' (base64) to each dict
         """
-        feed_url = "https://image.pollinations.ai/feed"
-
         eff_timeout = self._resolve_timeout(timeout, 300.0)
+        expires = self._expires_at(deadline)
 
-        def _connect() -> Iterator[Any]:
-            params: Dict[str, Any] = {}
-            if referrer:
-                params["referrer"] = referrer
-            if token:
-                params["token"] = token
-            headers = {"Accept": "text/event-stream"}
-            with self.session.get(feed_url, params=params, headers=headers, stream=True, timeout=eff_timeout) as resp:
-                resp.raise_for_status()
-                for raw in resp.iter_lines(decode_unicode=True):
-                    if not raw:
-                        continue
-                    if isinstance(raw, bytes):
-                        try:
-                            raw = raw.decode("utf-8", errors="ignore")
-                        except Exception:
-                            continue
-                    line = raw.strip()
-                    if not line or line.startswith(":"):
-                        continue
-                    if not line.startswith("data:"):
-                        continue
-                    data = line[len("data:"):].strip()
-                    if data == "[DONE]":
-                        break
-                    if yield_raw_events:
-                        yield data
-                        continue
-                    try:
-                        import json as _json, base64 as _b64
-                        ev = _json.loads(data)
-                        if include_data_url or include_bytes:
-                            img_url = ev.get("imageURL") or ev.get("image_url")
-                            if img_url:
-                                r = self.session.get(img_url, timeout=eff_timeout)
-                                r.raise_for_status()
-                                content = r.content
-                                if include_data_url:
-                                    ctype = r.headers.get("Content-Type", "image/jpeg")
-                                    b64 = _b64.b64encode(content).decode("utf-8")
-                                    ev["image_data_url"] = f"data:{ctype};base64,{b64}"
-                                elif include_bytes:
-                                    ev["image_bytes"] = content
-                        yield ev
-                    except Exception:
-                        continue
+        def _attach(ev: Dict[str, Any]) -> Dict[str, Any]:
+            if include_data_url or include_bytes:
+                img_url = ev.get("imageURL") or ev.get("image_url")
+                if img_url:
+                    call = Call(
+                        "GET",
+                        img_url,
+                        endpoint="image",
+                        op="feed_image",
+                        timeout=eff_timeout,
+                        throttle=False,
+                        expires=expires,
+                    )
+                    content, headers = self._fetch(call, lambda r: (r.content, r.headers))
+                    self._attach_image(ev, content, headers, include_data_url, include_bytes)
+            return ev
 
-        if not reconnect:
-            yield from _connect()
-            return
+        def _connect() -> Iterator[Any]:
+            for data in self._feed_events(IMAGE_FEED_URL, referrer, token, eff_timeout, expires):
+                if yield_raw_events:
+                    yield data
+                    continue
+                try:
+                    yield _attach(_loads(data))
+                except Exception:
+                    continue
 
-        import time as _time
-        while True:
-            try:
-                for item in _connect():
-                    yield item
-            except Exception:
-                pass
-            _time.sleep(retry_delay)
+        yield from self._feed_loop(_connect, reconnect, retry_delay, expires)
 
     def text_feed_stream(
         self,
@@ -92,58 +70,90 @@ class FeedsMixin:
         referrer: Optional[str] = None,
         token: Optional[str] = None,
         timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
         reconnect: bool = False,
         retry_delay: float = 10.0,
         yield_raw_events: bool = False,
     ) -> Iterator[Any]:
-        feed_url = "https://text.pollinations.ai/feed"
-
         eff_timeout = self._resolve_timeout(timeout, 300.0)
+        expires = self._expires_at(deadline)
 
         def _connect() -> Iterator[Any]:
-            params: Dict[str, Any] = {}
-            if referrer:
-                params["referrer"] = referrer
-            if token:
-                params["token"] = token
-            headers = {"Accept": "text/event-stream"}
-            with self.session.get(feed_url, params=params, headers=headers, stream=True, timeout=eff_timeout) as resp:
-                resp.raise_for_status()
-                for raw in resp.iter_lines(decode_unicode=True):
-                    if not raw:
-                        continue
-                    if isinstance(raw, bytes):
-                        try:
-                            raw = raw.decode("utf-8", errors="ignore")
-                        except Exception:
-                            continue
-                    line = raw.strip()
-                    if not line or line.startswith(":"):
-                        continue
-                    if not line.startswith("data:"):
-                        continue
-                    data = line[len("data:"):].strip()
-                    if data == "[DONE]":
-                        break
-                    if yield_raw_events:
-                        yield data
-                        continue
-                    try:
-                        import json as _json
-                        yield _json.loads(data)
-                    except Exception:
-                        continue
+            for data in self._feed_events(TEXT_FEED_URL, referrer, token, eff_timeout, expires):
+                if yield_raw_events:
+                    yield data
+                    continue
+                try:
+                    yield _loads(data)
+                except Exception:
+                    continue
+
+        yield from self._feed_loop(_connect, reconnect, retry_delay, expires)
 
+    # ----- helpers -----
+    def _feed_events(
+        self,
+        feed_url: str,
+        referrer: Optional[str],
+        token: Optional[str],
+        eff_timeout: float,
+        expires: Optional[float] = None,
+    ) -> Iterator[str]:
+        call = Call(
+            "GET",
+            feed_url,
+            endpoint="feed",
+            params=self._feed_params(referrer, token),
+            headers={"Accept": "text/event-stream"},
+            timeout=eff_timeout,
+            expires=expires,
+            stream=True,
+        )
+        yield from self._sse_stream(call)
+
+    def _feed_loop(
+        self, connect: Any, reconnect: bool, retry_delay: float, expires: Optional[float] = None
+    ) -> Iterator[Any]:
         if not reconnect:
-            yield from _connect()
+            yield from connect()
             return
 
-        import time as _time
         while True:
             try:
-                for item in _connect():
+                for item in connect():
                     yield item
+            except DeadlineExceeded:
+                raise
             except Exception:
                 pass
-            _time.sleep(retry_delay)
+            self._reconnect_budget(expires, retry_delay)
+            self._sleep(retry_delay)
+
+    @staticmethod
+    def _reconnect_budget(expires: Optional[float], retry_delay: float) -> None:
+        if expires is not None and expires - time.monotonic() <= retry_delay:
+            raise DeadlineExceeded("feed deadline exceeded before reconnect")
+
+    @staticmethod
+    def _feed_params(referrer: Optional[str], token: Optional[str]) -> Dict[str, Any]:
+        params: Dict[str, Any] = {}
+        if referrer:
+            params["referrer"] = referrer
+        if token:
+            params["token"] = token
+        return params
 
+    @staticmethod
+    def _attach_image(
+        ev: Dict[str, Any],
+        content: bytes,
+        headers: Any,
+        include_data_url: bool,
+        include_bytes: bool,
+    ) -> None:
+        if include_data_url:
+            ctype = headers.get("Content-Type", "image/jpeg")
+            b64 = base64.b64encode(content).decode("utf-8")
+            ev["image_data_url"] = f"data:{ctype};base64,{b64}"
+        elif include_bytes:
+            ev["image_bytes"] = content
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class FlightTimeout(TimeoutError):
+    """A follower gave up waiting for the in-flight leader."""
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller (the leader) runs ``fn``; callers arriving while it is
+    in flight wait and receive the same result or exception, except for
+    exceptions of the ``rerun`` types: those belong to the leader alone
+    (its deadline, say), and each follower calls ``do`` again with its own
+    ``fn``. Nothing is remembered once the leader finishes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.shared = 0
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        timeout: Optional[float] = None,
+        rerun: Tuple[type, ...] = (),
+    ) -> Tuple[Any, bool]:
+        """Return ``(result, shared)``; ``shared`` is True for followers."""
+        expires = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                else:
+                    flight.followers += 1
+                    self.shared += 1
+            assert flight is not None
+            if leader:
+                break
+            wait = None if expires is None else max(0.0, expires - time.monotonic())
+            if not flight.done.wait(wait):
+                raise FlightTimeout("gave up waiting for an identical in-flight request")
+            if flight.error is None:
+                return flight.result, True
+            if not isinstance(flight.error, rerun):
+                raise flight.error
+        try:
+            flight.result = fn()
+            return flight.result, False
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of SingleFlight.
+
+    The shared work runs in its own task so that cancelling any one caller,
+    the leader included, does not cancel it for the others. ``rerun`` works
+    as for SingleFlight.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.shared = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+        timeout: Optional[float] = None,
+        rerun: Tuple[type, ...] = (),
+    ) -> Tuple[Any, bool]:
+        expires = None if timeout is None else time.monotonic() + timeout
+        while True:
+            task = self._tasks.get(key)
+            shared = task is not None
+            if task is None:
+                task = asyncio.ensure_future(fn())
+                self._tasks[key] = task
+                task.add_done_callback(lambda t: self._forget(key, t))
+            else:
+                self.shared += 1
+            wait = None if expires is None else max(0.0, expires - time.monotonic())
+            try:
+                result = await asyncio.wait_for(asyncio.shield(task), wait)
+            except BaseException as exc:
+                if isinstance(exc, asyncio.TimeoutError) and not task.done():
+                    raise FlightTimeout("gave up waiting for an identical in-flight request") from exc
+                if shared and task.done() and isinstance(exc, rerun):
+                    continue
+                raise
+            return result, shared
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so an unawaited failure is not logged
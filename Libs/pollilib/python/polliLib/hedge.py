@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+class HedgePolicy:
+    """When to send a duplicate of a slow idempotent request.
+
+    A hedge fires once the first attempt has been outstanding longer than the
+    ``percentile`` of the last ``window`` observed latencies for its endpoint
+    (never sooner than ``min_delay``). Nothing is hedged until ``min_samples``
+    latencies are known. Each request earns ``max_ratio`` of a hedge, so at
+    most that fraction of traffic is ever duplicated. The sync client races
+    at most ``max_concurrent`` requests at once on its own threads; calls
+    beyond that run unhedged on the caller's thread.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        max_ratio: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        min_delay: float = 0.05,
+        max_concurrent: int = 64,
+    ) -> None:
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        self.percentile = float(percentile)
+        self.max_ratio = min(1.0, max(0.0, float(max_ratio)))
+        self.window = max(1, int(window))
+        self.min_samples = max(1, min(int(min_samples), self.window))
+        self.min_delay = max(0.0, float(min_delay))
+        self.max_concurrent = max(1, int(max_concurrent))
+
+
+class _EndpointHedges:
+    __slots__ = ("latencies", "credit", "requests", "hedges", "hedge_wins")
+
+    def __init__(self, window: int) -> None:
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.credit = 0.0
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+
+class Hedger:
+    """Per-endpoint latency windows and hedge budgets."""
+
+    def __init__(self, policy: HedgePolicy) -> None:
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, _EndpointHedges] = {}
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None while samples are too few."""
+        with self._lock:
+            ep = self._endpoint(endpoint)
+            ep.requests += 1
+            ep.credit = min(ep.credit + self.policy.max_ratio, max(1.0, self.policy.max_ratio * self.policy.window))
+            if len(ep.latencies) < self.policy.min_samples:
+                return None
+            ordered = sorted(ep.latencies)
+        idx = min(len(ordered) - 1, int(self.policy.percentile * len(ordered)))
+        return max(self.policy.min_delay, ordered[idx])
+
+    def acquire(self, endpoint: str) -> bool:
+        """Spend one hedge from the endpoint's budget if there is one."""
+        with self._lock:
+            ep = self._endpoint(endpoint)
+            if ep.credit < 1.0:
+                return False
+            ep.credit -= 1.0
+            ep.hedges += 1
+            return True
+
+    def refund(self, endpoint: str) -> None:
+        """Give back a hedge taken with acquire() that was never sent."""
+        with self._lock:
+            ep = self._endpoint(endpoint)
+            ep.credit += 1.0
+            ep.hedges -= 1
+
+    def observe(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            self._endpoint(endpoint).latencies.append(max(0.0, seconds))
+
+    def hedge_won(self, endpoint: str) -> None:
+        with self._lock:
+            self._endpoint(endpoint).hedge_wins += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {
+                    "requests": ep.requests,
+                    "hedges": ep.hedges,
+                    "hedge_wins": ep.hedge_wins,
+                    "samples": len(ep.latencies),
+                }
+                for name, ep in self._endpoints.items()
+            }
+
+    def _endpoint(self, endpoint: str) -> _EndpointHedges:
+        ep = self._endpoints.get(endpoint)
+        if ep is None:
+            ep = self._endpoints[endpoint] = _EndpointHedges(self.policy.window)
+        return ep
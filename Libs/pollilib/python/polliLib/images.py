@@ -1,6 +1,14 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import datetime as dt
+import os
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from .base import Call
+from .batch import BatchResult, Progress, remaining, run_batch, spec_kwargs
+from .cache import copy_file, replacing
+
+ImageSpec = Union[str, Dict[str, Any]]
 
 
 class ImageMixin:
@@ -17,65 +25,35 @@ class ImageMixin:
         referrer: Optional[str] = None,
         token: Optional[str] = None,
         timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
         out_path: Optional[str] = None,
         chunk_size: int = 1024 * 64,
     ) -> bytes | str:
-        if not isinstance(prompt, str) or not prompt.strip():
-            raise ValueError("prompt must be a non-empty string")
-        width = int(width)
-        height = int(height)
-        if width <= 0 or height <= 0:
-            raise ValueError("width and height must be positive integers")
-        if seed is None:
-            seed = self._random_seed()
-        params: Dict[str, Any] = {
-            "width": width,
-            "height": height,
-            "seed": seed,
-            "model": model,
-            "nologo": "true" if nologo else "false",
-            "safe": "false",
-        }
-        if image:
-            params["image"] = image
-        if referrer:
-            params["referrer"] = referrer
-        if token:
-            params["token"] = token
-
-        url = self._image_prompt_url(prompt)
-        eff_timeout = self._resolve_timeout(timeout, 300.0)
-        attempt = 0
-        stream = bool(out_path)
-        response = None
-        while True:
-            with self._request_lock:
-                self._wait_before_attempt(attempt)
-                resp = self.session.get(url, params=params, timeout=eff_timeout, stream=stream)
-                if self._should_retry_status(resp.status_code):
-                    if not self._can_retry(attempt + 1):
-                        resp.raise_for_status()
-                    resp.close()
-                    attempt += 1
-                    continue
-                try:
-                    resp.raise_for_status()
-                except Exception:
-                    resp.close()
-                    raise
-                self._mark_success()
-                response = resp
-                break
-        if out_path:
-            with response as r:
-                with open(out_path, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=chunk_size):
-                        if chunk:
-                            f.write(chunk)
-            return out_path
-        content = response.content
-        response.close()
-        return content
+        url, params = self._image_request(
+            prompt,
+            width=width,
+            height=height,
+            model=model,
+            seed=seed,
+            nologo=nologo,
+            image=image,
+            referrer=referrer,
+            token=token,
+        )
+        call = Call(
+            "GET",
+            url,
+            endpoint="image",
+            op="generate_image",
+            model=model,
+            params=params,
+            timeout=self._resolve_timeout(timeout, 300.0),
+            expires=self._expires_at(deadline),
+            hedge=seed is not None,
+            coalesce=seed is not None,
+            cache=seed is not None,
+        )
+        return self._download(call, out_path, chunk_size)
 
     def save_image_timestamped(
         self,
@@ -89,20 +67,13 @@ class ImageMixin:
         referrer: Optional[str] = None,
         token: Optional[str] = None,
         timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
         images_dir: Optional[str] = None,
         filename_prefix: str = "",
         filename_suffix: str = "",
         ext: str = "jpeg",
     ) -> str:
-        import os
-        import datetime as dt
-        if images_dir is None:
-            images_dir = os.path.join(os.getcwd(), "images")
-        os.makedirs(images_dir, exist_ok=True)
-        ts = dt.datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        safe_ext = (ext or "jpeg").lstrip(".")
-        fname = f"{filename_prefix}{ts}{filename_suffix}.{safe_ext}"
-        out_path = os.path.join(images_dir, fname)
+        out_path = self._timestamped_path(images_dir, filename_prefix, filename_suffix, ext)
         return self.generate_image(
             prompt,
             width=width,
@@ -114,6 +85,7 @@ class ImageMixin:
             referrer=referrer,
             token=token,
             timeout=timeout,
+            deadline=deadline,
             out_path=out_path,
         )
 
@@ -124,44 +96,156 @@ class ImageMixin:
         referrer: Optional[str] = None,
         token: Optional[str] = None,
         timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
         out_path: Optional[str] = None,
         chunk_size: int = 1024 * 64,
     ) -> bytes | str:
+        call = Call(
+            "GET",
+            image_url,
+            endpoint="image",
+            op="fetch_image",
+            params=self._fetch_params(referrer, token),
+            timeout=self._resolve_timeout(timeout, 120.0),
+            expires=self._expires_at(deadline),
+            coalesce=True,
+        )
+        return self._download(call, out_path, chunk_size)
+
+    def generate_images_batch(
+        self,
+        specs: Iterable[ImageSpec],
+        *,
+        out_dir: Optional[str] = None,
+        workers: int = 4,
+        ordered: bool = False,
+        progress: Progress = None,
+        width: int = 512,
+        height: int = 512,
+        model: str = "flux",
+        nologo: bool = True,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        ext: str = "jpeg",
+    ) -> Iterator[BatchResult]:
+        """Generate many images on ``workers`` threads; yields a BatchResult per spec.
+
+        A spec is a prompt or a dict of ``generate_image`` keyword arguments
+        (overriding the shared ones here) plus an optional ``filename``.
+        With ``out_dir`` each image is streamed to ``<out_dir>/<filename>``
+        (default ``<index>.<ext>``) and ``value`` is the path; otherwise it
+        is the bytes. ``progress`` gets a BatchProgress after each item.
+        Requests still pass the client's "image" rate limit.
+        ``deadline`` covers the whole batch.
+        """
+        shared = {
+            "width": width,
+            "height": height,
+            "model": model,
+            "nologo": nologo,
+            "referrer": referrer,
+            "token": token,
+            "timeout": timeout,
+        }
+        expires = self._expires_at(deadline)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+
+        def one(index: int, spec: ImageSpec) -> bytes | str:
+            kwargs = self._batch_image_kwargs(index, spec, shared, out_dir, ext)
+            return self.generate_image(deadline=remaining(expires), **kwargs)
+
+        return run_batch(specs, one, workers=workers, ordered=ordered, progress=progress)
+
+    @staticmethod
+    def _batch_image_kwargs(
+        index: int, spec: ImageSpec, shared: Dict[str, Any], out_dir: Optional[str], ext: str
+    ) -> Dict[str, Any]:
+        kwargs = spec_kwargs(spec, "prompt", shared)
+        filename = kwargs.pop("filename", None)
+        if out_dir:
+            kwargs["out_path"] = os.path.join(out_dir, filename or f"{index:05d}.{(ext or 'jpeg').lstrip('.')}")
+        return kwargs
+
+    def _download(self, call: Call, out_path: Optional[str], chunk_size: int) -> bytes | str:
+        if out_path:
+            # A follower of a coalesced download gets a copy of the leader's file.
+            path = self._coalesced(
+                call,
+                lambda: self._cached_file(call, out_path, lambda: self._stream_to_file(call, out_path, chunk_size)),
+                "file",
+            )
+            if path != out_path:
+                copy_file(path, out_path)
+            return out_path
+        return self._coalesced(call, lambda: self._cached(call, lambda: self._request_content(call)))
+
+    def _stream_to_file(self, call: Call, out_path: str, chunk_size: int) -> str:
+        with replacing(out_path) as tmp, open(tmp, "wb") as f:
+            for chunk in self._stream(call, lambda r: r.iter_content(chunk_size=chunk_size)):
+                if chunk:
+                    f.write(chunk)
+        return out_path
+
+    def _image_request(
+        self,
+        prompt: str,
+        *,
+        width: int,
+        height: int,
+        model: str,
+        seed: Optional[int],
+        nologo: bool,
+        image: Optional[str],
+        referrer: Optional[str],
+        token: Optional[str],
+    ) -> Tuple[str, Dict[str, Any]]:
+        if not isinstance(prompt, str) or not prompt.strip():
+            raise ValueError("prompt must be a non-empty string")
+        width = int(width)
+        height = int(height)
+        if width <= 0 or height <= 0:
+            raise ValueError("width and height must be positive integers")
+        if seed is None:
+            seed = self._random_seed()
+        params: Dict[str, Any] = {
+            "width": width,
+            "height": height,
+            "seed": seed,
+            "model": model,
+            "nologo": "true" if nologo else "false",
+            "safe": "false",
+        }
+        if image:
+            params["image"] = image
+        if referrer:
+            params["referrer"] = referrer
+        if token:
+            params["token"] = token
+        return self._image_prompt_url(prompt), params
+
+    @staticmethod
+    def _fetch_params(referrer: Optional[str], token: Optional[str]) -> Dict[str, Any]:
         params: Dict[str, Any] = {}
         if referrer:
             params["referrer"] = referrer
         if token:
             params["token"] = token
-        attempt = 0
-        stream = bool(out_path)
-        response = None
-        while True:
-            with self._request_lock:
-                self._wait_before_attempt(attempt)
-                eff_timeout = self._resolve_timeout(timeout, 120.0)
-                resp = self.session.get(image_url, params=params, timeout=eff_timeout, stream=stream)
-                if self._should_retry_status(resp.status_code):
-                    if not self._can_retry(attempt + 1):
-                        resp.raise_for_status()
-                    resp.close()
-                    attempt += 1
-                    continue
-                try:
-                    resp.raise_for_status()
-                except Exception:
-                    resp.close()
-                    raise
-                self._mark_success()
-                response = resp
-                break
-        if out_path:
-            with response as r:
-                with open(out_path, "wb") as f:
-                    for chunk in r.iter_content(chunk_size=chunk_size):
-                        if chunk:
-                            f.write(chunk)
-            return out_path
-        content = response.content
-        response.close()
-        return content
+        return params
 
+    @staticmethod
+    def _timestamped_path(
+        images_dir: Optional[str],
+        filename_prefix: str,
+        filename_suffix: str,
+        ext: str,
+    ) -> str:
+        if images_dir is None:
+            images_dir = os.path.join(os.getcwd(), "images")
+        os.makedirs(images_dir, exist_ok=True)
+        ts = dt.datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        safe_ext = (ext or "jpeg").lstrip(".")
+        fname = f"{filename_prefix}{ts}{filename_suffix}.{safe_ext}"
+        return os.path.join(images_dir, fname)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+Labels = Optional[Dict[str, str]]
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+HELP: Dict[str, Tuple[str, str]] = {
+    "polli_request_duration_seconds": ("histogram", "Whole call time including waits and retries."),
+    "polli_time_to_first_byte_seconds": ("histogram", "Call start to first response byte."),
+    "polli_attempt_duration_seconds": ("histogram", "Single HTTP attempt until response headers."),
+    "polli_wait_seconds": ("histogram", "Time spent waiting before an attempt (rate limit or backoff)."),
+    "polli_retries_total": ("counter", "Retries performed, by reason."),
+    "polli_responses_total": ("counter", "HTTP responses received, by status code."),
+    "polli_request_bytes_total": ("counter", "Request body bytes sent, summed over attempts."),
+    "polli_response_bytes_total": ("counter", "Response body bytes received."),
+    "polli_tool_cache_total": ("counter", "Memoized tool handler lookups, by function and result (hit/miss)."),
+}
+
+
+class MetricsSink:
+    """Hook interface the client reports into. Override either method to
+    forward samples to your own metrics system; the defaults drop them."""
+
+    def inc(self, name: str, value: float = 1.0, labels: Labels = None) -> None:
+        pass
+
+    def observe(self, name: str, value: float, labels: Labels = None) -> None:
+        pass
+
+
+class MetricsRegistry(MetricsSink):
+    """In-process counters and histograms with Prometheus text output."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[_LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[_LabelKey, List[float]]] = {}
+
+    def inc(self, name: str, value: float = 1.0, labels: Labels = None) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Labels = None) -> None:
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            h = series.get(key)
+            if h is None:
+                # per-bucket counts, then +Inf, sum, count
+                h = series[key] = [0.0] * (len(self.buckets) + 3)
+            h[idx] += 1
+            h[-2] += value
+            h[-1] += 1
+
+    def counter(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(self._key(labels), 0.0)
+
+    def histogram(self, name: str, **labels: str) -> Dict[str, float]:
+        with self._lock:
+            h = self._histograms.get(name, {}).get(self._key(labels))
+            return {"count": h[-1], "sum": h[-2]} if h else {"count": 0.0, "sum": 0.0}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            counters = {n: dict(s) for n, s in self._counters.items()}
+            histograms = {n: {k: list(v) for k, v in s.items()} for n, s in self._histograms.items()}
+        lines: List[str] = []
+        for name in sorted(counters):
+            self._header(lines, name, "counter")
+            for key, value in sorted(counters[name].items()):
+                lines.append(f"{name}{self._fmt(key)} {_num(value)}")
+        for name in sorted(histograms):
+            self._header(lines, name, "histogram")
+            for key, h in sorted(histograms[name].items()):
+                running = 0.0
+                for bound, count in zip(self.buckets, h):
+                    running += count
+                    lines.append(f"{name}_bucket{self._fmt(key, ('le', _num(bound)))} {_num(running)}")
+                lines.append(f"{name}_bucket{self._fmt(key, ('le', '+Inf'))} {_num(h[-1])}")
+                lines.append(f"{name}_sum{self._fmt(key)} {_num(h[-2])}")
+                lines.append(f"{name}_count{self._fmt(key)} {_num(h[-1])}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    @staticmethod
+    def _header(lines: List[str], name: str, kind: str) -> None:
+        text = HELP.get(name, (kind, ""))[1]
+        if text:
+            lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    @staticmethod
+    def _key(labels: Labels) -> _LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+    @staticmethod
+    def _fmt(key: _LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(key) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+        return "{" + body + "}"
+
+
+class RequestMetrics:
+    """Turns BaseClient request lifecycle events into samples on a sink."""
+
+    def __init__(self, sink: MetricsSink) -> None:
+        self.sink = sink
+
+    def start(self, call: Any) -> None:
+        pass
+
+    def connect(self, call: Any, seconds: float) -> None:
+        pass
+
+    def first_token(self, call: Any, seconds: float) -> None:
+        pass
+
+    def wait(self, call: Any, seconds: float, reason: str) -> None:
+        self.sink.observe("polli_wait_seconds", seconds, {**self._attempt_labels(call), "reason": reason})
+
+    def response(self, call: Any, status: int, seconds: float, sent: int = 0) -> None:
+        labels = self._attempt_labels(call)
+        self.sink.observe("polli_attempt_duration_seconds", seconds, labels)
+        self.sink.inc("polli_responses_total", 1.0, {**labels, "status": str(status)})
+        if sent:
+            self.sink.inc("polli_request_bytes_total", float(sent), self._labels(call))
+
+    def retry(self, call: Any, reason: str) -> None:
+        self.sink.inc("polli_retries_total", 1.0, {**self._labels(call), "reason": reason})
+
+    def first_byte(self, call: Any, seconds: float) -> None:
+        self.sink.observe("polli_time_to_first_byte_seconds", seconds, self._labels(call))
+
+    def finish(self, call: Any, seconds: float, error: Optional[BaseException], nbytes: int) -> None:
+        labels = self._labels(call)
+        if error is None:
+            outcome = "ok"
+        elif isinstance(error, GeneratorExit):
+            outcome = "closed"  # the caller stopped reading a stream early
+        else:
+            outcome = type(error).__name__
+        self.sink.observe("polli_request_duration_seconds", seconds, {**labels, "outcome": outcome})
+        if nbytes:
+            self.sink.inc("polli_response_bytes_total", float(nbytes), labels)
+
+    def tool_lookup(self, call: Any, function: str, hit: bool) -> None:
+        labels = {**self._labels(call), "function": function, "result": "hit" if hit else "miss"}
+        self.sink.inc("polli_tool_cache_total", 1.0, labels)
+
+    @staticmethod
+    def _labels(call: Any) -> Dict[str, str]:
+        return {"operation": call.op or call.endpoint, "model": call.model or ""}
+
+    @staticmethod
+    def _attempt_labels(call: Any) -> Dict[str, str]:
+        return {"endpoint": call.endpoint, "operation": call.op or call.endpoint, "model": call.model or ""}
+
+
+class Instruments:
+    """Fans each lifecycle event out to several hook objects."""
+
+    def __init__(self, *hooks: Any) -> None:
+        self.hooks = hooks
+
+    def __getattr__(self, event: str) -> Any:
+        handlers = [getattr(h, event) for h in self.hooks]
+
+        def emit(*args: Any) -> None:
+            for handler in handlers:
+                handler(*args)
+
+        return emit
+
+
+def _num(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -0,0 +1,436 @@
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+
+RateSpec = Any  # None (unlimited) | rate | (rate, burst)
+
+# Priority lanes; a lower number is served first.
+INTERACTIVE, NORMAL, BACKGROUND = 0, 1, 2
+LANES: Dict[str, int] = {"interactive": INTERACTIVE, "normal": NORMAL, "background": BACKGROUND}
+
+_LANE: "contextvars.ContextVar[int]" = contextvars.ContextVar("polli_priority", default=NORMAL)
+
+
+def lane_of(priority: Union[str, int]) -> int:
+    if isinstance(priority, int) and priority in LANES.values():
+        return priority
+    try:
+        return LANES[str(priority)]
+    except KeyError:
+        raise ValueError(f"unknown priority {priority!r}; expected one of {', '.join(LANES)}") from None
+
+
+def current_lane() -> int:
+    return _LANE.get()
+
+
+class Slot:
+    """A start time handed out by TokenBucket.schedule.
+
+    ``owed`` is how much later the slot has been moved by higher-priority
+    requests since its holder last looked; ``delayed`` is the running total,
+    capped by the bucket's ``max_delay`` so low lanes are never starved.
+    """
+
+    __slots__ = ("lane", "start", "owed", "delayed")
+
+    def __init__(self, lane: int, start: float) -> None:
+        self.lane = lane
+        self.start = start
+        self.owed = 0.0
+        self.delayed = 0.0
+
+
+class TokenBucket:
+    """Token bucket that meters request *starts*.
+
+    ``reserve()`` takes a token immediately (the balance may go negative) and
+    returns how long the caller must wait before starting its request, so the
+    lock is only held for the bookkeeping and never across a round trip.
+
+    ``schedule(lane)`` does the same but lets a higher-priority lane take
+    the earliest slot still held by a waiting lower-lane request. The
+    displaced requests each move back one interval and learn about it from
+    ``recheck()`` when they wake; none is moved back by more than
+    ``max_delay`` seconds in total.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        max_delay: float = 5.0,
+    ) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.rate = float(rate) if rate and rate > 0 else None
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self.max_delay = max(0.0, float(max_delay))
+        self._waiting: List[Slot] = []
+
+    def configure(self, rate: Optional[float], burst: int = 1) -> None:
+        with self._lock:
+            self._refill(self._clock())
+            self.rate = float(rate) if rate and rate > 0 else None
+            self.burst = max(1, int(burst))
+            self._tokens = min(self._tokens, float(self.burst))
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate is None
+
+    def reserve(self) -> float:
+        return self._take(NORMAL, track=False)[0]
+
+    def schedule(self, lane: int = NORMAL) -> Tuple[float, Optional[Slot]]:
+        """Reserve a start in ``lane``: ``(wait, slot)``; pass ``slot`` to recheck() after waiting."""
+        return self._take(lane, track=True)
+
+    def refund(self, slot: Optional[Slot] = None) -> None:
+        """Give back a token taken by reserve()/schedule() that went unused."""
+        with self._lock:
+            if slot is not None and slot in self._waiting:
+                self._waiting.remove(slot)
+            if self.rate is None:
+                return
+            self._refill(self._clock())
+            self._tokens = min(float(self.burst), self._tokens + 1.0)
+
+    def try_reserve(self) -> bool:
+        """Take a token only if one is free now and nobody is queued for it."""
+        with self._lock:
+            now = self._clock()
+            if self._paused_until > now:
+                return False
+            if self.rate is None:
+                return True
+            self._refill(now)
+            if self._tokens < 1.0 or any(w.start > now for w in self._waiting):
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def recheck(self, slot: Slot) -> float:
+        """Extra wait owed because higher lanes moved ``slot``; 0 means start now."""
+        with self._lock:
+            owed, slot.owed = slot.owed, 0.0
+            if owed <= 0 and slot in self._waiting:
+                self._waiting.remove(slot)
+            return owed
+
+    def _take(self, lane: int, track: bool) -> Tuple[float, Optional[Slot]]:
+        with self._lock:
+            now = self._clock()
+            paused = max(0.0, self._paused_until - now)
+            if self.rate is None:
+                return paused, None
+            self._refill(now)
+            self._tokens -= 1.0
+            start = now + max(0.0, -self._tokens / self.rate)
+            if not track:
+                return max(paused, start - now), None
+            self._waiting = [w for w in self._waiting if w.start > now]
+            interval = 1.0 / self.rate
+            jump = self._jump_point(lane, start, interval)
+            if jump is not None:
+                for w in self._waiting:
+                    if w.start >= jump:
+                        w.start += interval
+                        w.owed += interval
+                        w.delayed += interval
+                start = jump
+            slot = Slot(lane, start)
+            if start > now:
+                self._waiting.append(slot)
+                self._waiting.sort(key=lambda w: w.start)
+            return max(paused, start - now), slot
+
+    def _jump_point(self, lane: int, start: float, interval: float) -> Optional[float]:
+        # Earliest waiting slot that is only followed by bumpable lower-lane
+        # waiters; everything from there on moves back one interval.
+        barrier = float("-inf")
+        for w in self._waiting:
+            if w.lane <= lane or w.delayed + interval > self.max_delay:
+                barrier = max(barrier, w.start)
+        for w in self._waiting:
+            if w.start > barrier and w.start < start:
+                return w.start
+        return None
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill(self._clock())
+            return self._tokens if self.rate is not None else float("inf")
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + max(0.0, seconds))
+
+    def paused_for(self) -> float:
+        with self._lock:
+            return max(0.0, self._paused_until - self._clock())
+
+    def increase(self, step: float, ceiling: float) -> None:
+        with self._lock:
+            if self.rate is None:
+                return
+            self._refill(self._clock())
+            self.rate = min(ceiling, self.rate + step)
+
+    def decrease(self, factor: float, floor: float) -> bool:
+        # Concurrent in-flight requests tend to be throttled together; only cut
+        # once per refill interval so a burst of 429s counts as one signal.
+        with self._lock:
+            if self.rate is None:
+                return False
+            now = self._clock()
+            if now - self._last_decrease < 1.0 / self.rate:
+                return False
+            self._refill(now)
+            self.rate = max(floor, self.rate * factor)
+            self._last_decrease = now
+            return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "tokens": self._tokens if self.rate is not None else None,
+                "paused_for": max(0.0, self._paused_until - now),
+            }
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rate is not None and elapsed > 0:
+            self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+
+
+class AdaptiveRate:
+    """AIMD policy: add ``increase`` req/s per success, multiply by
+    ``decrease`` on a throttle signal, staying within [min_rate, max_rate]."""
+
+    def __init__(
+        self,
+        min_rate: float = 0.05,
+        max_rate: float = 10.0,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+    ) -> None:
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        self.min_rate = max(1e-6, float(min_rate))
+        self.max_rate = max(self.min_rate, float(max_rate))
+        self.increase = max(0.0, float(increase))
+        self.decrease = float(decrease)
+
+
+class RateLimiter:
+    """Independent token buckets per endpoint ("text", "image", "feed", ...)."""
+
+    def __init__(
+        self,
+        default: RateSpec = None,
+        limits: Optional[Dict[str, RateSpec]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        adaptive: Optional[AdaptiveRate] = None,
+        max_delay: float = 5.0,
+    ) -> None:
+        self._clock = clock
+        self.adaptive = adaptive
+        self.max_delay = max_delay
+        self._default = self._parse(default)
+        self._specs: Dict[str, Tuple[Optional[float], int]] = {
+            k: self._parse(v) for k, v in (limits or {}).items()
+        }
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        b = self._buckets.get(endpoint)
+        if b is None:
+            with self._lock:
+                b = self._buckets.get(endpoint)
+                if b is None:
+                    rate, burst = self._specs.get(endpoint, self._default)
+                    b = TokenBucket(rate, burst, clock=self._clock, max_delay=self.max_delay)
+                    self._buckets[endpoint] = b
+        return b
+
+    def reserve(self, endpoint: str) -> float:
+        return self.bucket(endpoint).reserve()
+
+    def schedule(self, endpoint: str, lane: int = NORMAL) -> Tuple[float, Optional[Slot]]:
+        return self.bucket(endpoint).schedule(lane)
+
+    def recheck(self, endpoint: str, slot: Slot) -> float:
+        return self.bucket(endpoint).recheck(slot)
+
+    def try_reserve(self, endpoint: str) -> bool:
+        return self.bucket(endpoint).try_reserve()
+
+    def refund(self, endpoint: str, slot: Optional[Slot] = None) -> None:
+        self.bucket(endpoint).refund(slot)
+
+    def paused_for(self, endpoint: str) -> float:
+        return self.bucket(endpoint).paused_for()
+
+    def on_success(self, endpoint: str) -> None:
+        if self.adaptive is not None:
+            self.bucket(endpoint).increase(self.adaptive.increase, self.adaptive.max_rate)
+
+    def on_throttle(self, endpoint: str, retry_after: Optional[float] = None) -> None:
+        bucket = self.bucket(endpoint)
+        if retry_after:
+            bucket.pause(retry_after)
+        if self.adaptive is not None:
+            bucket.decrease(self.adaptive.decrease, self.adaptive.min_rate)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {k: b.snapshot() for k, b in buckets.items()}
+
+    def configure(self, endpoint: str, rate: Optional[float], burst: int = 1) -> None:
+        with self._lock:
+            self._specs[endpoint] = self._parse((rate, burst))
+        self.bucket(endpoint).configure(rate, burst)
+
+    @staticmethod
+    def _parse(spec: RateSpec) -> Tuple[Optional[float], int]:
+        if spec is None:
+            return None, 1
+        if isinstance(spec, (tuple, list)):
+            rate = spec[0] if spec else None
+            burst = spec[1] if len(spec) > 1 else 1
+        else:
+            rate, burst = spec, 1
+        rate_val = float(rate) if rate is not None and float(rate) > 0 else None
+        return rate_val, max(1, int(burst))
+
+
+def partition_key(token: Optional[str], referrer: Optional[str]) -> Optional[str]:
+    """Tenant of a request: its token (hashed, so state snapshots never
+    show it) or else its referrer; None for anonymous requests."""
+    if token:
+        return "token:" + hashlib.sha256(str(token).encode("utf-8")).hexdigest()[:16]
+    if referrer:
+        return f"referrer:{referrer}"
+    return None
+
+
+class PartitionPolicy:
+    """Rate limits and concurrency kept per tenant (see partition_key).
+
+    Every tenant gets its own buckets built from ``default`` and ``limits``
+    (the same specs as the client's ``rate_limits``); the client's endpoint
+    buckets still apply on top as a global ceiling. ``default`` only covers
+    endpoints that have such a ceiling; an endpoint the client leaves
+    unlimited (like "chat") is limited per tenant only if ``limits`` names
+    it. ``max_in_flight`` caps how many requests one tenant has in flight
+    at once. A tenant unused for ``idle_ttl`` seconds is forgotten, and at
+    most ``max_partitions`` are kept, least recently used dropped first.
+    """
+
+    def __init__(
+        self,
+        default: RateSpec = (1.0, 3),
+        limits: Optional[Dict[str, RateSpec]] = None,
+        idle_ttl: float = 300.0,
+        max_partitions: int = 10000,
+        max_in_flight: Optional[int] = None,
+    ) -> None:
+        self.default = default
+        self.limits = dict(limits or {})
+        self.idle_ttl = max(0.0, float(idle_ttl))
+        self.max_partitions = max(1, int(max_partitions))
+        self.max_in_flight = max(1, int(max_in_flight)) if max_in_flight else None
+
+
+class Partitions:
+    """One RateLimiter (and in-flight gate) per tenant, created on first use
+    and evicted when idle.
+
+    ``new_gate(limit)`` builds a tenant's gate: a semaphore of the kind the
+    client waits on (threading for PolliClient, asyncio for the async one).
+    """
+
+    def __init__(
+        self,
+        policy: PartitionPolicy,
+        clock: Callable[[], float] = time.monotonic,
+        adaptive: Optional[AdaptiveRate] = None,
+        max_delay: float = 5.0,
+        new_gate: Callable[[int], Any] = threading.BoundedSemaphore,
+    ) -> None:
+        self.policy = policy
+        self._clock = clock
+        self._adaptive = adaptive
+        self._max_delay = max_delay
+        self._new_gate = new_gate
+        # key -> [limiter, last used, gate]; kept in least-recently-used order.
+        self._entries: "OrderedDict[str, List[Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def limiter(self, key: str) -> RateLimiter:
+        with self._lock:
+            return self._entry(key)[0]
+
+    def gate(self, key: str) -> Any:
+        """The tenant's in-flight semaphore; None without ``max_in_flight``."""
+        if self.policy.max_in_flight is None:
+            return None
+        with self._lock:
+            entry = self._entry(key)
+            if entry[2] is None:
+                entry[2] = self._new_gate(self.policy.max_in_flight)
+            return entry[2]
+
+    def _entry(self, key: str) -> List[Any]:
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is None:
+            limiter = RateLimiter(
+                default=self.policy.default,
+                limits=self.policy.limits,
+                clock=self._clock,
+                adaptive=self._adaptive,
+                max_delay=self._max_delay,
+            )
+            entry = self._entries[key] = [limiter, now, None]
+        else:
+            entry[1] = now
+            self._entries.move_to_end(key)
+        self._evict(now)
+        return entry
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        with self._lock:
+            entries = [(k, e[0]) for k, e in self._entries.items()]
+        return {k: limiter.snapshot() for k, limiter in entries}
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.policy.idle_ttl
+        while self._entries:
+            key, (_, used, _) = next(iter(self._entries.items()))
+            if len(self._entries) <= self.policy.max_partitions and used >= cutoff:
+                break
+            del self._entries[key]
+
@@ -0,0 +1,142 @@
+"""Incremental Server-Sent Events parser working on raw byte chunks.
+
+Shared by every streaming call (chat, text streams and the public feeds).
+Lines may end in ``\\n``, ``\\r\\n`` or ``\\r`` and may be split anywhere
+across chunks; ``data:`` lines of one event are joined with ``\\n`` and
+``event:``, ``id:`` and ``retry:`` follow the WHATWG spec.
+
+``loads`` is ``orjson.loads`` when orjson is installed, else ``json.loads``.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, List, Optional
+
+try:  # optional speed-up
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+loads: Callable[[Any], Any] = orjson.loads if orjson is not None else json.loads
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+_BOM = b"\xef\xbb\xbf"
+
+
+class SSEEvent:
+    """One dispatched event; ``event`` defaults to ``"message"``."""
+
+    __slots__ = ("data", "event", "id", "retry")
+
+    def __init__(self, data: str, event: str = "message", id: Optional[str] = None, retry: Optional[int] = None) -> None:
+        self.data = data
+        self.event = event
+        self.id = id
+        self.retry = retry
+
+    def __repr__(self) -> str:
+        return f"SSEEvent(event={self.event!r}, data={self.data!r:.60}, id={self.id!r})"
+
+
+class SSEParser:
+    """Feed byte chunks, get back the events they complete.
+
+    ``last_id`` is the last event ID seen (what a reconnect would send as
+    ``Last-Event-ID``) and ``retry`` the server's reconnection time in ms.
+    """
+
+    __slots__ = ("_buf", "_data", "_event", "_started", "last_id", "retry")
+
+    def __init__(self) -> None:
+        self._buf = b""
+        self._data: List[bytes] = []
+        self._event: Optional[bytes] = None
+        self._started = False
+        self.last_id: Optional[str] = None
+        self.retry: Optional[int] = None
+
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        buf = self._buf + chunk if self._buf else chunk
+        if not self._started:
+            if len(buf) < len(_BOM) and _BOM.startswith(buf):
+                self._buf = buf
+                return []
+            self._started = True
+            if buf.startswith(_BOM):
+                buf = buf[len(_BOM):]
+        if b"\r" in buf:
+            # A trailing CR may be half of a CRLF split across chunks: leave
+            # it on the pending tail and normalise once the next byte is in.
+            held = buf.endswith(b"\r")
+            buf = (buf[:-1] if held else buf).replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+            if held:
+                buf += b"\r"
+        lines = buf.split(b"\n")
+        self._buf = lines.pop()
+        return self._lines(lines)
+
+    def flush(self) -> List[SSEEvent]:
+        """Events left at the end of the stream.
+
+        The spec drops an event that was not followed by a blank line; many
+        servers close right after their last ``data:`` line, so it is
+        dispatched here instead.
+        """
+        tail, self._buf = self._buf.rstrip(b"\r"), b""
+        events = self._lines([tail]) if tail else []
+        if self._data:
+            events.append(self._dispatch())
+        return events
+
+    def _lines(self, lines: List[bytes]) -> List[SSEEvent]:
+        events: List[SSEEvent] = []
+        data = self._data
+        for line in lines:
+            if not line:
+                if data:
+                    events.append(self._dispatch())
+                    data = self._data
+                else:
+                    self._event = None
+                continue
+            if line[0] == 0x3A:  # ":" comment
+                continue
+            field, _, value = line.partition(b":")
+            if value[:1] == b" ":
+                value = value[1:]
+            if field == b"data":
+                data.append(value)
+            elif field == b"event":
+                self._event = value
+            elif field == b"id":
+                if b"\0" not in value:
+                    self.last_id = value.decode("utf-8", "replace")
+            elif field == b"retry":
+                if value.isdigit():
+                    self.retry = int(value)
+        return events
+
+    def _dispatch(self) -> SSEEvent:
+        data = self._data[0] if len(self._data) == 1 else b"\n".join(self._data)
+        event = self._event.decode("utf-8", "replace") if self._event else "message"
+        self._data = []
+        self._event = None
+        return SSEEvent(data.decode("utf-8", "replace"), event, self.last_id, self.retry)
+
+
+def iter_events(chunks: Iterable[bytes]) -> Iterator[SSEEvent]:
+    parser = SSEParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.flush()
+
+
+async def aiter_events(chunks: AsyncIterator[bytes]) -> AsyncIterator[SSEEvent]:
+    parser = SSEParser()
+    async for chunk in chunks:
+        for event in parser.feed(chunk):
+            yield event
+    for event in parser.flush():
+        yield event
+
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import base64
+import os
 from typing import Any, Dict, Optional
 
+from .base import Call
+
 
 class STTMixin:
     def transcribe_audio(
@@ -14,8 +18,40 @@ class STTMixin:
         referrer: Optional[str] = None,
         token: Optional[str] = None,
         timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
     ) -> Optional[str]:
-        import os, base64
+        payload = self._audio_payload(
+            audio_path,
+            question=question,
+            model=model,
+            referrer=referrer,
+            token=token,
+        )
+        if payload is None:
+            return None
+        call = Call(
+            "POST",
+            f"{self.text_prompt_base}/{provider}",
+            endpoint="text",
+            op="transcribe_audio",
+            model=model,
+            headers={"Content-Type": "application/json"},
+            json=payload,
+            timeout=self._resolve_timeout(timeout, 120.0),
+            expires=self._expires_at(deadline),
+        )
+        data = self._request_json(call)
+        return data.get("choices", [{}])[0].get("message", {}).get("content")
+
+    @staticmethod
+    def _audio_payload(
+        audio_path: str,
+        *,
+        question: str,
+        model: str,
+        referrer: Optional[str],
+        token: Optional[str],
+    ) -> Optional[Dict[str, Any]]:
         if not os.path.exists(audio_path):
             raise FileNotFoundError(audio_path)
         ext = os.path.splitext(audio_path)[1].lower().lstrip(".")
@@ -40,30 +76,4 @@ class STTMixin:
         if token:
             payload["token"] = token
         payload["safe"] = False
-        url = f"{self.text_prompt_base}/{provider}"
-        headers = {"Content-Type": "application/json"}
-        attempt = 0
-        response = None
-        eff_timeout = self._resolve_timeout(timeout, 120.0)
-        while True:
-            with self._request_lock:
-                self._wait_before_attempt(attempt)
-                resp = self.session.post(url, headers=headers, json=payload, timeout=eff_timeout)
-                if self._should_retry_status(resp.status_code):
-                    if not self._can_retry(attempt + 1):
-                        resp.raise_for_status()
-                    resp.close()
-                    attempt += 1
-                    continue
-                try:
-                    resp.raise_for_status()
-                except Exception:
-                    resp.close()
-                    raise
-                self._mark_success()
-                response = resp
-                break
-        data = response.json()
-        response.close()
-        return data.get("choices", [{}])[0].get("message", {}).get("content")
-
+        return payload
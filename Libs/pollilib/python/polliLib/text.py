@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import codecs
+import json as _json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .base import Call
+from .batch import BatchResult, Progress, remaining, run_batch, spec_kwargs
 
 
 class TextMixin:
@@ -15,7 +20,103 @@ class TextMixin:
         token: Optional[str] = None,
         as_json: bool = False,
         timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
     ) -> Any:
+        call = self._text_call(prompt, model, seed, system, referrer, token, as_json, timeout, deadline)
+
+        def fetch() -> Any:
+            raw = self._cached(call, lambda: self._text_upstream(call).encode("utf-8"))
+            return self._decode_text(raw.decode("utf-8"), as_json)
+
+        return self._coalesced(call, fetch)
+
+    def generate_text_stream(
+        self,
+        prompt: str,
+        *,
+        model: str = "openai",
+        seed: Optional[int] = None,
+        system: Optional[str] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> Iterator[str]:
+        """``generate_text`` that yields the answer in pieces as they arrive.
+
+        Bytes are decoded as UTF-8 incrementally, so a character split
+        across network chunks is never garbled. Closing the iterator (or
+        breaking out of the loop) closes the connection.
+        """
+        call = self._text_call(prompt, model, seed, system, referrer, token, False, timeout, deadline, stream=True)
+        if call.json is not None:
+            for data in self._sse_stream(call):
+                content = self._delta_content(data)
+                if content:
+                    yield content
+            return
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        # chunk_size=None hands over data as soon as the socket has it.
+        for chunk in self._stream(call, lambda r: r.iter_content(chunk_size=None)):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def map_text(
+        self,
+        prompts: Iterable[Union[str, Dict[str, Any]]],
+        *,
+        workers: int = 4,
+        ordered: bool = True,
+        progress: Progress = None,
+        model: str = "openai",
+        seed: Optional[int] = None,
+        system: Optional[str] = None,
+        referrer: Optional[str] = None,
+        token: Optional[str] = None,
+        as_json: bool = False,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> Iterator[BatchResult]:
+        """``generate_text`` over an iterable on ``workers`` threads.
+
+        Items are prompts or dicts of ``generate_text`` arguments that
+        override the shared ones here. Input is pulled only as workers free
+        up, so a lazy iterable over a huge file keeps memory flat. Yields a
+        BatchResult per item (in input order unless ``ordered=False``) with
+        its text or error and ``elapsed`` time; ``progress`` gets a
+        BatchProgress after each one. ``deadline`` covers the whole run.
+        """
+        shared = {
+            "model": model,
+            "seed": seed,
+            "system": system,
+            "referrer": referrer,
+            "token": token,
+            "as_json": as_json,
+            "timeout": timeout,
+        }
+        expires = self._expires_at(deadline)
+
+        def one(index: int, spec: Any) -> Any:
+            return self.generate_text(deadline=remaining(expires), **spec_kwargs(spec, "prompt", shared))
+
+        return run_batch(prompts, one, workers=workers, ordered=ordered, progress=progress)
+
+    def _text_request(
+        self,
+        prompt: str,
+        *,
+        model: str,
+        seed: Optional[int],
+        system: Optional[str],
+        referrer: Optional[str],
+        token: Optional[str],
+        as_json: bool,
+    ) -> Tuple[str, Dict[str, Any]]:
         if not isinstance(prompt, str) or not prompt.strip():
             raise ValueError("prompt must be a non-empty string")
         if seed is None:
@@ -33,35 +134,83 @@ class TextMixin:
             params["referrer"] = referrer
         if token:
             params["token"] = token
-        url = self._text_prompt_url(prompt)
-        eff_timeout = self._resolve_timeout(timeout, 60.0)
-        attempt = 0
-        response = None
-        while True:
-            with self._request_lock:
-                self._wait_before_attempt(attempt)
-                resp = self.session.get(url, params=params, timeout=eff_timeout)
-                if self._should_retry_status(resp.status_code):
-                    if not self._can_retry(attempt + 1):
-                        resp.raise_for_status()
-                    resp.close()
-                    attempt += 1
-                    continue
-                try:
-                    resp.raise_for_status()
-                except Exception:
-                    resp.close()
-                    raise
-                self._mark_success()
-                response = resp
-                break
-        if as_json:
-            import json as _json
+        return self._text_prompt_url(prompt), params
+
+    def _text_call(
+        self,
+        prompt: str,
+        model: str,
+        seed: Optional[int],
+        system: Optional[str],
+        referrer: Optional[str],
+        token: Optional[str],
+        as_json: bool,
+        timeout: Optional[float],
+        deadline: Optional[float],
+        stream: bool = False,
+    ) -> Call:
+        # Prompts too long for a URL go to the chat endpoint as a POST with
+        # the same system/user messages; callers see the same result.
+        op = "generate_text_stream" if stream else "generate_text"
+        repeatable = seed is not None and not stream
+        if self._long_prompt(prompt, system):
+            messages: List[Dict[str, Any]] = [{"role": "system", "content": system}] if system else []
+            messages.append({"role": "user", "content": prompt})
+            extra: Dict[str, Any] = {}
+            headers = {"Content-Type": "application/json"}
+            if as_json:
+                extra["response_format"] = {"type": "json_object"}
+            if stream:
+                extra["stream"] = True
+                headers["Accept"] = "text/event-stream"
+            payload = self._chat_payload(
+                messages, model=model, seed=seed, private=None, referrer=referrer, token=token, **extra
+            )
+            method, url, params = "POST", f"{self.text_prompt_base}/{model}", None
+        else:
+            url, params = self._text_request(
+                prompt,
+                model=model,
+                seed=seed,
+                system=system,
+                referrer=referrer,
+                token=token,
+                as_json=as_json,
+            )
+            method, payload, headers = "GET", None, None
+        return Call(
+            method,
+            url,
+            endpoint="text",
+            op=op,
+            model=model,
+            params=params,
+            json=payload,
+            headers=headers,
+            timeout=self._resolve_timeout(timeout, 60.0),
+            expires=self._expires_at(deadline),
+            hedge=repeatable,
+            coalesce=repeatable,
+            cache=repeatable,
+        )
+
+    def _long_prompt(self, prompt: Any, system: Optional[str]) -> bool:
+        limit = self.max_get_prompt_bytes
+        if limit is None or not isinstance(prompt, str):
+            return False
+        return len(prompt.encode("utf-8")) + len((system or "").encode("utf-8")) > limit
 
-            txt = response.text
+    def _text_upstream(self, call: Call) -> str:
+        if call.method == "GET":
+            return self._request_text(call)
+        return self._chat_result(self._request_json(call)) or ""
+
+    @staticmethod
+    def _decode_text(txt: str, as_json: bool) -> Any:
+        if as_json:
             try:
                 return _json.loads(txt)
             except Exception:
                 return txt
-        return response.text
+        return txt
 
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+
+_CAPTURE: "contextvars.ContextVar[Optional[List[CallTrace]]]" = contextvars.ContextVar(
+    "polli_trace_capture", default=None
+)
+
+
+class Span:
+    """One timed section of a call. ``start``/``end`` are epoch seconds."""
+
+    __slots__ = ("name", "attributes", "start", "end", "parent")
+
+    def __init__(
+        self, name: str, start: float, attributes: Optional[Dict[str, Any]] = None, parent: Optional["Span"] = None
+    ) -> None:
+        self.name = name
+        self.attributes: Dict[str, Any] = attributes or {}
+        self.start = start
+        self.end: Optional[float] = None
+        self.parent = parent
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end is None else self.end - self.start
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, duration={self.duration!r}, attributes={self.attributes!r})"
+
+
+class TraceListener:
+    """Receives spans as they open and close. Override either method to
+    bridge them to your tracer; the defaults ignore them."""
+
+    def span_start(self, span: Span) -> None:
+        pass
+
+    def span_end(self, span: Span) -> None:
+        pass
+
+
+class CallTrace:
+    """Timing breakdown of one call, in seconds from when it was made.
+
+    ``queue_wait`` is time held by the rate limiter and ``backoff_wait`` time
+    slept between retries. ``connect`` is TCP/TLS setup, known only when the
+    transport reports it (httpx; None otherwise). ``ttfb`` runs until the
+    response headers, or the first chunk of a streamed body; ``first_token``
+    until the first SSE data event; ``transfer`` from ``ttfb`` to the end of
+    the body. ``spans`` holds the root span and one child per phase.
+    """
+
+    def __init__(self, call: Any, listener: Optional[TraceListener] = None) -> None:
+        self.operation: str = call.op or call.endpoint
+        self.model: Optional[str] = call.model
+        self.endpoint: str = call.endpoint
+        self.queue_wait = 0.0
+        self.backoff_wait = 0.0
+        self.connect: Optional[float] = None
+        self.ttfb: Optional[float] = None
+        self.first_token: Optional[float] = None
+        self.transfer: Optional[float] = None
+        self.total: Optional[float] = None
+        self.attempts = 0
+        self.retries = 0
+        self.status: Optional[int] = None
+        self.outcome: Optional[str] = None
+        self.bytes = 0
+        self.spans: List[Span] = []
+        self._listener = listener
+        self._epoch = time.time() - (time.monotonic() - call.started)
+        self.root = self._open(
+            f"polli.{self.operation}",
+            0.0,
+            {"polli.endpoint": call.endpoint, "polli.model": call.model or "", "http.method": call.method},
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        keys = (
+            "operation", "model", "queue_wait", "backoff_wait", "connect", "ttfb", "first_token",
+            "transfer", "total", "attempts", "retries", "status", "outcome", "bytes",
+        )
+        return {k: getattr(self, k) for k in keys}
+
+    def phase(self, name: str, begin: float, end: float, **attributes: Any) -> Span:
+        span = self._open(name, begin, attributes, self.root)
+        self._close(span, end)
+        return span
+
+    def close(self, at: float) -> None:
+        self.root.attributes.update(
+            {
+                "polli.outcome": self.outcome,
+                "polli.attempts": self.attempts,
+                "http.status_code": self.status,
+                "polli.bytes": self.bytes,
+            }
+        )
+        self._close(self.root, at)
+
+    def _open(
+        self, name: str, at: float, attributes: Dict[str, Any], parent: Optional[Span] = None
+    ) -> Span:
+        span = Span(name, self._epoch + at, attributes, parent)
+        self.spans.append(span)
+        if self._listener is not None:
+            self._listener.span_start(span)
+        return span
+
+    def _close(self, span: Span, at: float) -> None:
+        span.end = self._epoch + at
+        if self._listener is not None:
+            self._listener.span_end(span)
+
+    def __repr__(self) -> str:
+        return f"CallTrace({self.as_dict()!r})"
+
+
+class Tracer:
+    """Request lifecycle hooks that build a CallTrace on each call."""
+
+    def __init__(self, listener: Optional[TraceListener] = None) -> None:
+        self.listener = listener
+
+    def start(self, call: Any) -> None:
+        trace = call.trace = CallTrace(call, self.listener)
+        captured = _CAPTURE.get()
+        if captured is not None:
+            captured.append(trace)
+
+    def wait(self, call: Any, seconds: float, reason: str) -> None:
+        trace = call.trace
+        if trace is None:
+            return
+        if reason == "rate_limit":
+            trace.queue_wait += seconds
+        else:
+            trace.backoff_wait += seconds
+        now = time.monotonic() - call.started
+        trace.phase("polli.wait", now - seconds, now, **{"polli.reason": reason})
+
+    def connect(self, call: Any, seconds: float) -> None:
+        trace = call.trace
+        if trace is None:
+            return
+        trace.connect = (trace.connect or 0.0) + seconds
+        now = time.monotonic() - call.started
+        trace.phase("polli.connect", now - seconds, now)
+
+    def response(self, call: Any, status: int, seconds: float, sent: int = 0) -> None:
+        trace = call.trace
+        if trace is None:
+            return
+        trace.attempts += 1
+        trace.status = status
+        now = time.monotonic() - call.started
+        trace.phase("polli.attempt", now - seconds, now, **{"http.status_code": status, "polli.attempt": call.attempt})
+
+    def retry(self, call: Any, reason: str) -> None:
+        if call.trace is not None:
+            call.trace.retries += 1
+
+    def first_byte(self, call: Any, seconds: float) -> None:
+        if call.trace is not None and call.trace.ttfb is None:
+            call.trace.ttfb = seconds
+
+    def first_token(self, call: Any, seconds: float) -> None:
+        if call.trace is not None and call.trace.first_token is None:
+            call.trace.first_token = seconds
+
+    def tool_lookup(self, call: Any, function: str, hit: bool) -> None:
+        pass
+
+    def finish(self, call: Any, seconds: float, error: Optional[BaseException], nbytes: int) -> None:
+        trace = call.trace
+        if trace is None:
+            return
+        trace.total = seconds
+        trace.bytes = nbytes
+        if error is None:
+            trace.outcome = "ok"
+        elif isinstance(error, GeneratorExit):
+            trace.outcome = "closed"
+        else:
+            trace.outcome = type(error).__name__
+        if trace.ttfb is not None:
+            trace.transfer = seconds - trace.ttfb
+            trace.phase("polli.transfer", trace.ttfb, seconds, **{"polli.bytes": nbytes})
+        trace.close(seconds)
+
+
+@contextlib.contextmanager
+def capture() -> Iterator[List[CallTrace]]:
+    """Collect the CallTrace of every traced call made inside the block.
+
+    Tracing must be enabled on the client (``tracer=``). The list is bound
+    to the current context, so concurrent threads and tasks started outside
+    the block are not mixed in.
+    """
+    traces: List[CallTrace] = []
+    token = _CAPTURE.set(traces)
+    try:
+        yield traces
+    finally:
+        _CAPTURE.reset(token)
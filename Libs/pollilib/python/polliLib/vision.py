@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import base64
+import os
 from typing import Any, Dict, Optional
 
+from .base import Call
+
 
 class VisionMixin:
     def analyze_image_url(
@@ -14,33 +18,29 @@ class VisionMixin:
         referrer: Optional[str] = None,
         token: Optional[str] = None,
         timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
         as_json: bool = False,
     ) -> Any:
-        payload: Dict[str, Any] = {
-            "model": model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": question},
-                        {"type": "image_url", "image_url": {"url": image_url}},
-                    ],
-                }
-            ],
-        }
-        if max_tokens is not None:
-            payload["max_tokens"] = int(max_tokens)
-        if referrer:
-            payload["referrer"] = referrer
-        if token:
-            payload["token"] = token
-        payload["safe"] = False
-        url = f"{self.text_prompt_base}/{model}"
-        headers = {"Content-Type": "application/json"}
-        eff_timeout = self._resolve_timeout(timeout, 60.0)
-        resp = self.session.post(url, headers=headers, json=payload, timeout=eff_timeout)
-        resp.raise_for_status()
-        data = resp.json()
+        payload = self._vision_payload(
+            image_url,
+            question=question,
+            model=model,
+            max_tokens=max_tokens,
+            referrer=referrer,
+            token=token,
+        )
+        call = Call(
+            "POST",
+            f"{self.text_prompt_base}/{model}",
+            endpoint="chat",
+            op="analyze_image_url",
+            model=model,
+            headers={"Content-Type": "application/json"},
+            json=payload,
+            timeout=self._resolve_timeout(timeout, 60.0),
+            expires=self._expires_at(deadline),
+        )
+        data = self._request_json(call)
         if as_json:
             return data
         return data.get("choices", [{}])[0].get("message", {}).get("content")
@@ -55,17 +55,31 @@ class VisionMixin:
         referrer: Optional[str] = None,
         token: Optional[str] = None,
         timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
         as_json: bool = False,
     ) -> Any:
-        import os, base64
-        if not os.path.exists(image_path):
-            raise FileNotFoundError(image_path)
-        ext = os.path.splitext(image_path)[1].lower().lstrip(".")
-        if ext not in {"jpeg", "jpg", "png", "gif", "webp"}:
-            ext = "jpeg"
-        with open(image_path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode("utf-8")
-        data_url = f"data:image/{ext};base64,{b64}"
+        return self.analyze_image_url(
+            self._image_data_url(image_path),
+            question=question,
+            model=model,
+            max_tokens=max_tokens,
+            referrer=referrer,
+            token=token,
+            timeout=timeout,
+            deadline=deadline,
+            as_json=as_json,
+        )
+
+    @staticmethod
+    def _vision_payload(
+        image_url: str,
+        *,
+        question: str,
+        model: str,
+        max_tokens: Optional[int],
+        referrer: Optional[str],
+        token: Optional[str],
+    ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {
             "model": model,
             "messages": [
@@ -73,7 +87,7 @@ class VisionMixin:
                     "role": "user",
                     "content": [
                         {"type": "text", "text": question},
-                        {"type": "image_url", "image_url": {"url": data_url}},
+                        {"type": "image_url", "image_url": {"url": image_url}},
                     ],
                 }
             ],
@@ -85,13 +99,15 @@ class VisionMixin:
         if token:
             payload["token"] = token
         payload["safe"] = False
-        url = f"{self.text_prompt_base}/{model}"
-        headers = {"Content-Type": "application/json"}
-        eff_timeout = self._resolve_timeout(timeout, 60.0)
-        resp = self.session.post(url, headers=headers, json=payload, timeout=eff_timeout)
-        resp.raise_for_status()
-        data = resp.json()
-        if as_json:
-            return data
-        return data.get("choices", [{}])[0].get("message", {}).get("content")
+        return payload
 
+    @staticmethod
+    def _image_data_url(image_path: str) -> str:
+        if not os.path.exists(image_path):
+            raise FileNotFoundError(image_path)
+        ext = os.path.splitext(image_path)[1].lower().lstrip(".")
+        if ext not in {"jpeg", "jpg", "png", "gif", "webp"}:
+            ext = "jpeg"
+        with open(image_path, "rb") as f:
+            b64 = base64.b64encode(f.read()).decode("utf-8")
+        return f"data:image/{ext};base64,{b64}"
@@ -44,6 +44,10 @@ class FakeResponse:
             return
         if self.content:
             yield self.content
+            return
+        # stream_lines go on the wire as SSE, each line ending its own event.
+        for ln in self.iter_lines():
+            yield (ln if isinstance(ln, bytes) else ln.encode("utf-8")) + b"\n\n"
 
     def __enter__(self):
         return self
@@ -69,3 +73,42 @@ class FakeSession:
         self.last_post = (url, headers or {}, json or {}, kw)
         return FakeResponse(json_data={"choices": [{"message": {"content": "ok"}}]})
 
+
+class FakeAsyncResponse(FakeResponse):
+    async def aiter_lines(self):
+        for ln in self.iter_lines():
+            yield ln
+
+    async def aiter_bytes(self, chunk_size=None):
+        for ch in self.iter_content(chunk_size=chunk_size):
+            yield ch
+
+    async def aclose(self):
+        self._closed = True
+
+
+class FakeAsyncSession:
+    """Async stand-in for httpx.AsyncClient; override `handle` per test."""
+
+    def __init__(self):
+        self.calls = []
+
+    def handle(self, method, url, **kw):
+        if method == "POST":
+            return FakeAsyncResponse(json_data={"choices": [{"message": {"content": "ok"}}]})
+        return FakeAsyncResponse(status=200, text="ok")
+
+    async def request(self, method, url, **kw):
+        self.calls.append((method, url, kw))
+        return self.handle(method, url, **kw)
+
+    def build_request(self, method, url, **kw):
+        return (method, url, kw)
+
+    async def send(self, request, stream=False):
+        method, url, kw = request
+        self.calls.append((method, url, dict(kw, stream=stream)))
+        return self.handle(method, url, **kw)
+
+    async def aclose(self):
+        pass
@@ -0,0 +1,340 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+
+from polliLib import AsyncPolliClient, DeadlineExceeded
+from .conftest import FakeAsyncResponse, FakeAsyncSession
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_async_generate_text_params_and_retry():
+    fs = FakeAsyncSession()
+    responses = [
+        FakeAsyncResponse(status=429, text="limit"),
+        FakeAsyncResponse(text='{"answer": 42}'),
+    ]
+    fs.handle = lambda method, url, **kw: responses.pop(0)
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    c = AsyncPolliClient(session=fs, sleep=fake_sleep, retry_jitter=0.0)
+    out = run(c.generate_text("hello", as_json=True, referrer="app", token="tok"))
+    assert out == {"answer": 42}
+    assert len(fs.calls) == 2
+    method, url, kw = fs.calls[-1]
+    assert method == "GET"
+    assert kw["params"]["referrer"] == "app" and kw["params"]["safe"] == "false"
+    assert round(sleeps[0], 1) == 0.5
+
+
+def test_async_generate_text_stream():
+    fs = FakeAsyncSession()
+    body = "naïve café".encode("utf-8")
+    fs.handle = lambda method, url, **kw: FakeAsyncResponse(content_chunks=[body[:3], body[3:]])
+    c = AsyncPolliClient(session=fs)
+
+    async def scenario():
+        return [part async for part in c.generate_text_stream("hi")]
+
+    assert "".join(run(scenario())) == "naïve café"
+    assert fs.calls[0][0] == "GET"
+
+
+def test_async_chat_completion_and_stream():
+    fs = FakeAsyncSession()
+    lines = [
+        'data: {"choices":[{"delta":{"content":"Hel"}}]}',
+        'data: {"choices":[{"delta":{"content":"lo"}}]}',
+        'data: [DONE]',
+    ]
+
+    def handle(method, url, **kw):
+        if kw["json"].get("stream"):
+            return FakeAsyncResponse(stream_lines=lines)
+        return FakeAsyncResponse(json_data={"choices": [{"message": {"content": "ok"}}]})
+
+    fs.handle = handle
+    c = AsyncPolliClient(session=fs)
+
+    async def scenario():
+        reply = await c.chat_completion([{"role": "user", "content": "hi"}], token="t")
+        chunks = [part async for part in c.chat_completion_stream([{"role": "user", "content": "x"}])]
+        return reply, chunks
+
+    reply, chunks = run(scenario())
+    assert reply == "ok"
+    assert "".join(chunks) == "Hello"
+    assert fs.calls[0][2]["json"]["safe"] is False
+    assert fs.calls[1][2]["stream"] is True
+
+
+def test_async_chat_completion_tools_awaits_async_handlers():
+    first = {
+        "choices": [
+            {
+                "message": {
+                    "tool_calls": [
+                        {
+                            "id": "tc1",
+                            "function": {"name": "lookup", "arguments": json.dumps({"city": "Tokyo"})},
+                        }
+                    ]
+                }
+            }
+        ]
+    }
+    second = {"choices": [{"message": {"content": "Cloudy"}}]}
+    fs = FakeAsyncSession()
+    replies = [first, second]
+    fs.handle = lambda method, url, **kw: FakeAsyncResponse(json_data=replies.pop(0))
+
+    async def lookup(city):
+        await asyncio.sleep(0)
+        return {"city": city, "sky": "cloudy"}
+
+    c = AsyncPolliClient(session=fs)
+    tools = [{"type": "function", "function": {"name": "lookup"}}]
+    out = run(c.chat_completion_tools([{"role": "user", "content": "?"}], tools=tools, functions={"lookup": lookup}))
+    assert out == "Cloudy"
+    tool_msg = fs.calls[1][2]["json"]["messages"][-1]
+    assert tool_msg["role"] == "tool" and json.loads(tool_msg["content"])["city"] == "Tokyo"
+
+
+def test_async_chat_completion_tools_stream():
+    def delta(**d):
+        return "data: " + json.dumps({"choices": [{"delta": d}]})
+
+    rounds = [
+        [
+            delta(tool_calls=[{"index": 0, "id": "tc1", "function": {"name": "lookup", "arguments": '{"city"'}}]),
+            delta(tool_calls=[{"index": 0, "function": {"arguments": ': "Tokyo"}'}}]),
+        ],
+        [delta(content="Cloudy"), "data: [DONE]"],
+    ]
+    fs = FakeAsyncSession()
+    fs.handle = lambda method, url, **kw: FakeAsyncResponse(stream_lines=rounds.pop(0))
+
+    async def lookup(city):
+        return {"city": city, "sky": "cloudy"}
+
+    c = AsyncPolliClient(session=fs)
+    tools = [{"type": "function", "function": {"name": "lookup"}}]
+
+    async def scenario():
+        stream = c.chat_completion_tools_stream([{"role": "user", "content": "?"}], tools=tools, functions={"lookup": lookup})
+        return [part async for part in stream]
+
+    assert run(scenario()) == ["Cloudy"]
+    tool_msg = fs.calls[1][2]["json"]["messages"][-1]
+    assert tool_msg["tool_call_id"] == "tc1" and json.loads(tool_msg["content"])["city"] == "Tokyo"
+
+
+def test_async_chat_completion_tools_memoizes_across_rounds():
+    call = {"id": "tc", "function": {"name": "lookup", "arguments": json.dumps({"city": "Oslo"})}}
+    replies = [
+        {"choices": [{"message": {"tool_calls": [call]}}]},
+        {"choices": [{"message": {"tool_calls": [call]}}]},
+        {"choices": [{"message": {"content": "done"}}]},
+    ]
+    fs = FakeAsyncSession()
+    fs.handle = lambda method, url, **kw: FakeAsyncResponse(json_data=replies.pop(0))
+    calls = []
+
+    async def lookup(city):
+        calls.append(city)
+        return {"city": city}
+
+    c = AsyncPolliClient(session=fs, tool_cache=True)
+    out = run(c.chat_completion_tools(
+        [{"role": "user", "content": "?"}],
+        tools=[{"type": "function", "function": {"name": "lookup"}}],
+        functions={"lookup": lookup},
+        max_rounds=2,
+        memoize=["lookup"],
+    ))
+    assert out == "done" and calls == ["Oslo"]
+    assert json.loads(fs.calls[2][2]["json"]["messages"][-1]["content"]) == {"city": "Oslo"}
+    assert c.tool_cache_stats()["hits"] == 1
+
+
+def test_async_chat_completion_tools_awaits_handlers_together():
+    calls = [
+        {"id": f"tc{i}", "function": {"name": "fetch", "arguments": json.dumps({"n": i})}}
+        for i in range(3)
+    ]
+    replies = [
+        {"choices": [{"message": {"tool_calls": calls}}]},
+        {"choices": [{"message": {"content": "done"}}]},
+    ]
+    fs = FakeAsyncSession()
+    fs.handle = lambda method, url, **kw: FakeAsyncResponse(json_data=replies.pop(0))
+    started = []
+
+    async def fetch(n):
+        if n == 2:
+            await asyncio.Event().wait()  # never finishes: the timeout answers for it
+        started.append(n)
+        while len(started) < 2:  # tc0 only returns once tc1 has started too
+            await asyncio.sleep(0)
+        return {"n": n}
+
+    c = AsyncPolliClient(session=fs)
+
+    async def scenario():
+        return await c.chat_completion_tools(
+            [{"role": "user", "content": "?"}],
+            tools=[{"type": "function", "function": {"name": "fetch"}}],
+            functions={"fetch": fetch},
+            tool_workers=3,
+            tool_timeout=0.5,
+        )
+
+    assert run(scenario()) == "done"
+    tool_msgs = fs.calls[1][2]["json"]["messages"][2:]
+    assert [m["tool_call_id"] for m in tool_msgs] == ["tc0", "tc1", "tc2"]
+    assert [json.loads(m["content"]) for m in tool_msgs[:2]] == [{"n": 0}, {"n": 1}]
+    assert "timed out" in json.loads(tool_msgs[2]["content"])["error"]
+
+
+def test_async_file_reads_and_plain_tool_handlers_run_off_the_loop(tmp_path: tempfile.TemporaryDirectory):
+    img_path = os.path.join(tmp_path, "x.png")
+    with open(img_path, "wb") as f:
+        f.write(b"\x89PNG")
+    replies = [
+        {"choices": [{"message": {"content": "a cat"}}]},
+        {"choices": [{"message": {"tool_calls": [{"id": "tc0", "function": {"name": "probe", "arguments": "{}"}}]}}]},
+        {"choices": [{"message": {"content": "done"}}]},
+    ]
+    fs = FakeAsyncSession()
+    fs.handle = lambda method, url, **kw: FakeAsyncResponse(json_data=replies.pop(0))
+    c = AsyncPolliClient(session=fs)
+    threads = []
+    read = c._image_data_url
+    c._image_data_url = lambda path: (threads.append(threading.get_ident()), read(path))[1]
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        described = await c.analyze_image_file(img_path)
+        answer = await c.chat_completion_tools(
+            [{"role": "user", "content": "?"}],
+            tools=[{"type": "function", "function": {"name": "probe"}}],
+            functions={"probe": lambda: threads.append(threading.get_ident()) or "ok"},
+            tool_workers=1,
+        )
+        return loop_thread, described, answer
+
+    loop_thread, described, answer = run(scenario())
+    assert (described, answer) == ("a cat", "done")
+    assert len(threads) == 2 and loop_thread not in threads
+
+
+def test_async_generate_image_bytes_and_out_path(tmp_path: tempfile.TemporaryDirectory):
+    fs = FakeAsyncSession()
+
+    def handle(method, url, **kw):
+        return FakeAsyncResponse(content=b"XYZ", content_chunks=[b"a", b"b"])
+
+    fs.handle = handle
+    c = AsyncPolliClient(session=fs, min_request_interval=0.0)
+    out_path = os.path.join(tmp_path, "gen.jpg")
+
+    async def scenario():
+        path = await c.generate_image("test", out_path=out_path)
+        data = await c.fetch_image("http://image/url.jpg")
+        return path, data
+
+    path, data = run(scenario())
+    assert path == out_path
+    with open(path, "rb") as f:
+        assert f.read() == b"ab"
+    assert data == b"XYZ"
+    assert fs.calls[0][2]["stream"] is True
+    assert fs.calls[0][2]["params"]["safe"] == "false"
+
+
+def test_async_models_and_text_feed():
+    fs = FakeAsyncSession()
+    feed = ['data: {"model":"openai","response":"Hello"}', 'data: [DONE]']
+
+    def handle(method, url, **kw):
+        if url.endswith("/feed"):
+            return FakeAsyncResponse(stream_lines=feed)
+        return FakeAsyncResponse(json_data=[{"name": "openai", "aliases": ["gpt"]}])
+
+    fs.handle = handle
+    c = AsyncPolliClient(session=fs)
+
+    async def scenario():
+        hit = await c.get_model_by_name("GPT", kind="text")
+        events = [ev async for ev in c.text_feed_stream()]
+        return hit, events
+
+    hit, events = run(scenario())
+    assert hit and hit["name"] == "openai"
+    assert events == [{"model": "openai", "response": "Hello"}]
+
+
+def test_async_feed_reconnect_uses_injected_sleep():
+    fs = FakeAsyncSession()
+    fs.handle = lambda method, url, **kw: FakeAsyncResponse(stream_lines=['data: {"response":"Hello"}', "data: [DONE]"])
+    slept = []
+
+    async def sleep(seconds):
+        slept.append(seconds)
+
+    c = AsyncPolliClient(session=fs, sleep=sleep, min_request_interval=0.0)
+
+    async def scenario():
+        stream = c.text_feed_stream(reconnect=True, retry_delay=7.0)
+        events = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return events
+
+    assert run(scenario()) == [{"response": "Hello"}, {"response": "Hello"}]
+    assert slept == [7.0]
+
+
+def test_async_deadline_stops_retries():
+    fs = FakeAsyncSession()
+    fs.handle = lambda method, url, **kw: FakeAsyncResponse(status=503, text="busy")
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    c = AsyncPolliClient(session=fs, sleep=fake_sleep)
+    try:
+        run(c.fetch_image("https://example.com/a.png", deadline=0.1))
+    except DeadlineExceeded:
+        pass
+    else:
+        raise AssertionError("expected DeadlineExceeded")
+    assert len(fs.calls) == 1 and sleeps == []
+    assert fs.calls[0][2]["timeout"] <= 0.1
+
+
+def test_async_max_in_flight_caps_a_tenant():
+    active, peak = [0], [0]
+
+    class Held(FakeAsyncSession):
+        async def request(self, method, url, **kw):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(0.01)
+            active[0] -= 1
+            return FakeAsyncResponse(text="ok")
+
+    c = AsyncPolliClient(session=Held(), rate_limits={"text": None}, partitions={"max_in_flight": 1})
+
+    async def scenario():
+        return await asyncio.gather(*(c.generate_text(f"p{i}", token="t") for i in range(3)))
+
+    assert run(scenario()) == ["ok"] * 3
+    assert peak[0] == 1
@@ -0,0 +1,148 @@
+import asyncio
+import os
+import threading
+import time
+
+from polliLib import AsyncPolliClient, PolliClient
+from .conftest import FakeAsyncResponse, FakeAsyncSession, FakeResponse, FakeSession
+
+
+class PromptSession(FakeSession):
+    """Serves the prompt back as the image body; "bad" prompts get a 400."""
+
+    def __init__(self, delays=None):
+        super().__init__()
+        self.delays = delays or {}
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def get(self, url, **kw):
+        prompt = url.rsplit("/", 1)[-1]
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delays.get(prompt, 0.01))
+        finally:
+            with self.lock:
+                self.active -= 1
+        if prompt.startswith("bad"):
+            return FakeResponse(status=400, text="bad prompt")
+        return FakeResponse(content=prompt.encode(), content_chunks=[prompt.encode()])
+
+
+def _client(session):
+    return PolliClient(session=session, rate_limits={"image": None}, retry_jitter=0.0)
+
+
+def test_batch_writes_to_out_dir_in_order_and_reports_failures(tmp_path):
+    fs = PromptSession(delays={"a": 0.05})
+    c = _client(fs)
+    specs = ["a", "b", {"prompt": "c", "filename": "named.png"}, "bad1"]
+    results = list(c.generate_images_batch(specs, out_dir=str(tmp_path), workers=3, ordered=True))
+    assert [r.index for r in results] == [0, 1, 2, 3]
+    assert [r.ok for r in results] == [True, True, True, False]
+    assert results[0].value == os.path.join(str(tmp_path), "00000.jpeg")
+    assert results[2].value == os.path.join(str(tmp_path), "named.png")
+    with open(results[1].value, "rb") as f:
+        assert f.read() == b"b"
+    assert "400" in str(results[3].error)
+
+
+def test_unordered_batch_yields_as_completed_with_bounded_workers():
+    fs = PromptSession(delays={"slow": 0.2})
+    c = _client(fs)
+    prompts = ["slow"] + [f"p{i}" for i in range(9)]
+    results = list(c.generate_images_batch(iter(prompts), workers=2))
+    assert results[-1].spec == "slow"
+    assert sorted(r.value for r in results) == sorted(p.encode() for p in prompts)
+    assert fs.peak <= 2
+
+
+def test_batch_specs_override_shared_options():
+    seen = []
+    fs = FakeSession()
+    fs.get = lambda url, **kw: seen.append(kw["params"]) or FakeResponse(content=b"x")
+    c = _client(fs)
+    list(c.generate_images_batch(["a", {"prompt": "b", "width": 64}], width=256, workers=1, ordered=True))
+    assert [p["width"] for p in seen] == [256, 64]
+
+
+def test_async_batch_runs_concurrently_in_order():
+    class Slow(FakeAsyncSession):
+        async def request(self, method, url, **kw):
+            prompt = url.rsplit("/", 1)[-1]
+            await asyncio.sleep(0.05 if prompt == "a" else 0.01)
+            return FakeAsyncResponse(content=prompt.encode())
+
+    async def main():
+        c = AsyncPolliClient(session=Slow(), rate_limits={"image": None})
+        return [r async for r in c.generate_images_batch(["a", "b", "c"], workers=3, ordered=True)]
+
+    results = asyncio.run(main())
+    assert [r.value for r in results] == [b"a", b"b", b"c"]
+
+
+def test_map_text_pulls_input_lazily_and_reports_progress():
+    pulled = []
+
+    def prompts():
+        i = 0
+        while True:  # unbounded
+            pulled.append(i)
+            yield "bad" if i == 3 else f"p{i}"
+            i += 1
+
+    fs = FakeSession()
+    fs.get = lambda url, **kw: (
+        FakeResponse(status=400, text="no") if url.endswith("/bad") else FakeResponse(text=url.rsplit("/", 1)[-1])
+    )
+    c = PolliClient(session=fs, rate_limits={"text": None})
+    seen = []
+    results = c.map_text(prompts(), workers=2, progress=lambda p: seen.append((p.completed, p.failed)))
+    first = [next(results) for _ in range(5)]
+    results.close()
+    assert [r.value for r in first[:3]] == ["p0", "p1", "p2"]
+    assert not first[3].ok and first[4].value == "p4"
+    assert all(r.elapsed >= 0 for r in first)
+    assert len(pulled) <= 5 + 4  # never more than 2 * workers ahead
+    assert seen[-1][1] == 1 and seen[-1][0] >= 5
+
+
+def test_map_chat_accepts_message_lists_and_dicts():
+    bodies = []
+    fs = FakeSession()
+
+    def post(url, json=None, **kw):
+        bodies.append(json)
+        return FakeResponse(json_data={"choices": [{"message": {"content": json["messages"][0]["content"]}}]})
+
+    fs.post = post
+    c = PolliClient(session=fs)
+    convs = [
+        [{"role": "user", "content": "a"}],
+        {"messages": [{"role": "user", "content": "b"}], "model": "mistral"},
+    ]
+    results = list(c.map_chat(convs, workers=2))
+    assert [r.value for r in results] == ["a", "b"]
+    assert sorted(b["model"] for b in bodies) == ["mistral", "openai"]
+
+
+def test_async_map_text():
+    async def main():
+        c = AsyncPolliClient(session=FakeAsyncSession(), rate_limits={"text": None})
+        return [r async for r in c.map_text((f"p{i}" for i in range(5)), workers=2)]
+
+    results = asyncio.run(main())
+    assert [r.index for r in results] == list(range(5)) and all(r.value == "ok" for r in results)
+
+
+def test_batch_workers_inherit_priority_lane():
+    from polliLib.batch import run_batch
+    from polliLib.ratelimit import BACKGROUND, current_lane
+
+    c = PolliClient(session=FakeSession())
+    with c.priority("background"):
+        lanes = [r.value for r in run_batch(range(3), lambda i, spec: current_lane(), workers=2, ordered=True)]
+    assert lanes == [BACKGROUND] * 3
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from polliLib import AsyncPolliClient, CircuitOpenError, PolliClient
+from polliLib.breaker import BreakerPolicy, CircuitBreaker
+from .conftest import FakeAsyncResponse, FakeAsyncSession, FakeResponse, FakeSession
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_on_failure_rate_and_probes_to_close():
+    clock = FakeClock()
+    b = CircuitBreaker("text", BreakerPolicy(failure_rate=0.5, window=4, min_calls=4, open_for=10, probes=2), clock=clock)
+    for ok in (True, False, True, False):
+        b.acquire()
+        b.record(ok)
+    assert b.state == "open"
+    with pytest.raises(CircuitOpenError) as info:
+        b.acquire()
+    assert info.value.retry_in == 10
+
+    clock.now += 10
+    assert b.state == "half_open"
+    b.acquire()
+    b.acquire()
+    with pytest.raises(CircuitOpenError):
+        b.acquire()  # only `probes` requests at a time
+    b.record(True)
+    b.record(True)
+    assert b.state == "closed"
+
+
+def test_half_open_failure_reopens():
+    clock = FakeClock()
+    b = CircuitBreaker("image", BreakerPolicy(window=2, min_calls=2, open_for=5), clock=clock)
+    b.record(False)
+    b.record(False)
+    clock.now += 5
+    b.acquire()
+    b.record(False)
+    assert b.snapshot()["state"] == "open"
+    assert b.snapshot()["retry_in"] == 5
+
+
+def test_client_fails_fast_while_open():
+    class DownSession(FakeSession):
+        calls = 0
+
+        def get(self, url, **kw):
+            DownSession.calls += 1
+            return FakeResponse(status=503, text="down")
+
+    c = PolliClient(
+        session=DownSession(),
+        sleep=lambda s: None,
+        max_retries=1,
+        circuit_breaker={"window": 4, "min_calls": 4, "open_for": 60},
+    )
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            c.generate_text("x")
+    assert DownSession.calls == 4
+    with pytest.raises(CircuitOpenError):
+        c.generate_text("x")
+    assert DownSession.calls == 4
+    assert c.breaker_states()["text"]["state"] == "open"
+    # other endpoints keep their own circuit
+    assert c.chat_completion([{"role": "user", "content": "hi"}]) == "ok"
+    c.reset_breakers("text")
+    assert "text" not in c.breaker_states()
+
+
+def test_cancelled_half_open_probe_is_released():
+    class SlowSession(FakeAsyncSession):
+        def __init__(self, replies):
+            super().__init__()
+            self.replies = replies
+
+        async def request(self, method, url, **kw):
+            status, delay = self.replies.pop(0)
+            await asyncio.sleep(delay)
+            return FakeAsyncResponse(status=status, text="ok")
+
+    # A 503 trips the circuit, and with open_for=0 it is half-open at once.
+    fs = SlowSession([(503, 0), (200, 10), (200, 0)])
+    c = AsyncPolliClient(
+        session=fs,
+        max_retries=0,
+        rate_limits={"text": None},
+        circuit_breaker={"window": 1, "min_calls": 1, "open_for": 0, "probes": 1},
+    )
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await c.generate_text("x")
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(c.generate_text("x"), 0.05)  # the probe is cancelled
+        return await c.generate_text("x")
+
+    assert asyncio.run(scenario()) == "ok"
+    assert c.breaker_states()["text"]["state"] == "closed"
+
+
+def test_breaker_disabled_by_default():
+    c = PolliClient(session=FakeSession())
+    c.generate_text("x")
+    assert c.breaker_states() == {}
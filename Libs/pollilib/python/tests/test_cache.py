@@ -0,0 +1,224 @@
+import json
+import os
+import tempfile
+import time
+
+from polliLib import PolliClient
+from polliLib.cache import ResponseCache, ToolCache, cache_key
+from .conftest import FakeResponse, FakeSession
+
+
+class CountingSession(FakeSession):
+    def __init__(self):
+        super().__init__()
+        self.gets = 0
+        self.posts = 0
+
+    def get(self, url, **kw):
+        self.gets += 1
+        return FakeResponse(text=f"text-{self.gets}", content=b"IMG", content_chunks=[b"I", b"MG"])
+
+    def post(self, url, **kw):
+        self.posts += 1
+        return FakeResponse(json_data={"choices": [{"message": {"content": f"reply-{self.posts}"}}]})
+
+
+def test_cache_key_is_scoped_by_tenant_not_raw_credentials():
+    a = cache_key("GET", "https://x/p", {"seed": 1, "token": "a"}, None)
+    b = cache_key("GET", "https://x/p", {"seed": 1, "token": "b", "referrer": "r"}, None)
+    assert a == b
+    assert a != cache_key("GET", "https://x/p", {"seed": 2}, None)
+    assert a != cache_key("GET", "https://x/p", {"seed": 1}, None, scope="token:abc")
+
+
+def test_disk_lru_evicts_oldest_and_survives_restart(tmp_path: tempfile.TemporaryDirectory):
+    cache = ResponseCache(directory=str(tmp_path), max_bytes=10, memory_items=0)
+    cache.put("aa01", b"12345")
+    time.sleep(0.01)
+    cache.put("bb02", b"12345")
+    assert cache.get("aa01") == b"12345"  # now most recent
+    cache.put("cc03", b"12345")
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["disk_bytes"] == 10
+    assert cache.get("bb02") is None
+
+    reopened = ResponseCache(directory=str(tmp_path), max_bytes=10)
+    assert reopened.get("cc03") == b"12345"
+    assert reopened.stats()["disk_items"] == 2
+
+
+def test_seeded_text_and_chat_are_served_from_cache():
+    fs = CountingSession()
+    c = PolliClient(session=fs, cache=True, rate_limits={"text": None})
+    assert c.generate_text("hi", seed=1) == "text-1"
+    assert c.generate_text("hi", seed=1) == "text-1"
+    assert c.generate_text("hi") == "text-2"  # unseeded calls always go upstream
+    assert fs.gets == 2
+
+    msgs = [{"role": "user", "content": "x"}]
+    assert c.chat_completion(msgs, seed=3) == "reply-1"
+    assert c.chat_completion(msgs, seed=3, as_json=True)["choices"][0]["message"]["content"] == "reply-1"
+    assert fs.posts == 1
+    stats = c.cache_stats()
+    assert stats["hits"] == 2 and stats["misses"] == 2
+
+
+def test_cached_responses_are_not_served_across_tenants():
+    fs = CountingSession()
+    c = PolliClient(session=fs, cache=True, rate_limits={"text": None})
+    assert c.generate_text("hi", seed=1, token="a") == "text-1"
+    assert c.generate_text("hi", seed=1, token="b") == "text-2"
+    assert c.generate_text("hi", seed=1) == "text-3"  # anonymous
+    assert c.generate_text("hi", seed=1, token="a") == "text-1"
+    assert fs.gets == 3
+
+    shared = PolliClient(session=CountingSession(), cache={"shared": True}, rate_limits={"text": None})
+    assert shared.generate_text("hi", seed=1, token="a") == "text-1"
+    assert shared.generate_text("hi", seed=1, token="b") == "text-1"
+
+
+def test_image_out_path_hit_copies_cached_file(tmp_path: tempfile.TemporaryDirectory):
+    fs = CountingSession()
+    c = PolliClient(session=fs, cache=os.path.join(tmp_path, "cache"), rate_limits={"image": None})
+    first = os.path.join(tmp_path, "a.jpg")
+    second = os.path.join(tmp_path, "b.jpg")
+    assert c.generate_image("cat", seed=5, out_path=first) == first
+    assert c.generate_image("cat", seed=5, out_path=second) == second
+    with open(second, "rb") as f:
+        assert f.read() == b"IMG"
+    assert c.generate_image("cat", seed=5) == b"IMG"
+    assert fs.gets == 1
+    assert c.cache_stats()["hits"] == 2
+    c.clear_response_cache()
+    assert c.cache_stats()["disk_items"] == 0
+
+
+def test_rewriting_out_path_does_not_change_cached_entry(tmp_path: tempfile.TemporaryDirectory):
+    class SeededSession(FakeSession):
+        def get(self, url, params=None, **kw):
+            body = f"IMG-{params['seed']}".encode()
+            return FakeResponse(content=body, content_chunks=[body])
+
+    c = PolliClient(session=SeededSession(), cache=os.path.join(tmp_path, "cache"), rate_limits={"image": None})
+    out = os.path.join(tmp_path, "a.jpg")
+    c.generate_image("cat", seed=1, out_path=out)
+    c.generate_image("cat", seed=1, out_path=out)  # served from the disk cache
+    c.generate_image("cat", seed=2, out_path=out)  # overwrites the same path
+    with open(out, "rb") as f:
+        assert f.read() == b"IMG-2"
+    assert c.generate_image("cat", seed=1) == b"IMG-1"
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def _tool_call(i, name, **args):
+    return {"id": f"tc{i}", "function": {"name": name, "arguments": json.dumps(args)}}
+
+
+def test_memoized_tool_runs_once_across_rounds():
+    replies = [
+        {"choices": [{"message": {"tool_calls": [_tool_call(0, "lookup", city="Oslo"), _tool_call(1, "roll")]}}]},
+        {"choices": [{"message": {"tool_calls": [_tool_call(2, "lookup", city="Oslo"), _tool_call(3, "roll")]}}]},
+        {"choices": [{"message": {"content": "done"}}]},
+    ]
+    posts = []
+    fs = FakeSession()
+    fs.post = lambda url, json=None, **kw: (posts.append(json), FakeResponse(json_data=replies[len(posts) - 1]))[1]
+    calls = []
+
+    def lookup(city):
+        calls.append(city)
+        return {"city": city, "temp": len(calls)}
+
+    def roll():
+        calls.append("roll")
+        return len(calls)
+
+    c = PolliClient(session=fs, metrics=True)
+    out = c.chat_completion_tools(
+        [{"role": "user", "content": "?"}],
+        tools=[{"type": "function", "function": {"name": "lookup"}}, {"type": "function", "function": {"name": "roll"}}],
+        functions={"lookup": lookup, "roll": roll},
+        max_rounds=2,
+        memoize=["lookup"],
+    )
+    assert out == "done"
+    assert calls == ["Oslo", "roll", "roll"]  # roll was not opted in
+    first, second = posts[1]["messages"][2:4], posts[2]["messages"][5:7]
+    assert second[0]["content"] == first[0]["content"] and second[0]["tool_call_id"] == "tc2"
+    assert c.tool_cache_stats() == {}  # per-call cache only
+    assert c.metrics.counter(
+        "polli_tool_cache_total", operation="chat_completion_tools", model="openai", function="lookup", result="hit"
+    ) == 1
+
+
+def test_client_tool_cache_is_shared_across_calls_and_expires():
+    now = [0.0]
+    posts = []
+    fs = FakeSession()
+
+    def post(url, json=None, **kw):
+        posts.append(json)
+        if json["messages"][-1]["role"] == "tool":
+            return FakeResponse(json_data={"choices": [{"message": {"content": "ok"}}]})
+        return FakeResponse(json_data={"choices": [{"message": {"tool_calls": [_tool_call(0, "lookup", city="Oslo")]}}]})
+
+    fs.post = post
+    calls = []
+
+    def lookup(city):
+        calls.append(city)
+        if len(calls) == 2:
+            raise RuntimeError("flaky")
+        return {"city": city}
+
+    c = PolliClient(session=fs, tool_cache=ToolCache(ttl=60.0, clock=lambda: now[0]))
+    ask = lambda: c.chat_completion_tools(  # noqa: E731
+        [{"role": "user", "content": "?"}],
+        tools=[{"type": "function", "function": {"name": "lookup"}}],
+        functions={"lookup": lookup},
+        memoize={"lookup": 10.0},
+    )
+    ask()
+    ask()
+    assert calls == ["Oslo"]
+    now[0] = 11.0  # past lookup's own ttl, well inside the cache default
+    ask()  # the handler raises; errors are not cached
+    ask()
+    ask()
+    assert calls == ["Oslo", "Oslo", "Oslo"]
+    stats = c.tool_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["items"]) == (2, 3, 1)
+    assert stats["functions"]["lookup"]["hit_rate"] == 0.4
+
+
+def test_shared_tool_cache_is_scoped_to_handler_and_tenant():
+    fs = FakeSession()
+    replies = []
+
+    def post(url, json=None, **kw):
+        if json["messages"][-1]["role"] == "tool":
+            replies.append(json["messages"][-1]["content"])
+            return FakeResponse(json_data={"choices": [{"message": {"content": "ok"}}]})
+        return FakeResponse(json_data={"choices": [{"message": {"tool_calls": [_tool_call(0, "lookup", id=1)]}}]})
+
+    fs.post = post
+    c = PolliClient(session=fs, tool_cache=True)
+
+    def ask(handler, token=None):
+        c.chat_completion_tools(
+            [{"role": "user", "content": "?"}],
+            tools=[{"type": "function", "function": {"name": "lookup"}}],
+            functions={"lookup": handler},
+            token=token,
+            memoize=["lookup"],
+        )
+
+    ask(lambda id: "users")
+    ask(lambda id: "orders")  # same name, another handler
+    ask(lambda id: "users")  # a new lambda again: not the first one
+    users = lambda id: f"user for {id}"  # noqa: E731
+    ask(users, token="a")
+    ask(users, token="b")  # another tenant
+    ask(users, token="a")
+    assert replies == ["users", "orders", "users", "user for 1", "user for 1", "user for 1"]
+    assert c.tool_cache_stats()["hits"] == 1
@@ -0,0 +1,151 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from polliLib import AsyncPolliClient, DeadlineExceeded, PolliClient
+from polliLib.flight import AsyncSingleFlight, SingleFlight
+from .conftest import FakeAsyncResponse, FakeAsyncSession, FakeResponse, FakeSession
+
+
+class GatedSession(FakeSession):
+    """Every GET blocks until `release` is set, then returns `response()`."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+        self.release = threading.Event()
+        self.calls = 0
+
+    def get(self, url, **kw):
+        self.calls += 1
+        self.release.wait(2.0)
+        return self.response()
+
+
+def _run_concurrently(client, session, n, target):
+    results = [None] * n
+    errors = []
+
+    def work(i):
+        try:
+            results[i] = target(i)
+        except Exception as exc:  # collected for the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 2.0
+    while client._flights.shared < n - 1 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    session.release.set()
+    for t in threads:
+        t.join(2.0)
+    return results, errors
+
+
+def test_identical_seeded_images_share_one_request():
+    fs = GatedSession(lambda: FakeResponse(content=b"IMG"))
+    c = PolliClient(session=fs, rate_limits={"image": None})
+    results, errors = _run_concurrently(c, fs, 5, lambda i: c.generate_image("cat", seed=42))
+    assert not errors
+    assert results == [b"IMG"] * 5
+    assert fs.calls == 1
+
+
+def test_coalesced_out_path_downloads_copy_the_leaders_file(tmp_path: tempfile.TemporaryDirectory):
+    fs = GatedSession(lambda: FakeResponse(content_chunks=[b"ab", b"cd"]))
+    c = PolliClient(session=fs, rate_limits={"image": None})
+    paths = [os.path.join(tmp_path, f"img{i}.jpg") for i in range(3)]
+    results, errors = _run_concurrently(c, fs, 3, lambda i: c.generate_image("cat", seed=1, out_path=paths[i]))
+    assert not errors
+    assert results == paths
+    for p in paths:
+        with open(p, "rb") as f:
+            assert f.read() == b"abcd"
+    assert fs.calls == 1
+
+
+def test_followers_receive_the_leaders_error():
+    fs = GatedSession(lambda: FakeResponse(status=400, text="bad"))
+    c = PolliClient(session=fs, rate_limits={"text": None})
+    results, errors = _run_concurrently(c, fs, 3, lambda i: c.generate_text("x", seed=5))
+    assert len(errors) == 3 and fs.calls == 1
+
+
+def test_followers_rerun_when_the_leader_runs_out_of_deadline():
+    flights = SingleFlight()
+
+    def leader():
+        while flights.shared < 1:
+            time.sleep(0.001)
+        raise DeadlineExceeded("the leader's budget ran out")
+
+    errors = []
+
+    def lead():
+        try:
+            flights.do("k", leader, rerun=(DeadlineExceeded,))
+        except DeadlineExceeded as exc:
+            errors.append(exc)
+
+    first = threading.Thread(target=lead)
+    first.start()
+    while "k" not in flights._flights:
+        time.sleep(0.001)
+    assert flights.do("k", lambda: "own", timeout=2.0, rerun=(DeadlineExceeded,)) == ("own", False)
+    first.join(2.0)
+    assert len(errors) == 1
+
+
+def test_async_followers_rerun_when_the_leader_runs_out_of_deadline():
+    flights = AsyncSingleFlight()
+
+    async def leader():
+        await asyncio.sleep(0.01)
+        raise DeadlineExceeded("the leader's budget ran out")
+
+    async def own():
+        return "own"
+
+    async def scenario():
+        first = asyncio.ensure_future(flights.do("k", leader, rerun=(DeadlineExceeded,)))
+        await asyncio.sleep(0)
+        second = await flights.do("k", own, timeout=2.0, rerun=(DeadlineExceeded,))
+        try:
+            await first
+        except DeadlineExceeded:
+            pass
+        return second
+
+    assert asyncio.run(scenario()) == ("own", False)
+
+
+def test_coalescing_can_be_disabled():
+    fs = FakeSession()
+    c = PolliClient(session=fs, coalesce=False)
+    assert c._flights is None
+    assert c.generate_text("x", seed=1) == "ok"
+
+
+def test_async_seeded_chat_is_coalesced_and_results_are_independent():
+    class SlowPost(FakeAsyncSession):
+        async def request(self, method, url, **kw):
+            self.calls.append((method, url, kw))
+            await asyncio.sleep(0.05)
+            return FakeAsyncResponse(json_data={"choices": [{"message": {"content": "hi"}}]})
+
+    async def main():
+        fs = SlowPost()
+        c = AsyncPolliClient(session=fs)
+        msgs = [{"role": "user", "content": "x"}]
+        out = await asyncio.gather(*(c.chat_completion(msgs, seed=9, as_json=True) for _ in range(4)))
+        return fs, out
+
+    fs, out = asyncio.run(main())
+    assert len(fs.calls) == 1
+    assert all(o == out[0] for o in out)
+    out[1]["mutated"] = True
+    assert "mutated" not in out[0]
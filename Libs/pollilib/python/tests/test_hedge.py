@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from polliLib import AsyncPolliClient, PolliClient
+from polliLib.hedge import HedgePolicy, Hedger
+from .conftest import FakeAsyncResponse, FakeAsyncSession, FakeResponse, FakeSession
+
+
+class SlowFirstSession(FakeSession):
+    """First GET blocks until released; later GETs answer at once."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, **kw):
+        with self._lock:
+            self.calls += 1
+            n = self.calls
+        if n == 1:
+            self.release.wait(2.0)
+            return FakeResponse(text="slow")
+        return FakeResponse(text="fast")
+
+
+def _warm(client, endpoint, seconds=0.01, n=5):
+    for _ in range(n):
+        client._hedger.observe(endpoint, seconds)
+
+
+def test_hedger_waits_for_samples_and_respects_ratio():
+    h = Hedger(HedgePolicy(percentile=0.5, max_ratio=0.5, min_samples=3, min_delay=0.0))
+    assert h.delay("text") is None
+    for s in (0.1, 0.2, 0.3, 0.4):
+        h.observe("text", s)
+    assert h.delay("text") == 0.3
+    assert h.acquire("text") is True  # two requests earned one hedge
+    assert h.acquire("text") is False
+    assert h.snapshot()["text"]["hedges"] == 1
+
+
+def test_seeded_text_is_hedged_and_first_response_wins():
+    fs = SlowFirstSession()
+    c = PolliClient(session=fs, hedging={"min_samples": 5, "max_ratio": 1.0, "min_delay": 0.01}, rate_limits={"text": None})
+    _warm(c, "text")
+    try:
+        assert c.generate_text("x", seed=7) == "fast"
+    finally:
+        fs.release.set()
+    stats = c.hedge_stats()["text"]
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+    assert fs.calls == 2
+
+
+def test_unseeded_and_over_budget_calls_are_not_hedged():
+    fs = SlowFirstSession()
+    c = PolliClient(session=fs, hedging={"min_samples": 5, "max_ratio": 0.0, "min_delay": 0.01}, rate_limits={"text": None})
+    _warm(c, "text")
+    threading.Timer(0.1, fs.release.set).start()
+    assert c.generate_text("x", seed=7) == "slow"
+    assert c.hedge_stats()["text"]["hedges"] == 0
+    assert c.generate_text("y") == "fast"  # no seed: plain request
+    assert fs.calls == 2
+
+
+def test_hedgeable_calls_are_not_capped_by_the_backup_pool():
+    n = 24  # more than the backup pool's workers
+    barrier = threading.Barrier(n, timeout=2.0)
+
+    class Together(FakeSession):
+        def get(self, url, **kw):
+            barrier.wait()  # only returns once all n requests are in flight
+            return FakeResponse(text="ok")
+
+    c = PolliClient(session=Together(), hedging={"min_samples": 5, "max_ratio": 0.0}, rate_limits={"text": None})
+    _warm(c, "text", seconds=5.0)
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        out = list(pool.map(lambda i: c.generate_text(f"x{i}", seed=i), range(n)))
+    assert out == ["ok"] * n
+
+
+def test_calls_queued_in_the_limiter_are_not_hedged():
+    sent = []
+
+    class Counting(FakeSession):
+        def get(self, url, **kw):
+            sent.append(url)
+            return FakeResponse(text="ok")
+
+    # The second call waits 0.2s for its slot; the hedge delay is 0.1s.
+    c = PolliClient(
+        session=Counting(),
+        hedging={"min_samples": 1, "max_ratio": 1.0, "min_delay": 0.1},
+        sleep=lambda s: time.sleep(0.2),
+    )
+    _warm(c, "text", seconds=0.0)
+    assert c.generate_text("a", seed=1) == "ok"
+    assert c.generate_text("b", seed=2) == "ok"
+    assert len(sent) == 2 and c.hedge_stats()["text"]["hedges"] == 0
+    assert max(c._hedger._endpoints["text"].latencies) < 0.2  # queueing is not latency
+
+
+def test_backups_only_use_a_free_limiter_token():
+    fs = SlowFirstSession()
+    c = PolliClient(session=fs, hedging={"min_samples": 5, "max_ratio": 1.0, "min_delay": 0.01}, rate_limits={"text": (0.001, 1)})
+    _warm(c, "text")
+    threading.Timer(0.1, fs.release.set).start()
+    assert c.generate_text("x", seed=7) == "slow"  # the primary took the only token
+    assert fs.calls == 1 and c.hedge_stats()["text"]["hedges"] == 0
+
+
+def test_async_hedge_cancels_slow_leg():
+    cancelled = []
+
+    class SlowFirstAsync(FakeAsyncSession):
+        async def request(self, method, url, **kw):
+            self.calls.append((method, url, kw))
+            if len(self.calls) == 1:
+                try:
+                    await asyncio.sleep(2.0)
+                except asyncio.CancelledError:
+                    cancelled.append(True)
+                    raise
+                return FakeAsyncResponse(content=b"slow")
+            return FakeAsyncResponse(content=b"fast")
+
+    async def main():
+        c = AsyncPolliClient(
+            session=SlowFirstAsync(),
+            hedging={"min_samples": 5, "max_ratio": 1.0, "min_delay": 0.01},
+            rate_limits={"image": None},
+        )
+        _warm(c, "image")
+        out = await c.generate_image("x", seed=3)
+        await asyncio.sleep(0)
+        return c, out
+
+    c, out = asyncio.run(main())
+    assert out == b"fast" and cancelled == [True]
+    assert c.hedge_stats()["image"]["hedge_wins"] == 1
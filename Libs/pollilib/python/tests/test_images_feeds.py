@@ -84,3 +84,14 @@ def test_text_feed_stream_parsing():
     ev = next(iter(c.text_feed_stream()))
     assert ev['model'] == 'openai' and ev['response'] == 'Hello'
 
+
+def test_feed_reconnect_uses_injected_sleep():
+    lines = ['data: {"model":"openai","response":"Hello"}', 'data: [DONE]']
+    fs = FakeSession()
+    fs.get = lambda url, **kw: FakeResponse(stream_lines=lines)
+    slept = []
+    c = PolliClient(session=fs, sleep=slept.append, min_request_interval=0.0)
+    stream = c.text_feed_stream(reconnect=True, retry_delay=7.0)
+    events = [next(stream), next(stream)]
+    assert [ev['response'] for ev in events] == ['Hello', 'Hello']
+    assert slept == [7.0]
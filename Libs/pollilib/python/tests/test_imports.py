@@ -0,0 +1,31 @@
+import subprocess
+import sys
+
+from .conftest import PYTHON_DIR
+
+
+def _run(code):
+    subprocess.run([sys.executable, "-c", code], cwd=PYTHON_DIR, check=True)
+
+
+def test_import_polliLib_does_not_load_the_client():
+    _run(
+        "import sys, polliLib\n"
+        "assert 'requests' not in sys.modules and 'polliLib.client' not in sys.modules\n"
+        "assert polliLib.PolliClient.__module__ == 'polliLib.client'\n"
+        "assert 'PolliClient' in dir(polliLib)\n"
+    )
+
+
+def test_star_import_and_unknown_names():
+    _run(
+        "from polliLib import *\n"
+        "assert AsyncPolliClient and DeadlineExceeded and generate_text\n"
+        "import polliLib\n"
+        "try:\n"
+        "    polliLib.nope\n"
+        "except AttributeError:\n"
+        "    pass\n"
+        "else:\n"
+        "    raise SystemExit(1)\n"
+    )
@@ -0,0 +1,113 @@
+import asyncio
+from json import dumps
+from types import SimpleNamespace
+
+from polliLib import AsyncPolliClient, MetricsRegistry, MetricsSink, PolliClient
+from .conftest import FakeAsyncSession, FakeResponse, FakeSession
+from .test_retry import SeqSession
+
+
+def test_registry_renders_prometheus_text():
+    reg = MetricsRegistry(buckets=(0.1, 1.0))
+    reg.inc("polli_retries_total", labels={"reason": "503"})
+    reg.inc("polli_retries_total", 2, labels={"reason": "503"})
+    reg.observe("polli_request_duration_seconds", 0.5, {"operation": "x"})
+    reg.observe("polli_request_duration_seconds", 3.0, {"operation": "x"})
+    out = reg.render_prometheus()
+    assert "# TYPE polli_retries_total counter" in out
+    assert 'polli_retries_total{reason="503"} 3' in out
+    assert 'polli_request_duration_seconds_bucket{operation="x",le="0.1"} 0' in out
+    assert 'polli_request_duration_seconds_bucket{operation="x",le="1"} 1' in out
+    assert 'polli_request_duration_seconds_bucket{operation="x",le="+Inf"} 2' in out
+    assert 'polli_request_duration_seconds_sum{operation="x"} 3.5' in out
+    assert reg.histogram("polli_request_duration_seconds", operation="x") == {"count": 2.0, "sum": 3.5}
+    reg.reset()
+    assert reg.render_prometheus() == ""
+
+
+def test_client_counts_retries_statuses_and_duration():
+    class Encoding(SeqSession):
+        # Like requests: the response carries the request as it was encoded.
+        sent = 0
+
+        def post(self, url, json=None, **kw):
+            resp = self._next()
+            resp.request = SimpleNamespace(body=dumps(json).encode())
+            self.sent += len(resp.request.body)
+            return resp
+
+    fs = Encoding([
+        FakeResponse(status=503, text="busy"),
+        FakeResponse(json_data={"choices": [{"message": {"content": "ok"}}]}),
+    ])
+    c = PolliClient(session=fs, sleep=lambda s: None, retry_jitter=0.0, metrics=True)
+    assert c.chat_completion([{"role": "user", "content": "hi"}], model="openai") == "ok"
+    m = c.metrics
+    chat = {"endpoint": "chat", "operation": "chat_completion", "model": "openai"}
+    assert m.counter("polli_retries_total", operation="chat_completion", model="openai", reason="503") == 1
+    assert m.counter("polli_responses_total", status="503", **chat) == 1
+    assert m.counter("polli_responses_total", status="200", **chat) == 1
+    assert m.histogram("polli_attempt_duration_seconds", **chat)["count"] == 2
+    assert m.histogram(
+        "polli_request_duration_seconds", operation="chat_completion", model="openai", outcome="ok"
+    )["count"] == 1
+    assert m.counter("polli_request_bytes_total", operation="chat_completion", model="openai") == fs.sent > 0
+    assert m.histogram("polli_wait_seconds", reason="backoff", **chat)["count"] == 1
+
+
+def test_stream_records_first_byte_bytes_and_early_close(tmp_path):
+    class Chunks(FakeSession):
+        def get(self, url, **kw):
+            return FakeResponse(content_chunks=[b"ab", b"cde"])
+
+        def post(self, url, **kw):
+            return FakeResponse(stream_lines=[
+                'data: {"choices":[{"delta":{"content":"Hel"}}]}',
+                'data: {"choices":[{"delta":{"content":"lo"}}]}',
+            ])
+
+    c = PolliClient(session=Chunks(), metrics=True, rate_limits={"image": None})
+    labels = {"operation": "generate_image", "model": "flux"}
+    c.generate_image("cat", model="flux", out_path=str(tmp_path / "cat.jpg"))
+    m = c.metrics
+    assert m.histogram("polli_time_to_first_byte_seconds", **labels)["count"] == 1
+    assert m.counter("polli_response_bytes_total", **labels) == 5
+    assert m.histogram("polli_request_duration_seconds", outcome="ok", **labels)["count"] == 1
+
+    stream = c.chat_completion_stream([{"role": "user", "content": "x"}], model="openai")
+    assert next(stream) == "Hel"
+    stream.close()
+    chat = {"operation": "chat_completion_stream", "model": "openai"}
+    assert m.histogram("polli_request_duration_seconds", outcome="closed", **chat)["count"] == 1
+
+
+def test_custom_sink_and_failure_outcome():
+    seen = []
+
+    class Sink(MetricsSink):
+        def observe(self, name, value, labels=None):
+            seen.append((name, dict(labels or {})))
+
+    fs = SeqSession([FakeResponse(status=400, text="bad")])
+    c = PolliClient(session=fs, metrics=Sink())
+    try:
+        c.generate_text("x", model="openai")
+    except RuntimeError:
+        pass
+    outcomes = [l.get("outcome") for n, l in seen if n == "polli_request_duration_seconds"]
+    assert outcomes == ["RuntimeError"]
+
+
+def test_async_client_records_metrics():
+    async def main():
+        fs = FakeAsyncSession()
+        c = AsyncPolliClient(session=fs, metrics=True)
+        await c.generate_text("hi", model="openai")
+        return c.metrics
+
+    m = asyncio.run(main())
+    assert m.histogram(
+        "polli_request_duration_seconds", operation="generate_text", model="openai", outcome="ok"
+    )["count"] == 1
+    labels = {"endpoint": "text", "operation": "generate_text", "model": "openai"}
+    assert m.counter("polli_responses_total", status="200", **labels) == 1
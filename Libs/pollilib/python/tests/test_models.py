@@ -0,0 +1,114 @@
+import os
+import tempfile
+import threading
+
+from polliLib import PolliClient
+from polliLib.catalog import ModelCatalog
+from .conftest import FakeResponse, FakeSession
+
+
+TEXT_MODELS = [
+    {"name": "openai", "aliases": ["gpt-4o-mini"], "tools": True, "vision": True, "input_modalities": ["text", "image"]},
+    {"name": "openai-audio", "aliases": [], "audio": True, "input_modalities": ["text", "audio"]},
+]
+IMAGE_MODELS = ["flux", "turbo"]
+
+
+class CatalogSession(FakeSession):
+    def __init__(self):
+        super().__init__()
+        self.model_calls = []
+
+    def get(self, url, **kw):
+        self.model_calls.append(url)
+        if url.startswith("https://text."):
+            return FakeResponse(json_data=TEXT_MODELS)
+        return FakeResponse(json_data=IMAGE_MODELS)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_list_models_cached_until_refresh():
+    fs = CatalogSession()
+    c = PolliClient(session=fs)
+    assert [m["name"] for m in c.list_models("image")] == ["flux", "turbo"]
+    c.list_models("image")
+    assert len(fs.model_calls) == 1
+    c.refresh_cache()
+    c.list_models("image")
+    assert len(fs.model_calls) == 2
+
+
+def test_catalog_serves_stale_and_refreshes_once():
+    clock = FakeClock()
+    catalog = ModelCatalog(ttl=60.0, clock=clock)
+    catalog.store("text", [{"name": "old"}])
+    assert catalog.lookup("text") == ([{"name": "old"}], True)
+    clock.now += 61
+    assert catalog.lookup("text") == ([{"name": "old"}], False)
+    assert catalog.begin_refresh("text") is True
+    assert catalog.begin_refresh("text") is False
+    catalog.end_refresh("text")
+
+
+def test_stale_list_returned_while_background_refresh_runs():
+    fs = CatalogSession()
+    c = PolliClient(session=fs, models_ttl=0.0)
+    c.list_models("text")
+    refreshed = threading.Event()
+    original = c._load_models
+
+    def tracking_load(kind):
+        out = original(kind)
+        refreshed.set()
+        return out
+
+    c._load_models = tracking_load
+    assert c.list_models("text")[0]["name"] == "openai"
+    assert refreshed.wait(2.0)
+    assert len(fs.model_calls) == 2
+
+
+def test_catalog_persists_across_clients(tmp_path: tempfile.TemporaryDirectory):
+    path = os.path.join(tmp_path, "models.json")
+    c = PolliClient(session=CatalogSession(), models_cache_path=path)
+    c.list_models("text")
+    assert os.path.exists(path)
+
+    class OfflineSession(FakeSession):
+        def get(self, url, **kw):
+            raise AssertionError("catalog should be served from disk")
+
+    warm = PolliClient(session=OfflineSession(), models_cache_path=path)
+    assert warm.get_model_by_name("gpt-4o-mini", kind="text")["name"] == "openai"
+
+
+def test_get_model_by_name_uses_index_with_alias_and_case_options():
+    c = PolliClient(session=CatalogSession())
+    assert c.get_model_by_name("OPENAI")["name"] == "openai"
+    assert c.get_model_by_name("gpt-4o-mini")["name"] == "openai"
+    assert c.get_model_by_name("gpt-4o-mini", include_aliases=False) is None
+    assert c.get_model_by_name("FLUX", case_insensitive=False) is None
+    assert c.get_model_by_name("flux")["name"] == "flux"
+    assert c.get_model_by_name("flux", kind="text") is None
+
+
+def test_capability_lookups():
+    fs = CatalogSession()
+    c = PolliClient(session=fs)
+    assert [m["name"] for m in c.models_with("vision")] == ["openai"]
+    assert [m["name"] for m in c.models_with("tools", kind="text")] == ["openai"]
+    assert [m["name"] for m in c.models_with("input_modalities", "audio")] == ["openai-audio"]
+    assert c.model_supports("gpt-4o-mini", "input_modalities", "image")
+    assert not c.model_supports("flux", "vision")
+    assert not c.model_supports("missing", "vision")
+    calls = len(fs.model_calls)
+    for _ in range(5):
+        c.models_with("vision")
+    assert len(fs.model_calls) == calls
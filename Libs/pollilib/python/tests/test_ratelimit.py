@@ -0,0 +1,293 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from polliLib import PolliClient
+from polliLib.base import Call
+from polliLib.ratelimit import (
+    BACKGROUND,
+    INTERACTIVE,
+    AdaptiveRate,
+    PartitionPolicy,
+    Partitions,
+    RateLimiter,
+    TokenBucket,
+    partition_key,
+)
+from .conftest import FakeResponse, FakeSession
+
+
+class FakeClock:
+    def __init__(self, now=100.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_burst_then_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, burst=3, clock=clock)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+    clock.now += 10
+    assert bucket.reserve() == 0.0
+
+
+def test_rate_limiter_per_endpoint_specs():
+    clock = FakeClock()
+    limiter = RateLimiter(default=(1.0, 1), limits={"image": (0.5, 2), "feed": None}, clock=clock)
+    assert limiter.reserve("text") == 0.0
+    assert limiter.reserve("text") == 1.0
+    # image has its own bucket and burst
+    assert limiter.reserve("image") == 0.0
+    assert limiter.reserve("image") == 0.0
+    assert limiter.reserve("image") == 2.0
+    # None means unlimited
+    assert all(limiter.reserve("feed") == 0.0 for _ in range(10))
+
+
+def test_requests_overlap_without_global_lock():
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+    release = threading.Event()
+
+    class SlowSession(FakeSession):
+        def get(self, url, **kw):
+            with lock:
+                in_flight.append(url)
+                peak.append(len(in_flight))
+                if len(in_flight) == 2:
+                    release.set()
+            release.wait(2.0)
+            with lock:
+                in_flight.remove(url)
+            return FakeResponse(text="ok", content=b"img")
+
+    c = PolliClient(session=SlowSession(), rate_limits={"text": None, "image": None})
+    threads = [
+        threading.Thread(target=c.generate_text, args=("a",)),
+        threading.Thread(target=c.generate_image, args=("b",)),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5.0)
+    assert max(peak) == 2
+
+
+def test_text_and_image_buckets_are_independent():
+    sleeps = []
+    fs = FakeSession()
+    fs.get = lambda url, **kw: FakeResponse(text="ok", content=b"img")
+    c = PolliClient(session=fs, sleep=sleeps.append)
+    c.generate_text("one")
+    c.generate_image("two")
+    assert sleeps == []
+    c.generate_text("three")
+    assert len(sleeps) == 1 and sleeps[0] > 2.9
+
+
+def test_adaptive_rate_increases_on_success_and_cuts_once_per_burst():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        default=(1.0, 1),
+        clock=clock,
+        adaptive=AdaptiveRate(min_rate=0.2, max_rate=1.5, increase=0.25, decrease=0.5),
+    )
+    for _ in range(4):
+        limiter.on_success("text")
+    assert limiter.bucket("text").rate == 1.5
+    limiter.on_throttle("text")
+    limiter.on_throttle("text")  # same burst of 429s: only one cut
+    assert limiter.bucket("text").rate == 0.75
+    clock.now += 10
+    limiter.on_throttle("text")
+    limiter.on_throttle("text")
+    clock.now += 10
+    limiter.on_throttle("text")
+    assert limiter.bucket("text").rate == 0.2
+
+
+def test_retry_after_pauses_endpoint_and_adapts_rate():
+    class SeqSession(FakeSession):
+        def __init__(self):
+            super().__init__()
+            self.responses = [
+                FakeResponse(status=429, text="limit", headers={"Retry-After": "2"}),
+                FakeResponse(text="done"),
+            ]
+
+        def get(self, url, **kw):
+            return self.responses.pop(0)
+
+    sleeps = []
+    c = PolliClient(session=SeqSession(), sleep=sleeps.append, adaptive_rate=True)
+    start_rate = c.current_rate("text")
+    assert c.generate_text("retry") == "done"
+    assert sleeps and 1.9 < sleeps[0] <= 2.0
+    state = c.rate_limit_state()["text"]
+    assert state["rate"] < start_rate
+    assert state["paused_for"] > 0
+
+
+def test_interactive_jumps_queued_background_slots():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, burst=1, clock=clock)
+    queued = [bucket.schedule(BACKGROUND) for _ in range(3)]
+    assert [w for w, _ in queued] == [0.0, 1.0, 2.0]
+    wait, slot = bucket.schedule(INTERACTIVE)
+    assert wait == 1.0  # the first queued background slot
+    # Both waiting background calls were pushed back one interval.
+    assert [bucket.recheck(s) for _, s in queued[1:]] == [1.0, 1.0]
+    assert bucket.recheck(slot) == 0.0
+    clock.now += 1.0
+    assert bucket.recheck(queued[1][1]) == 0.0  # owed time is only reported once
+
+
+def test_starvation_limit_caps_how_far_background_is_pushed():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, burst=1, clock=clock, max_delay=2.0)
+    bucket.schedule(BACKGROUND)
+    _, slot = bucket.schedule(BACKGROUND)
+    waits = [bucket.schedule(INTERACTIVE)[0] for _ in range(4)]
+    # Two jumps exhaust the background call's allowance; then it goes first.
+    assert waits == [1.0, 2.0, 4.0, 5.0]
+    assert bucket.recheck(slot) == 2.0
+    assert bucket.reserve() == 6.0  # plain reserve() stays FIFO
+
+
+def test_priority_context_sets_call_lane():
+    from polliLib.base import Call
+
+    c = PolliClient(session=FakeSession())
+    with c.priority("interactive"):
+        assert Call("GET", "u", endpoint="text").priority == INTERACTIVE
+        with c.priority(None):
+            assert Call("GET", "u", endpoint="text").priority == INTERACTIVE
+    assert Call("GET", "u", endpoint="text").priority == 1
+    try:
+        with c.priority("urgent"):
+            pass
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown lane accepted")
+
+
+def test_bumped_call_sleeps_for_owed_time():
+    slept = []
+    c = PolliClient(session=FakeSession(), sleep=slept.append)
+    bucket = c._rate_limiter.bucket("text")
+    bucket.reserve()  # use up the burst so the call has to queue
+    real_schedule = bucket.schedule
+
+    def schedule(lane):
+        wait, slot = real_schedule(lane)
+        slot.owed = 0.5  # as if an interactive call jumped ahead meanwhile
+        return wait, slot
+
+    bucket.schedule = schedule
+    assert c.generate_text("hi") == "ok"
+    assert len(slept) == 2 and slept[1] == 0.5
+
+
+def test_partitions_evict_idle_and_least_recently_used():
+    clock = FakeClock()
+    parts = Partitions(PartitionPolicy(idle_ttl=60, max_partitions=2), clock=clock)
+    a = parts.limiter("a")
+    parts.limiter("b")
+    assert parts.limiter("a") is a
+    parts.limiter("c")  # over the cap: "b" was used least recently
+    assert sorted(parts.snapshot()) == ["a", "c"]
+    clock.now += 61
+    parts.limiter("d")
+    assert list(parts.snapshot()) == ["d"]
+
+
+def test_busy_tenant_does_not_throttle_others():
+    slept = []
+    c = PolliClient(
+        session=FakeSession(),
+        sleep=slept.append,
+        rate_limits={"text": None},
+        partitions={"limits": {"text": (1.0, 1)}},
+    )
+    c.generate_text("a", token="busy")
+    c.generate_text("b", token="busy")
+    assert len(slept) == 1 and 0.9 < slept[0] <= 1.0
+    c.generate_text("c", token="quiet")
+    c.generate_text("d", referrer="site")
+    assert len(slept) == 1
+    state = c.partition_state()
+    assert set(state) == {partition_key("busy", None), partition_key("quiet", None), "referrer:site"}
+    assert all("busy" not in key for key in state)  # tokens are hashed
+
+
+def test_queued_tenant_calls_hold_no_endpoint_slots():
+    def client(sleep=None):
+        return PolliClient(
+            session=FakeSession(),
+            sleep=sleep or (lambda s: None),
+            rate_limits={"text": (10.0, 1)},
+            partitions={"default": (1.0, 1)},
+        )
+
+    c = client()
+    busy = [Call("GET", "https://x/p", endpoint="text", params={"token": "busy"}) for _ in range(50)]
+    waits = [c._attempt_delay(call) for call in busy]
+    assert waits[0] == 0 and 48.9 < waits[-1] <= 49.0
+    quiet = Call("GET", "https://x/p", endpoint="text", params={"token": "quiet"})
+    assert c._attempt_delay(quiet) <= 0.1  # not behind 50 global slots
+    # A queued busy call takes its endpoint slot only when its turn comes.
+    assert 0.1 < c._slot_wait(busy[1]) <= 0.2
+
+    slept = []
+    c = client(slept.append)
+    c.generate_text("a", token="solo")
+    c.generate_text("b", token="solo")
+    assert len(slept) == 2 and 0.9 < slept[0] <= 1.0 and 0 < slept[1] <= 0.1
+
+
+def test_tenant_buckets_skip_endpoints_without_a_global_limit():
+    slept = []
+    c = PolliClient(session=FakeSession(), sleep=slept.append, partitions={"default": (1.0, 1)})
+    msgs = [{"role": "user", "content": "x"}]
+    for _ in range(3):
+        c.chat_completion(msgs, token="t")  # chat is unlimited globally
+    assert slept == []
+    c = PolliClient(session=FakeSession(), sleep=slept.append, partitions={"limits": {"chat": (1.0, 1)}})
+    c.chat_completion(msgs, token="t")
+    c.chat_completion(msgs, token="t")
+    assert len(slept) == 1
+
+
+def test_max_in_flight_caps_each_tenant():
+    release = threading.Event()
+    active = {"busy": 0, "quiet": 0}
+    peak = {"busy": 0, "quiet": 0}
+    lock = threading.Lock()
+
+    class Held(FakeSession):
+        def get(self, url, params=None, **kw):
+            who = params["token"]
+            with lock:
+                active[who] += 1
+                peak[who] = max(peak[who], active[who])
+            release.wait(2.0)
+            with lock:
+                active[who] -= 1
+            return FakeResponse(text="ok")
+
+    c = PolliClient(session=Held(), rate_limits={"text": None}, partitions={"max_in_flight": 2})
+    tokens = ["busy"] * 6 + ["quiet"]
+    with ThreadPoolExecutor(max_workers=len(tokens)) as pool:
+        futures = [pool.submit(c.generate_text, f"p{i}", token=t) for i, t in enumerate(tokens)]
+        deadline = time.monotonic() + 2.0
+        while (active["busy"] < 2 or active["quiet"] < 1) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        assert [f.result() for f in futures] == ["ok"] * len(tokens)
+    assert peak == {"busy": 2, "quiet": 1}
@@ -0,0 +1,188 @@
+import time
+
+import pytest
+
+from polliLib import DeadlineExceeded, PolliClient
+from .conftest import FakeResponse, FakeSession
+
+
+class SeqSession(FakeSession):
+    """Hands out queued responses; queued exceptions are raised instead."""
+
+    def __init__(self, items):
+        super().__init__()
+        self.items = list(items)
+        self.calls = 0
+
+    def _next(self):
+        self.calls += 1
+        item = self.items.pop(0)
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def get(self, url, **kw):
+        return self._next()
+
+    def post(self, url, **kw):
+        return self._next()
+
+
+def _client(session, **kw):
+    sleeps = []
+    kw.setdefault("retry_jitter", 0.0)
+    c = PolliClient(session=session, sleep=sleeps.append, **kw)
+    return c, sleeps
+
+
+def test_chat_completion_retries_transient_status():
+    fs = SeqSession([
+        FakeResponse(status=503, text="busy"),
+        FakeResponse(json_data={"choices": [{"message": {"content": "ok"}}]}),
+    ])
+    c, sleeps = _client(fs)
+    assert c.chat_completion([{"role": "user", "content": "hi"}]) == "ok"
+    assert fs.calls == 2
+    assert sleeps == [0.5]
+
+
+def test_vision_retries_connection_error():
+    fs = SeqSession([
+        ConnectionError("reset"),
+        FakeResponse(json_data={"choices": [{"message": {"content": "a cat"}}]}),
+    ])
+    c, _ = _client(fs)
+    assert c.analyze_image_url("https://example.com/cat.png") == "a cat"
+    assert fs.calls == 2
+
+
+def test_stream_retries_only_before_first_chunk():
+    class Broken(FakeResponse):
+        def __init__(self, fail_after):
+            super().__init__()
+            self.fail_after = fail_after
+
+        def iter_lines(self, decode_unicode=False):
+            for ln in self.fail_after:
+                yield ln
+            raise ConnectionError("dropped")
+
+    lines = ['data: {"choices":[{"delta":{"content":"ok"}}]}', "data: [DONE]"]
+    fs = SeqSession([
+        FakeResponse(status=502, text="bad gateway"),
+        Broken([]),
+        FakeResponse(stream_lines=lines),
+    ])
+    c, _ = _client(fs)
+    assert list(c.chat_completion_stream([{"role": "user", "content": "x"}])) == ["ok"]
+    assert fs.calls == 3
+
+    fs = SeqSession([Broken([lines[0]]), FakeResponse(stream_lines=lines)])
+    c, _ = _client(fs)
+    with pytest.raises(ConnectionError):
+        list(c.chat_completion_stream([{"role": "user", "content": "x"}]))
+    assert fs.calls == 1
+
+
+def test_backoff_is_exponential_capped_and_jittered():
+    c = PolliClient(session=FakeSession(), retry_initial_delay=0.5, retry_backoff=2.0, retry_max_delay=3.0, retry_jitter=0.0)
+    assert [c._retry_delay(n) for n in range(1, 6)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    c = PolliClient(session=FakeSession(), retry_initial_delay=1.0, retry_jitter=0.5)
+    for _ in range(50):
+        assert 0.5 <= c._retry_delay(1) <= 1.0
+
+
+def test_max_retries_bounds_attempts():
+    fs = SeqSession([FakeResponse(status=503, text="busy") for _ in range(5)])
+    c, sleeps = _client(fs, max_retries=2)
+    with pytest.raises(RuntimeError):
+        c.generate_text("x")
+    assert fs.calls == 3
+    assert len(sleeps) == 2
+
+
+def test_default_retry_count_follows_the_backoff():
+    fs = SeqSession([FakeResponse(status=503, text="busy") for _ in range(10)])
+    c, sleeps = _client(fs)
+    with pytest.raises(RuntimeError):
+        c.generate_text("x")
+    assert sleeps == [0.5, 1.0, 2.0, 4.0]
+    assert PolliClient(session=FakeSession(), retry_backoff=1.0)._max_retry_attempts == 1
+    assert PolliClient(session=FakeSession(), retry_initial_delay=1.0, retry_max_delay=1.0)._max_retry_attempts == 1
+
+
+def test_retry_delay_step_is_deprecated():
+    with pytest.warns(DeprecationWarning, match="retry_delay_step"):
+        c = PolliClient(session=FakeSession(), retry_delay_step=0.3)
+    assert c._max_retry_attempts == PolliClient(session=FakeSession())._max_retry_attempts
+
+
+def test_deadline_clamps_attempt_timeout():
+    fs = SeqSession([FakeResponse(text="ok")])
+    seen = {}
+
+    def get(url, **kw):
+        seen.update(kw)
+        return fs._next()
+
+    fs.get = get
+    c, _ = _client(fs)
+    assert c.generate_text("x", timeout=300, deadline=5.0) == "ok"
+    assert 0 < seen["timeout"] <= 5.0
+
+
+def test_deadline_fails_fast_instead_of_backing_off():
+    fs = SeqSession([FakeResponse(status=503, text="busy") for _ in range(5)])
+    c, sleeps = _client(fs)
+    with pytest.raises(DeadlineExceeded):
+        c.generate_image("x", deadline=0.2)
+    assert fs.calls == 1
+    assert sleeps == []
+
+
+def test_deadline_wraps_transport_timeout():
+    class SlowSession(FakeSession):
+        def post(self, url, **kw):
+            time.sleep(kw["timeout"])
+            raise TimeoutError("read timed out")
+
+    c, _ = _client(SlowSession())
+    with pytest.raises(DeadlineExceeded) as info:
+        c.chat_completion([{"role": "user", "content": "x"}], deadline=0.05)
+    assert isinstance(info.value.__cause__, TimeoutError)
+
+
+def test_model_catalog_calls_honour_deadline():
+    seen = {}
+
+    class SlowCatalog(FakeSession):
+        def get(self, url, **kw):
+            seen.update(kw)
+            raise TimeoutError("read timed out")
+
+    c, _ = _client(SlowCatalog())
+    with pytest.raises(DeadlineExceeded):
+        c.get_model_by_name("openai", kind="text", deadline=0.05)
+    assert seen["timeout"] <= 0.05
+
+
+def test_deadline_returns_the_unused_limiter_token():
+    c, _ = _client(SeqSession([FakeResponse(text="ok")]), min_request_interval=1.0)
+    assert c.generate_text("a") == "ok"
+    with pytest.raises(DeadlineExceeded):
+        c.generate_text("b", deadline=0.5)  # its slot is ~1s away
+    assert c.rate_limit_state()["text"]["tokens"] > -0.5
+
+
+def test_deadline_clamped_timeout_is_not_a_breaker_failure():
+    class Hangs(FakeSession):
+        def post(self, url, **kw):
+            raise TimeoutError("read timed out")
+
+    c, _ = _client(Hangs(), circuit_breaker=True)
+    with pytest.raises(DeadlineExceeded):
+        c.chat_completion([{"role": "user", "content": "x"}], deadline=0.05)
+    assert c.breaker_states()["chat"]["calls"] == 0
+    with pytest.raises(TimeoutError):
+        c.chat_completion([{"role": "user", "content": "x"}], timeout=0.01, deadline=60)
+    assert c.breaker_states()["chat"]["failure_rate"] == 1.0  # the client's own timeout still counts
@@ -0,0 +1,44 @@
+from polliLib.sse import SSEParser, iter_events
+
+
+STREAM = (
+    b"\xef\xbb\xbf: keep-alive\r\n"
+    b"event: delta\r\n"
+    b"id: 7\r\n"
+    b"retry: 1500\r\n"
+    b"data: first\r\n"
+    b"data: second\r\n"
+    b"\r\n"
+    b"data: {\"x\": \"caf\xc3\xa9\"}\n\n"
+    b"data:no-space\r\r"
+    b"event: ignored-without-data\n\n"
+    b"data: tail"
+)
+
+
+def _parse(chunks):
+    return [(e.event, e.data, e.id, e.retry) for e in iter_events(chunks)]
+
+
+def test_parser_handles_fields_line_endings_and_multiline_data():
+    assert _parse([STREAM]) == [
+        ("delta", "first\nsecond", "7", 1500),
+        ("message", '{"x": "café"}', "7", 1500),
+        ("message", "no-space", "7", 1500),
+        ("message", "tail", "7", 1500),  # dispatched at end of stream
+    ]
+
+
+def test_parser_is_independent_of_chunk_boundaries():
+    expected = _parse([STREAM])
+    assert _parse([STREAM[i:i + 1] for i in range(len(STREAM))]) == expected
+    for size in (2, 3, 5, 17):
+        assert _parse([STREAM[i:i + size] for i in range(0, len(STREAM), size)]) == expected
+
+
+def test_crlf_split_across_chunks_is_one_line_end():
+    parser = SSEParser()
+    assert parser.feed(b"data: a\r") == []
+    events = parser.feed(b"\n\r\n")
+    assert [e.data for e in events] == ["a"]
+    assert parser.flush() == []
@@ -1,5 +1,4 @@
 import json
-import tempfile
 from typing import Dict
 
 from polliLib import PolliClient
@@ -30,6 +29,55 @@ def test_generate_text_as_json_and_params():
     assert kw["params"]["safe"] == "false"
 
 
+def test_long_generate_text_prompt_is_posted_as_chat():
+    fs = FakeSession()
+    fs.post = lambda url, headers=None, json=None, **kw: (
+        fs.__setattr__("last_post", (url, headers, json, kw)),
+        FakeResponse(json_data={"choices": [{"message": {"content": '{"n": 1}'}}]}),
+    )[1]
+    c = PolliClient(session=fs, max_get_prompt_bytes=100, sleep=lambda s: None)
+    prompt = "context " * 50
+    assert c.generate_text(prompt, system="be brief", token="tok", as_json=True, seed=7) == {"n": 1}
+    assert fs.last_get is None
+    url, headers, payload, kw = fs.last_post
+    assert url.endswith("/openai")
+    assert payload["messages"] == [{"role": "system", "content": "be brief"}, {"role": "user", "content": prompt}]
+    assert payload["seed"] == 7 and payload["token"] == "tok" and payload["safe"] is False
+    assert payload["response_format"] == {"type": "json_object"}
+    # Short prompts still use GET.
+    assert c.generate_text("short") == "ok" and fs.last_get is not None
+
+
+def test_long_generate_text_stream_uses_sse():
+    fs = FakeSession()
+    fs.post = lambda url, json=None, **kw: FakeResponse(stream_lines=[
+        'data: {"choices":[{"delta":{"content":"Hel"}}]}',
+        'data: {"choices":[{"delta":{"content":"lo"}}]}',
+        "data: [DONE]",
+    ]) if json.get("stream") else None
+    c = PolliClient(session=fs, max_get_prompt_bytes=10, sleep=lambda s: None)
+    assert "".join(c.generate_text_stream("a prompt longer than ten bytes")) == "Hello"
+
+
+def test_prompt_url_encoding_is_cached():
+    from polliLib.base import _quote_prompt
+
+    c = PolliClient(session=FakeSession())
+    before = _quote_prompt.cache_info().hits
+    assert c._text_prompt_url("a b/c") == c._text_prompt_url("a b/c")
+    assert _quote_prompt.cache_info().hits == before + 1
+
+
+def test_oversized_prompts_skip_the_encoding_cache():
+    from polliLib.base import _quote_prompt
+
+    c = PolliClient(session=FakeSession(), max_get_prompt_bytes=10)
+    size = _quote_prompt.cache_info().currsize
+    assert c._image_prompt_url("x" * 11).endswith("/" + "x" * 11)
+    assert c._text_prompt_url("é" * 6).endswith("/" + "%C3%A9" * 6)
+    assert _quote_prompt.cache_info().currsize == size
+
+
 def test_chat_completion_payload_and_extract():
     fs = FakeSession()
     c = PolliClient(session=fs)
@@ -40,6 +88,26 @@ def test_chat_completion_payload_and_extract():
     assert payload["safe"] is False
 
 
+def test_generate_text_stream_decodes_split_utf8_and_closes():
+    body = "héllo wörld ✓".encode("utf-8")
+    chunks = [body[:2], body[2:9], body[9:-1], body[-1:]]  # splits "é" and "✓"
+    resp = FakeResponse(content_chunks=chunks)
+    fs = FakeSession()
+    fs.get = lambda url, **kw: (fs.__setattr__("last_get", (url, kw)), resp)[1]
+    c = PolliClient(session=fs, sleep=lambda s: None)
+    parts = list(c.generate_text_stream("hi", token="tok"))
+    assert "".join(parts) == "héllo wörld ✓"
+    assert all("\ufffd" not in p for p in parts)
+    assert fs.last_get[1]["stream"] is True and fs.last_get[1]["params"]["token"] == "tok"
+    assert resp._closed
+
+    resp = FakeResponse(content_chunks=[b"a", b"b", b"c"])
+    stream = c.generate_text_stream("hi")
+    assert next(stream) == "a"
+    stream.close()  # cancelling closes the connection
+    assert resp._closed
+
+
 def test_chat_completion_stream_sse():
     lines = [
         'event: message',
@@ -118,6 +186,99 @@ def test_chat_completion_tools_one_round():
     assert all(post[2].get("safe") is False for post in fs.posts)
 
 
+def _delta(**delta):
+    return "data: " + json.dumps({"choices": [{"delta": delta}]})
+
+
+def test_chat_completion_tools_stream_dispatches_each_call_when_complete():
+    log = []
+
+    class Logged(FakeResponse):
+        def iter_lines(self, decode_unicode=False):
+            for i, ln in enumerate(self._lines):
+                log.append(f"line{i}")
+                yield ln
+
+    first = [
+        _delta(content="Checking "),
+        _delta(tool_calls=[{"index": 0, "id": "a", "function": {"name": "lookup", "arguments": '{"city": '}}]),
+        _delta(tool_calls=[{"index": 0, "function": {"arguments": '"Oslo"}'}}]),
+        _delta(tool_calls=[{"index": 1, "id": "b", "function": {"name": "lookup", "arguments": ""}}]),
+        "data: [DONE]",
+    ]
+    second = [_delta(content="Oslo is cold, "), _delta(content="home is warm."), "data: [DONE]"]
+    posts = []
+    fs = FakeSession()
+    fs.post = lambda url, json=None, **kw: (posts.append(json), Logged(stream_lines=first if len(posts) == 1 else second))[1]
+
+    def lookup(city="home"):
+        log.append(f"call:{city}")
+        return {"city": city}
+
+    c = PolliClient(session=fs)
+    tools = [{"type": "function", "function": {"name": "lookup"}}]
+    out = list(c.chat_completion_tools_stream(
+        [{"role": "user", "content": "?"}], tools=tools, functions={"lookup": lookup}, yield_tool_results=True
+    ))
+    text = [p for p in out if isinstance(p, str)]
+    assert text == ["Checking ", "Oslo is cold, ", "home is warm."]
+    assert [p["tool_call_id"] for p in out if isinstance(p, dict)] == ["a", "b"]
+    # "a" ran as soon as its arguments closed, before the next event was read.
+    assert log.index("call:Oslo") == log.index("line2") + 1
+    # "b" sent no arguments, so it only ran once the stream ended.
+    assert log.index("call:home") > log.index("line4")
+    assert all(p["stream"] is True for p in posts)
+    assistant, tool_a, tool_b = posts[1]["messages"][1:]
+    assert assistant["content"] == "Checking "
+    assert [(tc["id"], tc["function"]["arguments"]) for tc in assistant["tool_calls"]] == [
+        ("a", '{"city": "Oslo"}'),
+        ("b", "{}"),
+    ]
+    assert tool_a["role"] == "tool" and json.loads(tool_a["content"]) == {"city": "Oslo"}
+
+
+def test_chat_completion_tools_runs_round_in_parallel_in_call_order():
+    import threading
+
+    calls = [
+        {"id": f"tc{i}", "function": {"name": "fetch", "arguments": json.dumps({"n": i})}}
+        for i in range(4)
+    ]
+    replies = [
+        {"choices": [{"message": {"tool_calls": calls}}]},
+        {"choices": [{"message": {"content": "done"}}]},
+    ]
+    posts = []
+    fs = FakeSession()
+    fs.post = lambda url, json=None, **kw: (posts.append(json), FakeResponse(json_data=replies[len(posts) - 1]))[1]
+    together = threading.Barrier(3, timeout=5.0)  # only passes if three handlers overlap
+    straggler = threading.Event()
+
+    def fetch(n):
+        if n == 3:
+            straggler.wait(5.0)
+            return {"n": n}
+        together.wait()
+        return {"n": n}
+
+    c = PolliClient(session=fs)
+    try:
+        out = c.chat_completion_tools(
+            [{"role": "user", "content": "?"}],
+            tools=[{"type": "function", "function": {"name": "fetch"}}],
+            functions={"fetch": fetch},
+            tool_workers=4,
+            tool_timeout=0.5,
+        )
+    finally:
+        straggler.set()
+    assert out == "done"
+    tool_msgs = posts[1]["messages"][2:]
+    assert [m["tool_call_id"] for m in tool_msgs] == ["tc0", "tc1", "tc2", "tc3"]
+    assert [json.loads(m["content"]) for m in tool_msgs[:3]] == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert "timed out" in json.loads(tool_msgs[3]["content"])["error"]
+
+
 def test_generate_text_spacing_enforced():
     class SeqSession(FakeSession):
         def __init__(self):
@@ -154,11 +315,11 @@ def test_generate_text_retry_backoff():
             return self.responses.pop(0)
 
     sleeps = []
-    c = PolliClient(session=SeqSession(), sleep=lambda seconds: sleeps.append(seconds))
+    c = PolliClient(session=SeqSession(), sleep=lambda seconds: sleeps.append(seconds), retry_jitter=0.0)
     out = c.generate_text("retry")
     assert out == "done"
     rounded = [round(delay, 1) for delay in sleeps[:2]]
-    assert rounded == [0.5, 0.6]
+    assert rounded == [0.5, 1.0]
 
 
 def test_generate_text_uses_client_timeout_when_unspecified():
@@ -0,0 +1,80 @@
+import asyncio
+
+from polliLib import AsyncPolliClient, PolliClient, TraceListener
+from polliLib.trace import capture
+from .conftest import FakeAsyncResponse, FakeAsyncSession, FakeResponse, FakeSession
+from .test_retry import SeqSession
+
+
+class Recorder(TraceListener):
+    def __init__(self):
+        self.events = []
+
+    def span_start(self, span):
+        self.events.append(("start", span.name))
+
+    def span_end(self, span):
+        self.events.append(("end", span.name))
+
+
+def test_stream_trace_has_phases_and_spans():
+    fs = FakeSession()
+    fs.post = lambda url, **kw: FakeResponse(stream_lines=[
+        ": keep-alive",
+        'data: {"choices":[{"delta":{"content":"Hel"}}]}',
+        'data: {"choices":[{"delta":{"content":"lo"}}]}',
+        "data: [DONE]",
+    ])
+    rec = Recorder()
+    c = PolliClient(session=fs, tracer=rec)
+    with capture() as traces:
+        assert "".join(c.chat_completion_stream([{"role": "user", "content": "x"}], model="openai")) == "Hello"
+    (t,) = traces
+    assert t.operation == "chat_completion_stream" and t.model == "openai"
+    assert t.outcome == "ok" and t.status == 200 and t.attempts == 1
+    assert 0 <= t.ttfb <= t.first_token <= t.total
+    assert t.transfer == t.total - t.ttfb
+    assert rec.events[0] == ("start", "polli.chat_completion_stream")
+    assert rec.events[-1] == ("end", "polli.chat_completion_stream")
+    assert ("end", "polli.attempt") in rec.events and ("end", "polli.transfer") in rec.events
+    assert all(s.end is not None and s.end >= s.start for s in t.spans)
+    assert t.root.attributes["http.status_code"] == 200
+
+
+def test_trace_splits_backoff_from_queue_wait():
+    fs = SeqSession([FakeResponse(status=503, text="busy"), FakeResponse(text="ok")])
+    c = PolliClient(session=fs, sleep=lambda s: None, retry_jitter=0.0, tracer=True)
+    with capture() as traces:
+        assert c.generate_text("x") == "ok"
+    (t,) = traces
+    assert t.backoff_wait == 0.5 and t.attempts == 2 and t.retries == 1
+    assert [s.attributes.get("polli.reason") for s in t.spans if s.name == "polli.wait"] == ["backoff"]
+    assert t.as_dict()["outcome"] == "ok"
+
+
+def test_no_tracer_records_nothing():
+    c = PolliClient(session=FakeSession())
+    with capture() as traces:
+        c.generate_text("x")
+    assert traces == [] and c._instr is None
+
+
+def test_async_trace_reports_connect_from_httpx_events():
+    class Probed(FakeAsyncSession):
+        async def request(self, method, url, **kw):
+            probe = kw["extensions"]["trace"]
+            await probe("connection.connect_tcp.started", {})
+            await asyncio.sleep(0.01)
+            await probe("connection.connect_tcp.complete", {})
+            await probe("http11.send_request_headers.started", {})
+            return FakeAsyncResponse(text="ok")
+
+    async def main():
+        c = AsyncPolliClient(session=Probed(), tracer=True)
+        with capture() as traces:
+            await c.generate_text("x")
+        return traces
+
+    (t,) = asyncio.run(main())
+    assert t.connect is not None and t.connect >= 0.005
+    assert any(s.name == "polli.connect" for s in t.spans)